@@ -0,0 +1,276 @@
+"""
+AIBE Adaptive Tests
+Streaming accuracy aggregates from mock-test attempt logs, and test
+assembly weighted toward each user's weak subjects, weak sections and
+recently missed questions
+
+Attempt logs are JSONL, one attempt per line:
+
+    {"user": "alice", "source": "mock_test_1", "timestamp": 1718000000,
+     "answers": {"1": 3, "2": 0, "17": null}}
+
+source is "pyq" for the previous-years bank or "mock_test_<test_id>" for a
+mock test file. Logs are read from where the last ingest stopped, so
+re-ingesting a growing log only reads the new lines; assembling a test only
+touches the aggregates, never the logs.
+
+    pool = QuestionPool()
+    stats = AttemptStats.load()
+    stats.ingest('logs/attempts.jsonl', pool)
+    questions = assemble_test(pool, stats, 'alice', count=100)
+"""
+
+import heapq
+import json
+import math
+import os
+import random
+import time
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable
+
+from citation_graph import default_act, extract_citations
+
+# Sampler weights (added to a base weight of 1 per question)
+WEIGHT_SUBJECT = 3.0      # x (1 - subject accuracy)
+WEIGHT_SECTION = 2.0      # x (1 - worst section accuracy)
+WEIGHT_MISSED = 4.0       # x recency of the last miss (halves every half_life_days)
+WEIGHT_UNSEEN = 0.5       # never attempted
+
+
+def smoothed_accuracy(attempts: int, correct: int) -> float:
+    """Laplace-smoothed accuracy (0.5 with no attempts)"""
+    return (correct + 1) / (attempts + 2)
+
+
+class QuestionPool:
+    """Questions from the previous-years bank and mock tests, keyed '<source>:<id>'"""
+
+    def __init__(self, pyq_path: str = 'mock_tests/aibe_previous_years_collection.json',
+                 mock_paths: Iterable[str] = ('mock_test_1.json',)):
+        self.questions: Dict[str, Dict] = {}
+        self.sections: Dict[str, List[str]] = {}
+        if pyq_path and Path(pyq_path).exists():
+            with open(pyq_path, 'r', encoding='utf-8') as f:
+                self.add_questions('pyq', json.load(f)['questions'])
+        for path in mock_paths:
+            if Path(path).exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    test = json.load(f)
+                self.add_questions(f"mock_test_{test['test_id']}", test['questions'])
+
+    def add_questions(self, source: str, questions: List[Dict]):
+        for question in questions:
+            key = f"{source}:{question['id']}"
+            self.questions[key] = question
+            # Normalized citations double as the per-section dimension
+            text = question.get('section') or question.get('question', '')
+            self.sections[key] = extract_citations(text, default_act(question.get('subject', '')))
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.questions.get(key)
+
+    def keys(self, sources: Optional[Iterable[str]] = None) -> List[str]:
+        if not sources:
+            return list(self.questions)
+        prefixes = tuple(f"{source}:" for source in sources)
+        return [key for key in self.questions if key.startswith(prefixes)]
+
+
+class AttemptStats:
+    """Per-user running counts by subject, section and question"""
+
+    def __init__(self, path: str = 'data/attempt_stats.json'):
+        self.path = Path(path)
+        # user -> {'subjects': {name: [attempts, correct]}, 'sections': {...},
+        #          'questions': {key: [attempts, correct, last_missed]}}
+        self.users: Dict[str, Dict] = {}
+        self.offsets: Dict[str, int] = {}
+        self.answers = 0
+
+    @classmethod
+    def load(cls, path: str = 'data/attempt_stats.json') -> 'AttemptStats':
+        stats = cls(path)
+        if stats.path.exists():
+            with open(stats.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            stats.users = data['users']
+            stats.offsets = data.get('offsets', {})
+            stats.answers = data.get('answers', 0)
+        return stats
+
+    def save(self):
+        """Write aggregates atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'users': self.users, 'offsets': self.offsets, 'answers': self.answers},
+                      f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def _user(self, user: str) -> Dict:
+        if user not in self.users:
+            self.users[user] = {'subjects': {}, 'sections': {}, 'questions': {}}
+        return self.users[user]
+
+    # ========== INGEST ==========
+
+    def record_attempt(self, attempt: Dict, pool: QuestionPool) -> int:
+        """Fold one attempt into the aggregates; returns answers counted (unknown questions are skipped)"""
+        agg = self._user(attempt.get('user', 'default'))
+        subjects, sections, questions = agg['subjects'], agg['sections'], agg['questions']
+        source = attempt['source']
+        timestamp = attempt.get('timestamp') or int(time.time())
+        counted = 0
+
+        for qid, chosen in attempt['answers'].items():
+            key = f"{source}:{qid}"
+            question = pool.questions.get(key)
+            if question is None:
+                continue
+            hit = int(chosen is not None and chosen == question['correct'])
+
+            entry = questions.get(key)
+            if entry is None:
+                entry = questions[key] = [0, 0, 0]
+            entry[0] += 1
+            entry[1] += hit
+            if not hit:
+                entry[2] = max(entry[2], timestamp)
+
+            subject = subjects.setdefault(question['subject'], [0, 0])
+            subject[0] += 1
+            subject[1] += hit
+            for ref in pool.sections[key]:
+                section = sections.setdefault(ref, [0, 0])
+                section[0] += 1
+                section[1] += hit
+            counted += 1
+
+        self.answers += counted
+        return counted
+
+    def ingest(self, log_path: str, pool: QuestionPool) -> int:
+        """Read new complete lines of a JSONL attempt log; returns answers counted"""
+        key = str(Path(log_path).resolve())
+        offset = self.offsets.get(key, 0)
+        counted = 0
+        with open(log_path, 'rb') as f:
+            if offset > os.fstat(f.fileno()).st_size:
+                offset = 0  # log was truncated or replaced
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partially written line; pick it up next time
+                offset += len(line)
+                if line.strip():
+                    counted += self.record_attempt(json.loads(line), pool)
+        self.offsets[key] = offset
+        return counted
+
+    # ========== QUERIES ==========
+
+    def accuracy(self, user: str, level: str, name: str) -> float:
+        """Smoothed accuracy for a subject/section/question ('subjects', 'sections', 'questions')"""
+        counts = self.users.get(user, {}).get(level, {}).get(name)
+        return smoothed_accuracy(counts[0], counts[1]) if counts else smoothed_accuracy(0, 0)
+
+    def weak_areas(self, user: str, level: str = 'subjects', min_attempts: int = 5,
+                   top: int = 5) -> List[Dict]:
+        """Lowest-accuracy subjects or sections with at least min_attempts answers"""
+        rows = [{'name': name, 'attempts': n, 'correct': c, 'accuracy': round(c / n, 3)}
+                for name, (n, c) in self.users.get(user, {}).get(level, {}).items() if n >= min_attempts]
+        rows.sort(key=lambda row: (smoothed_accuracy(row['attempts'], row['correct']), -row['attempts']))
+        return rows[:top]
+
+
+def question_weight(key: str, question: Dict, pool: QuestionPool, agg: Dict, now: float,
+                    half_life_days: float = 14) -> float:
+    """Sampling weight: higher for weak subjects/sections and recent misses"""
+    weight = 1.0
+    subject = agg['subjects'].get(question['subject'])
+    weight += WEIGHT_SUBJECT * (1 - (smoothed_accuracy(*subject) if subject else 0.5))
+
+    sections = [agg['sections'][ref] for ref in pool.sections[key] if ref in agg['sections']]
+    worst = min(smoothed_accuracy(*section) for section in sections) if sections else 0.5
+    weight += WEIGHT_SECTION * (1 - worst)
+
+    entry = agg['questions'].get(key)
+    if entry is None:
+        weight += WEIGHT_UNSEEN
+    elif entry[2]:
+        age_days = max(0.0, (now - entry[2]) / 86400)
+        weight += WEIGHT_MISSED * math.pow(0.5, age_days / half_life_days)
+    return weight
+
+
+def assemble_test(pool: QuestionPool, stats: AttemptStats, user: str, count: int = 100,
+                  sources: Optional[Iterable[str]] = None, seed: Optional[int] = None,
+                  now: Optional[float] = None, half_life_days: float = 14) -> List[Dict]:
+    """
+    Weighted sample of count distinct questions for a user
+
+    Uses exponential keys (Efraimidis-Spirakis) so sampling without
+    replacement is one pass plus a size-count heap. Questions are returned
+    renumbered 1..count with 'source_id' pointing back at the original.
+    """
+    rng = random.Random(seed)
+    now = now if now is not None else time.time()
+    agg = stats.users.get(user, {'subjects': {}, 'sections': {}, 'questions': {}})
+
+    keyed = []
+    for key in pool.keys(sources):
+        weight = question_weight(key, pool.questions[key], pool, agg, now, half_life_days)
+        keyed.append((rng.random() ** (1.0 / weight), key))
+
+    picked = heapq.nlargest(count, keyed)
+    test = []
+    for number, (_, key) in enumerate(picked, 1):
+        question = dict(pool.questions[key], id=number, source_id=key)
+        test.append(question)
+    return test
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AIBE adaptive test assembly")
+    parser.add_argument('--stats', default='data/attempt_stats.json')
+    parser.add_argument('--pyq', default='mock_tests/aibe_previous_years_collection.json')
+    parser.add_argument('--mock', action='append', default=None, help="Mock test file (repeatable)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    ingest = sub.add_parser('ingest', help="Fold new lines of attempt logs into the aggregates")
+    ingest.add_argument('logs', nargs='+')
+    weak = sub.add_parser('weak', help="Show a user's weakest subjects and sections")
+    weak.add_argument('--user', default='default')
+    build = sub.add_parser('build', help="Assemble an adaptive mock test")
+    build.add_argument('--user', default='default')
+    build.add_argument('--count', type=int, default=100)
+    build.add_argument('--test-id', type=int, default=90)
+    build.add_argument('--source', action='append', help="Restrict to pyq / mock_test_<id> (repeatable)")
+    build.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    pool = QuestionPool(args.pyq, args.mock or ['mock_test_1.json'])
+    stats = AttemptStats.load(args.stats)
+
+    if args.command == 'ingest':
+        for log in args.logs:
+            t0 = time.perf_counter()
+            counted = stats.ingest(log, pool)
+            print(f"✅ {log}: {counted} answers in {time.perf_counter() - t0:.2f}s")
+        stats.save()
+        print(f"💾 {stats.answers} answers from {len(stats.users)} users in {stats.path}")
+
+    elif args.command == 'weak':
+        for level in ('subjects', 'sections'):
+            print(f"\n⚠️  Weakest {level} for {args.user}:")
+            for row in stats.weak_areas(args.user, level):
+                print(f"   {row['name']:.<45} {row['accuracy']:.0%} of {row['attempts']}")
+
+    elif args.command == 'build':
+        from aibe_pyq_manager import AIBEPreviousYearsManager
+
+        questions = assemble_test(pool, stats, args.user, args.count, args.source, args.seed)
+        manager = AIBEPreviousYearsManager(args.pyq)
+        manager.export_to_mock_test_format(questions, f"AIBE Adaptive Test - {args.user}", test_id=args.test_id)
@@ -0,0 +1,65 @@
+"""
+AIBE command line
+One entry point for every tool; a command's module (and its dependencies,
+e.g. requests, lxml, numpy) is imported only when that command runs
+
+    python aibe.py                       # list commands
+    python aibe.py generate sample       # = python flashcard_generator.py sample
+    python aibe.py batch refresh.yaml    # = python batch_jobs.py refresh.yaml
+
+Arguments after the command are passed through unchanged, so each tool's
+own --help, --profile and options work as before.
+"""
+
+import runpy
+import sys
+
+# command -> (module, summary)
+COMMANDS = {
+    'generate': ('flashcard_generator', "Expand a {topics, flashcards} JSON file ('sample' writes one)"),
+    'scrape': ('json_scraper_generator', "Interactive scrape / generate workflows"),
+    'batch': ('batch_jobs', "Run workflows unattended from a YAML/JSON job manifest"),
+    'pyq': ('aibe_pyq_manager', "Previous-years question bank tools"),
+    'adaptive': ('adaptive_tests', "Weak-area weighted test assembly"),
+    'score': ('batch_scoring', "Batch scoring of answer sheets"),
+    'calibrate': ('item_calibration', "Item difficulty calibration from attempt logs"),
+    'srs': ('srs_scheduler', "Spaced repetition scheduler"),
+    'citations': ('citation_graph', "Citation graph across questions and cards"),
+    'corpus': ('corpus_store', "Scraped document corpus"),
+    'serve': ('data_server', "Local data API and static server"),
+    'bundle': ('bundle_build', "Content-hashed static data bundle"),
+    'sync': ('deck_sync', "Deck change logs and delta patches"),
+    'validate': ('data_validator', "Schema and integrity checks for data files"),
+    'snapshot': ('snapshot_store', "Deduplicated snapshots of the data files"),
+    'html': ('html_extract', "HTML extraction engines"),
+    'context': ('context_selector', "Preview the existing-question context of a prompt"),
+    'mock-llm': ('mock_llm_server', "Mock LLM server for offline runs"),
+    'bench': ('benchmark_suite', "Benchmark suite"),
+    'profile': ('profiling', "Re-print a saved profile report"),
+}
+
+
+def print_usage():
+    print("Usage: python aibe.py <command> [args...]\n")
+    print("Commands:")
+    for name, (module, summary) in COMMANDS.items():
+        print(f"  {name:<10} {summary}  [{module}.py]")
+
+
+def main(argv) -> int:
+    if not argv or argv[0] in ('-h', '--help', 'help'):
+        print_usage()
+        return 0
+    command = argv[0]
+    if command not in COMMANDS:
+        print(f"❌ Unknown command: {command}\n")
+        print_usage()
+        return 2
+    module = COMMANDS[command][0]
+    sys.argv = [f"{module}.py"] + list(argv[1:])
+    runpy.run_module(module, run_name='__main__', alter_sys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
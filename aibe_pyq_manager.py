@@ -8,7 +8,9 @@ Script to manage, filter, and integrate previous year questions
 import json
 import random
 from typing import List, Dict
-from collections import Counter
+
+from analytics_cube import QuestionCube, UNLABELLED
+from citation_graph import CitationGraph, citation_sort_key, default_act, extract_citations
 
 class AIBEPreviousYearsManager:
     """Manager for AIBE Previous Year Questions"""
@@ -18,6 +20,9 @@ class AIBEPreviousYearsManager:
         with open(json_file_path, 'r', encoding='utf-8') as f:
             self.data = json.load(f)
         self.questions = self.data['questions']
+        # Counts by subject x year x difficulty x has_case_law, kept in sync by the edit methods below
+        self.cube = QuestionCube(self.questions)
+        self._citations = None
         
     def get_all_questions(self) -> List[Dict]:
         """Get all questions"""
@@ -37,11 +42,14 @@ class AIBEPreviousYearsManager:
         """
         return [q for q in self.questions if q['subject'] == subject]
     
-    def filter_by_difficulty(self, difficulty: str) -> List[Dict]:
+    def filter_by_difficulty(self, difficulty: str, calibrated: bool = False) -> List[Dict]:
         """
         Filter by difficulty level
         Options: 'Easy', 'Medium', 'Hard'
+        calibrated: prefer the label from attempt data (item_calibration.py) where present
         """
+        if calibrated:
+            return [q for q in self.questions if q.get('calibrated_difficulty', q.get('difficulty')) == difficulty]
         return [q for q in self.questions if q.get('difficulty') == difficulty]
     
     def get_by_id(self, question_id: int) -> Dict:
@@ -55,20 +63,62 @@ class AIBEPreviousYearsManager:
         """Get random questions"""
         return random.sample(self.questions, min(count, len(self.questions)))
     
+    @property
+    def citations(self) -> CitationGraph:
+        """Normalized section/article/case citations of the questions (built on first use)"""
+        if self._citations is None:
+            self._citations = CitationGraph()
+            self._citations.add_questions(self.questions)
+        return self._citations
+    
+    def add_question(self, question: Dict):
+        """Append a question, keeping the stats cube and citation graph current"""
+        self.questions.append(question)
+        self.cube.add(question)
+        if self._citations is not None:
+            self._citations.add_question(question)
+    
+    def update_question(self, question_id: int, **fields) -> Dict:
+        """Edit fields of a question in place, e.g. update_question(12, difficulty='Hard')"""
+        question = self.get_by_id(question_id)
+        if question is None:
+            raise KeyError(f"No question with id {question_id}")
+        before = dict(question)
+        question.update(fields)
+        self.cube.update(before, question)
+        if self._citations is not None:
+            self._citations.add_question(question)
+        return question
+    
+    def remove_question(self, question_id: int) -> Dict:
+        """Delete a question, keeping the stats cube and citation graph current"""
+        question = self.get_by_id(question_id)
+        if question is None:
+            raise KeyError(f"No question with id {question_id}")
+        self.questions.remove(question)
+        self.cube.remove(question)
+        if self._citations is not None:
+            self._citations.remove_item(f"question:{question_id}")
+        return question
+    
     def get_subject_wise_stats(self) -> Dict:
         """Get statistics by subject"""
-        subjects = [q['subject'] for q in self.questions]
-        return dict(Counter(subjects))
+        return self.cube.rollup('subject')
     
     def get_year_wise_stats(self) -> Dict:
         """Get statistics by year"""
-        years = [q['year'] for q in self.questions]
-        return dict(Counter(years))
+        return self.cube.rollup('year')
     
     def get_difficulty_stats(self) -> Dict:
-        """Get difficulty distribution"""
-        difficulties = [q.get('difficulty', 'Medium') for q in self.questions]
-        return dict(Counter(difficulties))
+        """Get difficulty distribution (questions without one under 'Unlabelled')"""
+        return self.cube.rollup('difficulty')
+    
+    def get_difficulty_by_subject(self) -> Dict[str, Dict[str, int]]:
+        """{subject: {difficulty: count}}"""
+        result = {}
+        for (subject, difficulty), count in self.cube.rollup('subject', 'difficulty').items():
+            result.setdefault(subject, {})[difficulty] = count
+        return result
     
     def search_by_keyword(self, keyword: str) -> List[Dict]:
         """Search questions by keyword in question text"""
@@ -101,12 +151,23 @@ class AIBEPreviousYearsManager:
         return test_questions
     
     def get_sections_list(self) -> List[str]:
-        """Get all unique sections/articles referenced"""
-        sections = set()
+        """
+        Get all unique sections/articles referenced (normalized, e.g. 'Section 34 IPC', 'Article 21')
+
+        'section' values with no parseable reference ('Order 37 CPC', 'Rule 36, BCI Rules')
+        are listed as written.
+        """
+        sections = set(self.citations.refs())
         for q in self.questions:
-            if 'section' in q:
-                sections.add(q['section'])
-        return sorted(list(sections))
+            section = q.get('section')
+            if section and not extract_citations(section, default_act(q.get('subject', ''))):
+                sections.add(section)
+        return sorted(sections, key=citation_sort_key)
+    
+    def get_questions_citing(self, citation: str) -> List[Dict]:
+        """Questions citing a provision or case, e.g. 'Section 34 IPC', 'Art. 21', 'Maneka Gandhi v. UoI'"""
+        ids = {int(item['id'].split(':', 1)[1]) for item in self.citations.citing(citation, kind='question')}
+        return [q for q in self.questions if q['id'] in ids]
     
     def print_question(self, question: Dict, show_answer: bool = False):
         """Pretty print a question"""
@@ -150,8 +211,16 @@ class AIBEPreviousYearsManager:
         print(f"✅ Mock test created: {filename}")
         return filename
     
-    def generate_study_plan(self, weak_subjects: List[str] = None):
-        """Generate study plan based on question distribution"""
+    def generate_study_plan(self, weak_subjects: List[str] = None, attempt_stats=None, user: str = 'default'):
+        """
+        Generate study plan based on question distribution
+        
+        attempt_stats: an adaptive_tests.AttemptStats; when given without
+        weak_subjects, the user's lowest-accuracy subjects are used
+        """
+        if weak_subjects is None and attempt_stats is not None:
+            weak_subjects = [row['name'] for row in attempt_stats.weak_areas(user)]
+        
         print("\n" + "="*70)
         print("📚 PERSONALIZED STUDY PLAN")
         print("="*70)
@@ -171,7 +240,9 @@ class AIBEPreviousYearsManager:
             print("   Focus on your weak subjects first:")
             for i, subject in enumerate(weak_subjects, 1):
                 available = stats.get(subject, 0)
-                print(f"   {i}. {subject} ({available} questions available)")
+                easy = self.cube.count(subject=subject, difficulty='Easy')
+                cases = self.cube.count(subject=subject, has_case_law=True)
+                print(f"   {i}. {subject} ({available} questions available, {easy} Easy, {cases} with case law)")
         
         print("\n3. DIFFICULTY PROGRESSION:")
         print("-" * 70)
@@ -182,7 +253,7 @@ class AIBEPreviousYearsManager:
         
         print("\n4. DAILY PRACTICE PLAN:")
         print("-" * 70)
-        total_q = len(self.questions)
+        total_q = self.cube.total
         print(f"   Total Questions: {total_q}")
         print(f"   Week 1-2: 10 questions/day (focus on Easy)")
         print(f"   Week 3-4: 15 questions/day (mix Easy + Medium)")
@@ -278,7 +349,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+    from profiling import pop_profile_flag, maybe_profile
+    
+    maybe_profile(pop_profile_flag(sys.argv), main)
 
 
 # ============================================================================
@@ -335,17 +409,15 @@ def analyze_difficulty_by_subject():
     print("📊 DIFFICULTY ANALYSIS BY SUBJECT")
     print("="*70 + "\n")
     
-    subjects = set(q['subject'] for q in manager.questions)
+    by_subject = manager.get_difficulty_by_subject()
     
-    for subject in sorted(subjects):
-        subject_qs = manager.filter_by_subject(subject)
-        easy = len([q for q in subject_qs if q.get('difficulty') == 'Easy'])
-        medium = len([q for q in subject_qs if q.get('difficulty') == 'Medium'])
-        hard = len([q for q in subject_qs if q.get('difficulty') == 'Hard'])
+    for subject in sorted(by_subject):
+        counts = by_subject[subject]
         
         print(f"{subject}")
-        print(f"  Easy: {easy} | Medium: {medium} | Hard: {hard}")
-        print(f"  Total: {len(subject_qs)}")
+        print(f"  Easy: {counts.get('Easy', 0)} | Medium: {counts.get('Medium', 0)} | Hard: {counts.get('Hard', 0)}"
+              + (f" | Unlabelled: {counts[UNLABELLED]}" if counts.get(UNLABELLED) else ''))
+        print(f"  Total: {manager.cube.count(subject=subject)}")
         print()
 
 
@@ -366,27 +438,21 @@ def create_subject_wise_study_guide():
         
         subject_qs = manager.filter_by_subject(subject)
         
-        # Get unique sections
-        sections = set()
-        case_laws = set()
-        
-        for q in subject_qs:
-            if 'section' in q:
-                sections.add(q['section'])
-            if 'case_law' in q:
-                case_laws.add(q['case_law'])
+        # Normalized citations, most cited first
+        sections = manager.citations.top_refs(subject)
+        case_laws = manager.citations.top_cases(subject)
         
         print(f"\nTotal Questions: {len(subject_qs)}")
         
         if sections:
             print(f"\nKey Sections/Articles:")
-            for section in sorted(sections):
-                print(f"  • {section}")
+            for section, count in sections:
+                print(f"  • {section}" + (f" ({count} questions)" if count > 1 else ""))
         
         if case_laws:
             print(f"\nLandmark Cases:")
-            for case in sorted(case_laws):
-                print(f"  • {case}")
+            for case, count in case_laws:
+                print(f"  • {case}" + (f" ({count} questions)" if count > 1 else ""))
         
         print(f"\nSample Questions:")
         for i, q in enumerate(subject_qs[:2], 1):
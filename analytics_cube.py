@@ -0,0 +1,101 @@
+"""
+AIBE Analytics Cube
+Precomputed question counts over subject x year x difficulty x has_case_law
+
+Every group-by (all 16 subsets of the four dimensions) is materialized and
+kept current as questions are added, removed or edited, so counts, slices
+and roll-ups never rescan the question list.
+
+    cube = QuestionCube(questions)
+    cube.count(subject='Constitutional Law', difficulty='Hard')   # O(1)
+    cube.rollup('subject')                      # {'Constitutional Law': 12, ...}
+    cube.rollup('subject', 'difficulty', year='AIBE XVIII')
+"""
+
+from collections import Counter
+from itertools import combinations
+from typing import List, Dict, Tuple, Iterable
+
+DIMENSIONS = ('subject', 'year', 'difficulty', 'has_case_law')
+UNLABELLED = 'Unlabelled'   # difficulty bucket of questions without one
+
+
+def cell_of(question: Dict) -> Tuple:
+    """Cube coordinates of a question"""
+    return (question['subject'], question['year'], question.get('difficulty') or UNLABELLED,
+            'case_law' in question)
+
+
+class QuestionCube:
+    """Count cube with every roll-up materialized"""
+
+    def __init__(self, questions: Iterable[Dict] = ()):
+        self._groups: Dict[Tuple[int, ...], Counter] = {
+            dims: Counter() for r in range(len(DIMENSIONS) + 1) for dims in combinations(range(len(DIMENSIONS)), r)
+        }
+        # One pass to count distinct cells, then roll each cell up into every group
+        for cell, count in Counter(cell_of(q) for q in questions).items():
+            self._apply(cell, count)
+
+    # ========== UPDATES ==========
+
+    def _apply(self, cell: Tuple, delta: int):
+        for dims, counts in self._groups.items():
+            key = tuple(cell[i] for i in dims)
+            counts[key] += delta
+            if counts[key] <= 0:
+                del counts[key]
+
+    def add(self, question: Dict):
+        self._apply(cell_of(question), 1)
+
+    def remove(self, question: Dict):
+        self._apply(cell_of(question), -1)
+
+    def update(self, old: Dict, new: Dict):
+        """Move a question whose fields changed (old is a copy taken before the edit)"""
+        before, after = cell_of(old), cell_of(new)
+        if before != after:
+            self._apply(before, -1)
+            self._apply(after, 1)
+
+    # ========== QUERIES ==========
+
+    @staticmethod
+    def _dims(names: Iterable[str]) -> Tuple[int, ...]:
+        try:
+            return tuple(sorted({DIMENSIONS.index(name) for name in names}))
+        except ValueError:
+            raise ValueError(f"Unknown dimension in {list(names)}; expected {DIMENSIONS}") from None
+
+    @property
+    def total(self) -> int:
+        return self._groups[()].get((), 0)
+
+    def count(self, **filters) -> int:
+        """Questions matching every filter, e.g. count(subject='Torts', has_case_law=True)"""
+        dims = self._dims(filters)
+        return self._groups[dims].get(tuple(filters[DIMENSIONS[i]] for i in dims), 0)
+
+    def rollup(self, *by: str, **filters) -> Dict:
+        """
+        Counts grouped by the given dimensions, optionally within a slice
+
+        Keys are plain values for one dimension and tuples (in argument
+        order) for several.
+        """
+        dims = self._dims(by + tuple(filters))
+        position = {DIMENSIONS[i]: n for n, i in enumerate(dims)}
+        fixed = [(position[name], value) for name, value in filters.items()]
+        picks = [position[name] for name in by]
+
+        result = {}
+        for key, count in self._groups[dims].items():
+            if all(key[p] == value for p, value in fixed):
+                out = tuple(key[p] for p in picks)
+                result[out[0] if len(picks) == 1 else out] = count
+        return result
+
+    def values(self, dimension: str) -> List:
+        """Distinct values of one dimension, sorted"""
+        return sorted(self.rollup(dimension))
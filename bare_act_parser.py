@@ -0,0 +1,403 @@
+"""
+AIBE Bare Act Parser
+Splits bare-act text into numbered sections and sub-clauses, and keeps a
+section-keyed index on disk so generation and question lookup can pull
+exactly the provisions they need.
+
+Keys are normalized references:
+    "Section 2", "Section 2(h)", "Section 300(1)(a)"
+    "Article 32", "Article 21A"
+    "Order XXI Rule 1"
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+
+
+ROMAN_VALUES = [(1000, 'M'), (900, 'CM'), (500, 'D'), (400, 'CD'), (100, 'C'), (90, 'XC'),
+                (50, 'L'), (40, 'XL'), (10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I')]
+
+SECTION_LINE = re.compile(r'^(?:Section|Sec\.?|S\.)\s*(\d+[A-Z]{0,3})\b[\s.:\-—–]*(.*)$', re.I)
+ARTICLE_LINE = re.compile(r'^(?:Article|Art\.?)\s*(\d+[A-Z]{0,3})\b[\s.:\-—–]*(.*)$', re.I)
+ORDER_LINE = re.compile(r'^ORDER\s+([IVXLC]+|\d+)\b[\s.:\-—–]*(.*)$', re.I)
+RULE_LINE = re.compile(r'^Rule\s+(\d+[A-Z]{0,3})\b[\s.:\-—–]*(.*)$', re.I)
+NUMBERED_LINE = re.compile(r'^(\d+[A-Z]{0,3})\.\s+(.*)$')
+CLAUSE_LINE = re.compile(r'^\(([0-9]{1,3}[A-Z]?|[a-z]{1,2}|[ivxl]{1,6})\)\s*(.*)$')
+INLINE_CLAUSE = re.compile(r'(?<=[;:—.])\s+(?=\(([0-9]{1,3}[A-Z]?|[a-z]{1,2}|[ivxl]{2,6})\)\s)')
+HEADING_SPLIT = re.compile(r'^(.{3,160}?)(?:\.\s*[—–-]|[—–]|:-)\s*(.*)$')
+ROMAN_LABEL = re.compile(r'^[ivxl]+$')
+
+# Provision numbers have at most three digits (the Constitution stops at 395),
+# so years such as "the Act of 1972" or "Articles 14 and 1950" are not references
+NUMBER = r'\d{1,3}(?!\d)[A-Z]?'
+REFERENCE = re.compile(
+    r'\b(?:(?P<order>Order|O\.)\s*(?P<order_no>[IVXLC]+|\d+)\s*,?\s*(?:Rule|R\.|r\.)\s*(?P<rule_no>' + NUMBER + r')'
+    r'(?P<rule_clauses>(?:\s*\([0-9a-z]{1,4}\))*)'
+    r'|(?P<kind>Sections?|Secs?\.?|S\.|Articles?|Arts?\.?)\s*(?P<nums>' + NUMBER + r'(?:\s*\([0-9a-z]{1,4}\))*'
+    r'(?:\s*(?:,|and|&|to|-|–)\s*' + NUMBER + r'(?:\s*\([0-9a-z]{1,4}\))*)*))',
+    re.I
+)
+NUMBER_WITH_CLAUSES = re.compile(r'(' + NUMBER + r')((?:\s*\([0-9a-z]{1,4}\))*)', re.I)
+
+
+def to_roman(number: int) -> str:
+    result = ''
+    for value, numeral in ROMAN_VALUES:
+        while number >= value:
+            result += numeral
+            number -= value
+    return result
+
+
+def normalize_ref(kind: str, number: str, clauses: Iterable[str] = (), order: Optional[str] = None) -> str:
+    """Build a normalized key such as 'Section 2(h)' or 'Order XXI Rule 1'"""
+    suffix = ''.join(f"({c.strip('()').strip()})" for c in clauses)
+    if order:
+        order = to_roman(int(order)) if order.isdigit() else order.upper()
+        return f"Order {order} Rule {number.upper()}{suffix}"
+    base = 'Article' if kind.lower().startswith('art') else 'Section'
+    return f"{base} {number.upper()}{suffix}"
+
+
+def iter_refs(text: str) -> Iterator[Tuple[int, int, List[str]]]:
+    """Yield (start, end, refs) for each reference span in free text"""
+    for match in REFERENCE.finditer(text or ''):
+        if match.group('order'):
+            clauses = re.findall(r'\(([0-9a-z]{1,4})\)', match.group('rule_clauses'), re.I)
+            yield match.start(), match.end(), [normalize_ref('section', match.group('rule_no'), clauses,
+                                                             order=match.group('order_no'))]
+            continue
+        kind = match.group('kind')
+        nums = match.group('nums')
+        numbers = NUMBER_WITH_CLAUSES.findall(nums)
+        # "Sections 301-307" names a range
+        range_match = re.fullmatch(r'\s*(\d+)\s*(?:-|–|to)\s*(\d+)\s*', nums)
+        if range_match and int(range_match.group(2)) - int(range_match.group(1)) < 200:
+            numbers = [(str(n), '') for n in range(int(range_match.group(1)), int(range_match.group(2)) + 1)]
+        refs = []
+        for number, clause_text in numbers:
+            clauses = re.findall(r'\(([0-9a-z]{1,4})\)', clause_text, re.I)
+            refs.append(normalize_ref(kind, number, clauses))
+        yield match.start(), match.end(), refs
+
+
+def extract_refs(text: str) -> List[str]:
+    """
+    Find section/article/order references in free text
+
+    "Articles 32, 226" -> ['Article 32', 'Article 226']
+    "Sec. 2(h) and 10" -> ['Section 2(h)', 'Section 10']
+    "O. 21 R. 1"       -> ['Order XXI Rule 1']
+    """
+    return list(dict.fromkeys(ref for _, _, refs in iter_refs(text) for ref in refs))
+
+
+def coerce_ref(ref: str, default_kind: str = 'section') -> Optional[str]:
+    """Normalize one reference; bare numbers like '2(h)' take default_kind"""
+    refs = extract_refs(ref)
+    if refs:
+        return refs[0]
+    match = re.fullmatch(r'\s*(\d+[A-Z]?)((?:\s*\([0-9a-z]{1,4}\))*)\s*', ref or '', re.I)
+    if match:
+        return normalize_ref(default_kind, match.group(1), re.findall(r'\(([0-9a-z]{1,4})\)', match.group(2), re.I))
+    return None
+
+
+def _clause_level(label: str, previous_alpha: Optional[str]) -> int:
+    """1 = (1) sub-section, 2 = (a) clause, 3 = (i) sub-clause"""
+    if label[0].isdigit():
+        return 1
+    if ROMAN_LABEL.match(label):
+        # (i), (v), (x) are letters only when they continue an (h), (u), (w) run
+        follows = {'i': 'h', 'v': 'u', 'x': 'w'}
+        if len(label) == 1 and previous_alpha == follows.get(label):
+            return 2
+        return 3
+    return 2
+
+
+def _split_heading(rest: str):
+    match = HEADING_SPLIT.match(rest)
+    if match and len(match.group(1).split()) <= 20:
+        return match.group(1).strip(' .'), match.group(2).strip()
+    return '', rest.strip()
+
+
+def parse_sections(text: str, default_kind: str = 'section') -> List[Dict]:
+    """
+    Split bare-act text into sections with nested clauses
+
+    Args:
+        text: Extracted act text (one provision per line, as html_extract.clean_text produces)
+        default_kind: 'section' or 'article' - what a bare "12. Heading" line is
+
+    Returns:
+        List of dicts: key, number, heading, text, clauses (list of {key, label, text})
+    """
+    if not text:
+        return []
+
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            lines.extend(part.strip() for part in INLINE_CLAUSE.split(line)
+                         if part and part.strip() and not re.fullmatch(r'[0-9a-z]{1,6}', part.strip(), re.I))
+
+    sections = []
+    current = None
+    order = None
+    path = {}
+    previous_alpha = None
+
+    def add_line(line, allow_heading=True):
+        nonlocal path, previous_alpha
+        if allow_heading and not current['heading'] and not current['lines']:
+            current['heading'], line = _split_heading(line)
+            # Indian Kanoon puts a bare heading line under "Article 21 in ..."
+            if not current['heading'] and len(line.split()) <= 12 and not re.search(r'[.;:,—–]$', line):
+                current['heading'], line = line, ''
+            if not line:
+                return
+
+        clause_match = CLAUSE_LINE.match(line)
+        if clause_match:
+            label = clause_match.group(1)
+            level = _clause_level(label, previous_alpha)
+            if level == 2:
+                previous_alpha = label
+            path = {k: v for k, v in path.items() if k < level}
+            path[level] = label
+            labels = ''.join(f'({path[k]})' for k in sorted(path))
+            current['clauses'].append({
+                'key': current['key'] + labels,
+                'label': labels,
+                'text': clause_match.group(2)
+            })
+
+        current['lines'].append(line)
+
+    def start(kind, number, rest, order_no=None):
+        nonlocal current, path, previous_alpha
+        # "Section 300 in The Indian Penal Code" names the act, not a heading
+        if re.match(r'^in\s+(the\s+)?[A-Z]', rest, re.I) and not re.search(r'[—–]', rest):
+            rest = ''
+        heading, body = _split_heading(rest)
+        current = {
+            'key': normalize_ref(kind, number, order=order_no),
+            'number': number.upper(),
+            'heading': heading,
+            'lines': [],
+            'clauses': []
+        }
+        if order_no:
+            current['order'] = order_no
+        sections.append(current)
+        path = {}
+        previous_alpha = None
+        if body:
+            add_line(body, allow_heading=False)
+
+    for line in lines:
+        order_match = ORDER_LINE.match(line)
+        if order_match:
+            order = order_match.group(1)
+            order = to_roman(int(order)) if order.isdigit() else order.upper()
+            current = None
+            continue
+
+        match = SECTION_LINE.match(line)
+        if match:
+            start('section', match.group(1), match.group(2))
+            order = None
+            continue
+        match = ARTICLE_LINE.match(line)
+        if match:
+            start('article', match.group(1), match.group(2))
+            order = None
+            continue
+        match = RULE_LINE.match(line) if order else None
+        if match:
+            start('section', match.group(1), match.group(2), order_no=order)
+            continue
+        match = NUMBERED_LINE.match(line)
+        if match and (current is None or len(match.group(2)) > 3):
+            if current is not None and not current['lines'] and \
+                    current['key'] == normalize_ref(default_kind, match.group(1), order=order):
+                # "2. Interpretation-clause.—..." under the "Section 2 in The ... Act" banner
+                add_line(match.group(2))
+            else:
+                start(default_kind, match.group(1), match.group(2), order_no=order)
+            continue
+
+        if current is not None:
+            add_line(line)
+
+    for section in sections:
+        section['text'] = '\n'.join(section.pop('lines'))
+    return sections
+
+
+def split_section(section: Dict, max_chars: int) -> List[Dict]:
+    """
+    A section as parts whose format_section fits max_chars
+
+    Parts break at line ends (inside a line only when one line is too long);
+    later parts repeat the key and mark the heading "(contd.)".
+    """
+    if len(format_section(section)) <= max_chars:
+        return [section]
+    heading = section.get('heading', '')
+    budget = max(1, max_chars - len(format_section(dict(section, heading=f"{heading} (contd.)", text=''))))
+    pieces, piece = [], ''
+    for line in section.get('text', '').split('\n'):
+        while len(line) > budget:
+            if piece:
+                pieces.append(piece)
+                piece = ''
+            pieces.append(line[:budget])
+            line = line[budget:]
+        if piece and len(piece) + 1 + len(line) > budget:
+            pieces.append(piece)
+            piece = line
+        else:
+            piece = f"{piece}\n{line}" if piece else line
+    if piece:
+        pieces.append(piece)
+    parts = []
+    for i, text in enumerate(pieces):
+        part = {key: value for key, value in section.items() if key != 'clauses' or i == 0}
+        part['text'] = text
+        if i:
+            part['heading'] = f"{heading} (contd.)" if heading else '(contd.)'
+        parts.append(part)
+    return parts
+
+
+def chunk_sections(sections: List[Dict], max_chars: int = 8000) -> List[List[Dict]]:
+    """Group consecutive sections into batches that fit a prompt budget (long sections are split)"""
+    batches, batch, size = [], [], 0
+    for section in (part for s in sections for part in split_section(s, max_chars)):
+        if not section.get('text') and not section.get('heading'):
+            continue
+        length = len(format_section(section))
+        # generate_from_sections joins sections with a blank line
+        if batch and size + 2 + length > max_chars:
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(section)
+        size += length + (2 if len(batch) > 1 else 0)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def format_section(section: Dict) -> str:
+    heading = f" - {section['heading']}" if section.get('heading') else ''
+    return f"{section['key']}{heading}\n{section.get('text', '')}"
+
+
+def act_key(act_name: str) -> str:
+    """Stable key for an act name ('The Indian Contract Act, 1872' -> 'indian_contract_act_1872')"""
+    name = re.sub(r'^the\s+', '', act_name.strip().lower())
+    return re.sub(r'[^a-z0-9]+', '_', name).strip('_')
+
+
+class SectionIndex:
+    """Section-keyed index of parsed bare acts, persisted as JSON"""
+
+    def __init__(self, path: str = 'data/sections_index.json'):
+        self.path = Path(path)
+        self.acts: Dict[str, Dict] = {}
+        self._by_key: Dict[str, Dict[str, Dict]] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.acts = json.load(f).get('acts', {})
+            for key in self.acts:
+                self._build_lookup(key)
+
+    def _build_lookup(self, key: str):
+        lookup = {}
+        for section in self.acts[key]['sections']:
+            lookup[section['key']] = section
+            for clause in section.get('clauses', []):
+                lookup[clause['key']] = {'key': clause['key'], 'heading': section.get('heading', ''),
+                                         'text': clause['text'], 'parent': section['key']}
+        self._by_key[key] = lookup
+
+    def add_act(self, act_name: str, sections: List[Dict], url: Optional[str] = None,
+                aliases: Iterable[str] = (), default_kind: str = 'section') -> str:
+        """Add or replace an act; returns its key"""
+        key = act_key(act_name)
+        self.acts[key] = {
+            'name': act_name,
+            'url': url,
+            'kind': default_kind,
+            'aliases': sorted({act_key(a) for a in aliases}),
+            'indexed_at': datetime.now().isoformat(timespec='seconds'),
+            'sections': sections
+        }
+        self._build_lookup(key)
+        return key
+
+    def has_act(self, act_name: str) -> bool:
+        return self.resolve_act(act_name) is not None
+
+    def resolve_act(self, act_name: str) -> Optional[str]:
+        key = act_key(act_name)
+        if key in self.acts:
+            return key
+        for candidate, act in self.acts.items():
+            if key in act.get('aliases', []):
+                return candidate
+        return None
+
+    def get(self, act_name: str, ref: str) -> Optional[Dict]:
+        """Look up one provision, e.g. get('Indian Contract Act, 1872', 'Sec. 2(h)')"""
+        key = self.resolve_act(act_name)
+        if key is None:
+            return None
+        normalized = coerce_ref(ref, self.acts[key].get('kind', 'section'))
+        return self._by_key[key].get(normalized) if normalized else None
+
+    def sections(self, act_name: str, refs: Optional[Iterable[str]] = None) -> List[Dict]:
+        """All sections of an act, or just the referenced ones (in reference order)"""
+        key = self.resolve_act(act_name)
+        if key is None:
+            return []
+        if refs is None:
+            return list(self.acts[key]['sections'])
+        kind = self.acts[key].get('kind', 'section')
+        found = []
+        for ref in refs:
+            for normalized in extract_refs(ref) or [coerce_ref(ref, kind)]:
+                item = self._by_key[key].get(normalized)
+                if item and item not in found:
+                    found.append(item)
+        return found
+
+    def lookup(self, text: str) -> List[Dict]:
+        """Every indexed provision referenced in free text, across all acts"""
+        results = []
+        for ref in extract_refs(text):
+            for key, lookup in self._by_key.items():
+                if ref in lookup:
+                    results.append({'act': self.acts[key]['name'], **lookup[ref]})
+        return results
+
+    def sections_for_question(self, question: Dict) -> List[Dict]:
+        """Provisions cited by a PYQ question's section field (or its explanation)"""
+        return self.lookup(question.get('section') or question.get('explanation', ''))
+
+    def save(self):
+        """Write the index atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'acts': self.acts}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        print(f"💾 Saved section index: {self.path}")
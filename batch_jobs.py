@@ -0,0 +1,334 @@
+"""
+AIBE Batch Jobs
+Run generator workflows unattended from a YAML or JSON job manifest
+
+    python batch_jobs.py refresh.yaml --report reports/refresh.json
+    python batch_jobs.py refresh.yaml --dry-run
+
+    workers: 4                  # jobs running at once
+    rate_limit:
+      llm_per_minute: 30        # shared by every job in the run
+      http_delay: 1.0           # seconds between requests to the same host
+    defaults:
+      retries: 1                # re-run a job that raised, after a backoff
+    jobs:
+      - {type: scrape, topic: Torts, search_queries: [negligence, nuisance], output_file: torts.json}
+      - {type: add, filename: contract_law.json, count: 10}
+      - {type: create, topic_id: 14, title: Arbitration, subtitle: "Act of 1996", filename: arbitration.json}
+      - {type: expand, min_cards: 20}
+      - {type: act, act_name: Indian Contract Act 1872, output_file: contract_law.json, refs: ["10"]}
+      - {type: corpus, topic: Torts, output_file: torts.json}
+
+Job fields are the keyword arguments of the matching workflow_* function
+in json_scraper_generator.py, plus optional "id" and "retries". Jobs that
+write the same deck (or the same section index / change state) never run
+at the same time; an expand job holds every deck in the topics index.
+
+The report lists each job's status (ok, unchanged, failed, skipped),
+duration, attempts, deck card counts before and after, and error. A job
+whose LLM calls failed is 'failed' (and retried) even though the workflows
+themselves only log those errors.
+Exit status: 0 when no job failed, 1 when any did (or with --strict when
+any left its decks unchanged), 2 for an invalid manifest or configuration.
+"""
+
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional
+
+# PyYAML is imported only for .yaml manifests
+HAS_YAML = importlib.util.find_spec('yaml') is not None
+
+import json_scraper_generator as jsg
+from generator_core import LLM_THROTTLE, llm_errors
+from instrumentation import METRICS
+
+DATA_DIR = 'data'
+EXIT_OK, EXIT_FAILED, EXIT_INVALID = 0, 1, 2
+RETRY_BACKOFF = 5.0
+
+# type -> (workflow, argument naming the deck it writes)
+JOB_TYPES = {
+    'scrape': (jsg.workflow_scrape_and_generate, 'output_file'),
+    'corpus': (jsg.workflow_generate_from_corpus, 'output_file'),
+    'act': (jsg.workflow_generate_from_act, 'output_file'),
+    'expand': (jsg.workflow_expand_all_topics, None),
+    'create': (jsg.workflow_create_new_topic, 'filename'),
+    'add': (jsg.workflow_add_cards, 'filename'),
+}
+# Workflows that sleep between requests; the shared throttles replace it
+SLEEPING_TYPES = {'scrape', 'corpus', 'act', 'expand'}
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def load_manifest(path: str) -> Dict:
+    """Read a .yaml/.yml or .json manifest"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if Path(path).suffix.lower() in ('.yaml', '.yml'):
+        if not HAS_YAML:
+            raise ManifestError("YAML manifests need PyYAML (pip install pyyaml); or use JSON")
+        import yaml
+        try:
+            manifest = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ManifestError(f"{path}: {e}")
+    else:
+        manifest = json.loads(text)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('jobs'), list):
+        raise ManifestError("Manifest must be a mapping with a 'jobs' list")
+    return manifest
+
+
+def index_decks(data_dir: str = DATA_DIR) -> List[str]:
+    try:
+        with open(Path(data_dir) / 'topics_index.json', 'r', encoding='utf-8') as f:
+            return [topic['file'] for topic in json.load(f).get('topics', [])]
+    except FileNotFoundError:
+        return []
+
+
+def count_cards(files: List[str], data_dir: str = DATA_DIR) -> Dict[str, Optional[int]]:
+    """Cards per deck; None for decks that do not exist"""
+    counts = {}
+    for filename in files:
+        path = Path(data_dir) / filename
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                counts[filename] = len(json.load(f).get('flashcards', []))
+        else:
+            counts[filename] = None
+    return counts
+
+
+class Job:
+    """One manifest entry, validated against its workflow's signature"""
+
+    def __init__(self, spec: Dict, number: int, defaults: Dict):
+        if not isinstance(spec, dict):
+            raise ManifestError(f"job {number}: must be a mapping")
+        spec = {**defaults, **spec}
+        self.type = spec.pop('type', None)
+        if self.type not in JOB_TYPES:
+            raise ManifestError(f"job {number}: type must be one of {', '.join(JOB_TYPES)}, got {self.type!r}")
+        self.id = str(spec.pop('id', f"{number}-{self.type}"))
+        self.retries = int(spec.pop('retries', 0))
+        self.func, deck_arg = JOB_TYPES[self.type]
+        if self.type in SLEEPING_TYPES:
+            spec.setdefault('delay', 0)
+
+        # Defaults apply only to the workflows that take them (e.g. delay)
+        params = inspect.signature(self.func).parameters
+        spec = {key: value for key, value in spec.items() if key in params or key not in defaults}
+        try:
+            inspect.signature(self.func).bind(**spec)
+        except TypeError as e:
+            raise ManifestError(f"job {self.id}: {e}")
+        self.args = spec
+        self.deck = spec.get(deck_arg) if deck_arg else None
+
+    def decks(self, data_dir: str = DATA_DIR) -> List[str]:
+        return [self.deck] if self.deck else index_decks(data_dir)
+
+    def lock_keys(self, data_dir: str = DATA_DIR) -> List[str]:
+        """Files this job reads and rewrites, locked for its whole run"""
+        keys = set(self.decks(data_dir))
+        if self.args.get('incremental') or self.args.get('refresh'):
+            keys.add('data/change_state.json')
+        if self.type == 'act':
+            keys.add(self.args.get('index_path', 'data/sections_index.json'))
+        return sorted(keys)
+
+
+class FileLocks:
+    """Named locks, always taken in sorted order so jobs cannot deadlock"""
+
+    def __init__(self):
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def acquire(self, keys: List[str]) -> List[threading.Lock]:
+        with self._guard:
+            locks = [self._locks.setdefault(key, threading.Lock()) for key in sorted(keys)]
+        for lock in locks:
+            lock.acquire()
+        return locks
+
+    @staticmethod
+    def release(locks: List[threading.Lock]):
+        for lock in reversed(locks):
+            lock.release()
+
+
+class BatchRunner:
+    """Runs manifest jobs on a shared pool with shared LLM / HTTP throttles"""
+
+    def __init__(self, manifest: Dict, workers: Optional[int] = None, fail_fast: bool = False,
+                 data_dir: str = DATA_DIR):
+        defaults = manifest.get('defaults') or {}
+        if not isinstance(defaults, dict):
+            raise ManifestError("'defaults' must be a mapping")
+        self.jobs = [Job(spec, i, defaults) for i, spec in enumerate(manifest['jobs'], 1)]
+        ids = [job.id for job in self.jobs]
+        duplicates = sorted({job_id for job_id in ids if ids.count(job_id) > 1})
+        if duplicates:
+            raise ManifestError(f"duplicate job ids: {', '.join(duplicates)}")
+
+        self.workers = max(1, int(workers or manifest.get('workers', 1)))
+        limits = manifest.get('rate_limit') or {}
+        per_minute = float(limits.get('llm_per_minute', 0))
+        self.llm_delay = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.http_delay = float(limits.get('http_delay', 0))
+        self.fail_fast = fail_fast
+        self.data_dir = data_dir
+        self.locks = FileLocks()
+        self._stop = threading.Event()
+
+    def run_job(self, job: Job) -> Dict:
+        result = {'id': job.id, 'type': job.type, 'status': 'skipped', 'attempts': 0,
+                  'seconds': 0.0, 'decks': {}, 'error': None}
+        if self._stop.is_set():
+            return result
+
+        locks = self.locks.acquire(job.lock_keys(self.data_dir))
+        try:
+            decks = job.decks(self.data_dir)
+            before = count_cards(decks, self.data_dir)
+            start = time.perf_counter()
+            for attempt in range(job.retries + 1):
+                result['attempts'] = attempt + 1
+                try:
+                    with METRICS.span('batch.job', job=job.id, type=job.type), llm_errors() as errors:
+                        job.func(**job.args)
+                        # The workflows log LLM failures and carry on; a job that
+                        # could not reach the LLM must not pass as 'unchanged'
+                        if errors:
+                            raise RuntimeError(f"{len(errors)} LLM call(s) failed, last: {errors[-1]}")
+                    result['error'] = None
+                    break
+                except Exception as e:
+                    result['error'] = f"{type(e).__name__}: {e}"
+                    print(f"❌ Job {job.id} attempt {attempt + 1}: {result['error']}")
+                    traceback.print_exc()
+                    if attempt < job.retries:
+                        time.sleep(RETRY_BACKOFF * (attempt + 1))
+            result['seconds'] = round(time.perf_counter() - start, 3)
+
+            # expand may have created decks listed after it started; count what exists now
+            after = count_cards(job.decks(self.data_dir), self.data_dir)
+            result['decks'] = {name: {'before': before.get(name), 'after': count}
+                               for name, count in after.items()}
+            if result['error']:
+                result['status'] = 'failed'
+            elif job.type == 'create' and after.get(job.deck) is None:
+                result['status'] = 'failed'
+                result['error'] = "topic file was not created"
+            elif any(before.get(name) != count for name, count in after.items()):
+                result['status'] = 'ok'
+            else:
+                result['status'] = 'unchanged'
+        finally:
+            self.locks.release(locks)
+
+        METRICS.incr('batch.jobs', status=result['status'])
+        if result['status'] == 'failed' and self.fail_fast:
+            self._stop.set()
+        print(f"{'✅' if result['status'] != 'failed' else '❌'} Job {job.id}: {result['status']} "
+              f"({result['seconds']:.1f}s)")
+        return result
+
+    def run(self) -> Dict:
+        """Run every job; returns the report"""
+        started = datetime.now()
+        LLM_THROTTLE.delay = self.llm_delay
+        jsg.HTTP_THROTTLE.delay = self.http_delay
+        print(f"🚀 {len(self.jobs)} jobs on {self.workers} workers "
+              f"(LLM: {'%.1fs apart' % self.llm_delay if self.llm_delay else 'unthrottled'}, "
+              f"HTTP: {self.http_delay:g}s per host)")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self.run_job, self.jobs))
+
+        summary = {status: 0 for status in ('ok', 'unchanged', 'failed', 'skipped')}
+        for result in results:
+            summary[result['status']] += 1
+        return {
+            'started': started.isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - start, 3),
+            'workers': self.workers,
+            'summary': summary,
+            'jobs': results,
+        }
+
+
+def exit_status(report: Dict, strict: bool = False) -> int:
+    summary = report['summary']
+    if summary['failed'] or summary['skipped'] or (strict and summary['unchanged']):
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+def write_report(report: Dict, path: str):
+    """Write the report atomically"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run generator workflows from a job manifest")
+    parser.add_argument('manifest', help="YAML or JSON job manifest")
+    parser.add_argument('--report', help="Results report (default: reports/batch_<timestamp>.json)")
+    parser.add_argument('--workers', type=int, help="Override the manifest's worker count")
+    parser.add_argument('--dry-run', action='store_true', help="Validate the manifest and list the jobs")
+    parser.add_argument('--fail-fast', action='store_true', help="Skip jobs not yet started after a failure")
+    parser.add_argument('--strict', action='store_true', help="Exit 1 when a job left its decks unchanged")
+    args = parser.parse_args()
+
+    try:
+        runner = BatchRunner(load_manifest(args.manifest), workers=args.workers, fail_fast=args.fail_fast)
+    except (OSError, ValueError) as e:
+        # ManifestError, malformed JSON, bad numbers
+        print(f"❌ Invalid manifest: {e}")
+        sys.exit(EXIT_INVALID)
+
+    if args.dry_run:
+        for job in runner.jobs:
+            print(f"   {job.id:<20} {job.type:<7} locks: {', '.join(job.lock_keys()) or '-'}")
+        print(f"✅ {len(runner.jobs)} jobs valid")
+        sys.exit(EXIT_OK)
+
+    provider = os.environ.get('LLM_PROVIDER', 'groq')
+    if not os.environ.get('LLM_API_KEY') and provider != 'ollama':
+        print("❌ Set LLM_API_KEY (or LLM_PROVIDER=ollama)")
+        sys.exit(EXIT_INVALID)
+
+    report = runner.run()
+    report['manifest'] = args.manifest
+    report_path = args.report or f"reports/batch_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    write_report(report, report_path)
+
+    summary = report['summary']
+    print(f"\n📊 {summary['ok']} ok, {summary['unchanged']} unchanged, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped in {report['seconds']:.1f}s")
+    print(f"💾 Report: {report_path}")
+    METRICS.finish_run()
+    sys.exit(exit_status(report, args.strict))
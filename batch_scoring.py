@@ -0,0 +1,246 @@
+"""
+AIBE Batch Scoring
+Vectorized scoring of mock-test submissions and classical item statistics
+
+Answer sheets are int8 matrices (students x questions) holding the chosen
+option index, -1 for unanswered. Scoring is one comparison against the
+answer key; per-subject scores are a product with a subjects x questions
+mask matrix.
+
+    scorer = BatchScorer.from_test_file('mock_test_1.json')
+    students, sheets = scorer.load_submissions('attempts.jsonl')
+    report = scorer.score(sheets)
+    items = scorer.item_statistics(sheets)
+
+Submissions use the attempt log format of adaptive_tests.py:
+    {"user": "alice", "source": "mock_test_1", "answers": {"1": 3, "2": 0}}
+
+Item statistics:
+    difficulty       share of students answering correctly (p-value)
+    discrimination   upper 27% minus lower 27% p-value (Kelley's D)
+    point_biserial   correlation of the item with the rest of the test
+"""
+
+import json
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+UNANSWERED = -1
+NOT_PRESENTED = -2   # question absent from a (partial) sheet, see sheets_from_answers
+GROUP_FRACTION = 0.27
+
+
+def item_moments(correct: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Sufficient statistics of a students x questions 0/1 matrix
+
+    Moments from separate batches add up, so item statistics can be updated
+    without keeping the raw sheets.
+    """
+    x = correct.astype(np.float64)
+    totals = x.sum(axis=1)
+    return {
+        'n': np.float64(x.shape[0]),
+        'sum_x': x.sum(axis=0),
+        'sum_xt': x.T @ totals,
+        'sum_t': totals.sum(),
+        'sum_t2': (totals * totals).sum(),
+    }
+
+
+def merge_moments(a: Optional[Dict], b: Dict) -> Dict:
+    """Moments of two batches combined (a may be None for the first batch)"""
+    if a is None:
+        return {key: np.array(value, dtype=np.float64) for key, value in b.items()}
+    return {key: a[key] + b[key] for key in a}
+
+
+def moment_statistics(moments: Dict) -> Dict[str, np.ndarray]:
+    """p-values and corrected point-biserial correlations from item_moments"""
+    n = moments['n']
+    p = moments['sum_x'] / n
+    mean_t = moments['sum_t'] / n
+    var_t = moments['sum_t2'] / n - mean_t ** 2
+    var_x = p * (1 - p)
+    cov_xt = moments['sum_xt'] / n - p * mean_t
+    # Correlate each item with the total of the other items
+    cov_rest = cov_xt - var_x
+    var_rest = var_t + var_x - 2 * cov_xt
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = cov_rest / np.sqrt(var_x * var_rest)
+    k = len(p)
+    reliability = (k / (k - 1)) * (1 - var_x.sum() / var_t) if k > 1 and var_t > 0 else float('nan')
+    return {'difficulty': p, 'point_biserial': np.nan_to_num(r), 'kr20': reliability}
+
+
+class BatchScorer:
+    """Answer key, subject masks and vectorized scoring for one test"""
+
+    def __init__(self, questions: List[Dict], passing_marks: Optional[float] = None,
+                 negative_marking: float = 0.0, source: Optional[str] = None):
+        """
+        Args:
+            questions: Test questions (id, subject, correct)
+            passing_marks: Pass threshold on the total score (default 40%)
+            negative_marking: Marks deducted per wrong (answered) question
+            source: Attempt-log source this test's submissions carry
+        """
+        self.questions = questions
+        self.ids = [q['id'] for q in questions]
+        self.columns = {str(qid): i for i, qid in enumerate(self.ids)}
+        self.key = np.array([q['correct'] for q in questions], dtype=np.int8)
+        self.subjects = sorted({q['subject'] for q in questions})
+        subject_index = {s: i for i, s in enumerate(self.subjects)}
+        self.masks = np.zeros((len(self.subjects), len(questions)), dtype=np.int32)
+        for column, question in enumerate(questions):
+            self.masks[subject_index[question['subject']], column] = 1
+        # float32 so the per-subject product goes through BLAS (exact for counts < 2**24)
+        self._mask_columns = self.masks.T.astype(np.float32)
+        self.passing_marks = passing_marks if passing_marks is not None else 0.4 * len(questions)
+        self.negative_marking = negative_marking
+        self.source = source
+
+    @classmethod
+    def from_test_file(cls, path: str, negative_marking: float = 0.0) -> 'BatchScorer':
+        """Mock test JSON (test_id, passing_marks, questions) or the previous-years bank"""
+        with open(path, 'r', encoding='utf-8') as f:
+            test = json.load(f)
+        source = f"mock_test_{test['test_id']}" if 'test_id' in test else 'pyq'
+        return cls(test['questions'], test.get('passing_marks'), negative_marking, source)
+
+    # ========== SHEETS ==========
+
+    def sheets_from_answers(self, answers: List[Dict], absent: int = UNANSWERED) -> np.ndarray:
+        """
+        Matrix from {question_id: option} dicts (unknown ids are ignored)
+
+        absent: cell value for questions missing from a sheet; NOT_PRESENTED
+        keeps them apart from questions shown but left blank
+        """
+        sheets = np.full((len(answers), len(self.ids)), absent, dtype=np.int8)
+        columns = self.columns
+        for row, sheet in enumerate(answers):
+            for qid, option in sheet.items():
+                column = columns.get(str(qid))
+                if column is not None:
+                    sheets[row, column] = UNANSWERED if option is None else option
+        return sheets
+
+    def load_submissions(self, path: str) -> Tuple[List[str], np.ndarray]:
+        """Students and sheets from a JSONL attempt log (other sources are skipped)"""
+        students, answers = [], []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                attempt = json.loads(line)
+                if self.source and attempt.get('source', self.source) != self.source:
+                    continue
+                students.append(attempt.get('user', str(len(students))))
+                answers.append(attempt['answers'])
+        return students, self.sheets_from_answers(answers)
+
+    # ========== SCORING ==========
+
+    def correct_matrix(self, sheets: np.ndarray) -> np.ndarray:
+        return sheets == self.key
+
+    def score(self, sheets: np.ndarray) -> Dict:
+        """Totals, pass flags and per-subject scores for every student"""
+        correct = self.correct_matrix(sheets)
+        answered = sheets != UNANSWERED
+        right = correct.sum(axis=1)
+        wrong = answered.sum(axis=1) - right
+        totals = right - self.negative_marking * wrong
+        by_subject = (correct.astype(np.float32) @ self._mask_columns).astype(np.int32)
+        return {
+            'totals': totals,
+            'correct': right,
+            'wrong': wrong,
+            'unanswered': (~answered).sum(axis=1),
+            'passed': totals >= self.passing_marks,
+            'by_subject': by_subject,
+            'subject_max': self.masks.sum(axis=1),
+        }
+
+    def summary(self, report: Dict) -> Dict:
+        """Cohort-level numbers from a score() report"""
+        totals = report['totals']
+        subject_pct = report['by_subject'].mean(axis=0) / np.maximum(report['subject_max'], 1) * 100
+        return {
+            'students': int(len(totals)),
+            'mean': float(totals.mean()) if len(totals) else 0.0,
+            'median': float(np.median(totals)) if len(totals) else 0.0,
+            'std': float(totals.std()) if len(totals) else 0.0,
+            'pass_rate': float(report['passed'].mean()) if len(totals) else 0.0,
+            'subjects': {s: round(float(pct), 1) for s, pct in zip(self.subjects, subject_pct)},
+        }
+
+    # ========== ITEM STATISTICS ==========
+
+    def item_statistics(self, sheets: np.ndarray) -> Dict[str, np.ndarray]:
+        """Per-question difficulty, discrimination, point-biserial and option counts"""
+        correct = self.correct_matrix(sheets)
+        stats = moment_statistics(item_moments(correct))
+
+        # Kelley's upper/lower 27% groups by total score
+        totals = correct.sum(axis=1)
+        group = max(1, int(round(len(totals) * GROUP_FRACTION)))
+        order = np.argsort(totals, kind='stable')
+        lower = correct[order[:group]].mean(axis=0)
+        upper = correct[order[-group:]].mean(axis=0)
+        stats['discrimination'] = upper - lower
+
+        options = int(max(self.key.max(), sheets.max(initial=0))) + 1
+        stats['option_counts'] = np.stack([(sheets == o).sum(axis=0) for o in range(options)])
+        stats['unanswered'] = (sheets == UNANSWERED).sum(axis=0)
+        return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="AIBE batch scoring")
+    parser.add_argument('test', help="Mock test JSON (e.g. mock_test_1.json)")
+    parser.add_argument('submissions', help="JSONL attempt log")
+    parser.add_argument('--negative', type=float, default=0.0, help="Marks deducted per wrong answer")
+    parser.add_argument('--csv', help="Write per-student scores to this CSV")
+    parser.add_argument('--items', type=int, default=10, help="Show the N least discriminating items")
+    args = parser.parse_args()
+
+    scorer = BatchScorer.from_test_file(args.test, args.negative)
+    t0 = time.perf_counter()
+    students, sheets = scorer.load_submissions(args.submissions)
+    t1 = time.perf_counter()
+    report = scorer.score(sheets)
+    items = scorer.item_statistics(sheets)
+    t2 = time.perf_counter()
+    summary = scorer.summary(report)
+
+    print("AIBE Batch Scoring")
+    print("=" * 70)
+    print(f"   Students: {summary['students']} (loaded in {t1 - t0:.2f}s, scored in {t2 - t1:.3f}s)")
+    print(f"   Mean: {summary['mean']:.1f} | Median: {summary['median']:.1f} | SD: {summary['std']:.1f}")
+    print(f"   Pass rate (>= {scorer.passing_marks:g}): {summary['pass_rate']:.1%} | KR-20: {items['kr20']:.2f}")
+    print("\n📚 Mean score by subject:")
+    for subject, pct in sorted(summary['subjects'].items(), key=lambda x: x[1]):
+        print(f"   {subject:.<45} {pct:5.1f}%")
+
+    print("\n⚠️  Least discriminating items:")
+    for column in np.argsort(items['discrimination'])[:args.items]:
+        print(f"   Q{scorer.ids[column]:<4} p={items['difficulty'][column]:.2f} "
+              f"D={items['discrimination'][column]:+.2f} r={items['point_biserial'][column]:+.2f}")
+
+    if args.csv:
+        import csv
+
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['student', 'total', 'correct', 'wrong', 'unanswered', 'passed'] + scorer.subjects)
+            for i, student in enumerate(students):
+                writer.writerow([student, float(report['totals'][i]), int(report['correct'][i]),
+                                 int(report['wrong'][i]), int(report['unanswered'][i]), bool(report['passed'][i])]
+                                + report['by_subject'][i].tolist())
+        print(f"\n💾 Wrote {len(students)} rows to {args.csv}")
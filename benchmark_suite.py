@@ -0,0 +1,800 @@
+"""
+AIBE Benchmark Suite
+Microbenchmarks and end-to-end workflow timings on synthetic data
+
+Usage:
+    python benchmark_suite.py                          # default sizes 1e3, 1e4
+    python benchmark_suite.py --sizes 1000,100000,1000000 --only pyq.*
+    python benchmark_suite.py --output bench.json
+    python benchmark_suite.py --compare old.json --output new.json
+
+Results are written as JSON so runs from different commits can be compared
+with --compare (exit status 1 when anything regressed past --threshold).
+"""
+
+import argparse
+import fnmatch
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Callable, Optional
+
+
+SUBJECTS = [
+    'Constitutional Law', 'Criminal Law - IPC', 'Criminal Procedure Code',
+    'Contract Law', 'Civil Procedure Code', 'Evidence Act', 'Property Law',
+    'Family Law', 'Torts', 'Company Law', 'Labour Law', 'Professional Ethics',
+    'Arbitration', 'Jurisprudence'
+]
+YEARS = ['AIBE XV', 'AIBE XVI', 'AIBE XVII', 'AIBE XVIII', 'AIBE XIX']
+DIFFICULTIES = ['Easy', 'Medium', 'Hard']
+TOPIC_FILES = [
+    ('Contract Law', 'Indian Contract Act, 1872', 'contract_law.json'),
+    ('Constitutional Law', 'Indian Constitution', 'constitutional_law.json'),
+    ('Criminal Law', 'IPC, CrPC, Evidence Act', 'criminal_law.json'),
+    ('Law of Torts', 'Civil Wrongs & Remedies', 'torts.json'),
+    ('Property Law', 'Transfer of Property Act, 1882', 'property_law.json'),
+    ('Family Law', 'Hindu Marriage Act, Muslim Law', 'family_law.json'),
+    ('Company Law', 'Companies Act, 2013', 'company_law.json'),
+    ('Professional Ethics', 'Advocates Act, 1961 & BCI Rules', 'professional_ethics.json'),
+    ('Civil Procedure Code', 'CPC, 1908', 'cpc.json'),
+    ('Evidence Act', 'Indian Evidence Act, 1872', 'evidence_act.json'),
+    ('Labour Law', 'Industrial Disputes Act', 'labour_law.json'),
+    ('Company Law II', 'Insolvency and Bankruptcy Code', 'company_law_2.json'),
+    ('Arbitration', 'Arbitration and Conciliation Act, 1996', 'arbitration.json'),
+]
+WORDS = ('section article court appeal contract offence evidence property consent '
+         'agreement liability tort writ petition decree suit witness accused bail '
+         'arbitration award company director partner marriage divorce maintenance').split()
+
+
+# ========== SYNTHETIC DATA ==========
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def make_question_bank(n: int, seed: int = 42) -> Dict:
+    """Synthetic previous-years collection with n questions"""
+    rng = random.Random(seed)
+    questions = []
+    for i in range(1, n + 1):
+        q = {
+            'id': i,
+            'year': rng.choice(YEARS),
+            'subject': rng.choice(SUBJECTS),
+            'question': _sentence(rng, 14) + '?',
+            'options': [_sentence(rng, 3) for _ in range(4)],
+            'correct': rng.randrange(4),
+            'explanation': _sentence(rng, 20) + '.',
+            'difficulty': rng.choice(DIFFICULTIES)
+        }
+        if rng.random() < 0.6:
+            q['section'] = f"Section {rng.randint(1, 500)}"
+        if rng.random() < 0.2:
+            q['case_law'] = f"{_sentence(rng, 1)} v. State of {_sentence(rng, 1)}"
+        questions.append(q)
+
+    return {
+        'collection_name': 'Synthetic AIBE Question Bank',
+        'total_questions': n,
+        'years_covered': YEARS,
+        'questions': questions
+    }
+
+
+def make_cards(n: int, seed: int = 7, prefix: str = 'Q') -> List[Dict]:
+    """Synthetic flashcards with unique questions"""
+    rng = random.Random(seed)
+    return [{'q': f"{prefix}{i}: {_sentence(rng, 10)}?", 'a': _sentence(rng, 30) + '.'}
+            for i in range(n)]
+
+
+def make_deck(n: int, topic_id: int = 1, title: str = 'Contract Law',
+              subtitle: str = 'Indian Contract Act, 1872') -> Dict:
+    """Synthetic topic deck with n cards"""
+    return {
+        'topic_id': topic_id,
+        'topic_title': title,
+        'topic_subtitle': subtitle,
+        'flashcards': make_cards(n, seed=topic_id)
+    }
+
+
+def make_llm_response(n: int) -> str:
+    """Synthetic LLM reply wrapping n cards in a markdown fence"""
+    cards = json.dumps(make_cards(n, seed=99, prefix='LLM'), indent=2, ensure_ascii=False)
+    return f"Here are your flashcards:\n```json\n{cards}\n```\nGood luck!"
+
+
+def make_judgment_page(n: int, seed: int = 3) -> bytes:
+    """Synthetic Indian Kanoon style judgment page with n paragraphs plus page chrome"""
+    rng = random.Random(seed)
+    chrome = ''.join(f'<li><a href="/browse/{i}/">{_sentence(rng, 3)}</a></li>' for i in range(200))
+    paragraphs = ''.join(f'<p id="p_{i}">{_sentence(rng, 40)} <a href="/doc/{i}/">{_sentence(rng, 2)}</a>.</p>'
+                         for i in range(n))
+    page = (f'<html><head><title>Judgment</title><script>var s = "{_sentence(rng, 50)}";</script>'
+            f'<style>p {{ margin: 0 }}</style></head><body><ul class="nav">{chrome}</ul>'
+            f'<div class="judgments"><h2 class="doc_title">{_sentence(rng, 6)}</h2>{paragraphs}</div>'
+            f'<div class="footer">{chrome}</div></body></html>')
+    return page.encode('utf-8')
+
+
+def write_json(path: Path, data: Dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+# ========== HARNESS ==========
+
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+class Measured(float):
+    """Seconds returned by a timed callable that measures itself (used instead of wall time)"""
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark
+
+    The decorated function receives a BenchContext, does its setup, and
+    returns a zero-argument callable that is timed.
+    """
+    def decorator(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return decorator
+
+
+class BenchContext:
+    """Per-size workspace with lazily built synthetic datasets"""
+
+    def __init__(self, size: int, workdir: Path, pages_dir: Optional[str] = None):
+        self.size = size
+        self.workdir = workdir
+        self.pages_dir = pages_dir
+        self._cache = {}
+
+    def cached(self, key: str, factory: Callable):
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    def close(self):
+        """Release cached resources (servers, handles)"""
+        for value in self._cache.values():
+            if hasattr(value, 'close'):
+                value.close()
+
+    @property
+    def question_bank(self) -> Dict:
+        return self.cached('question_bank', lambda: make_question_bank(self.size))
+
+    @property
+    def question_bank_path(self) -> Path:
+        def build():
+            path = self.workdir / 'question_bank.json'
+            write_json(path, self.question_bank)
+            return path
+        return self.cached('question_bank_path', build)
+
+    @property
+    def html_pages(self) -> List[bytes]:
+        """Saved pages from --pages, or one synthetic judgment page of size paragraphs"""
+        def build():
+            if self.pages_dir:
+                return [p.read_bytes() for p in sorted(Path(self.pages_dir).glob('*.htm*'))]
+            return [make_judgment_page(self.size)]
+        return self.cached('html_pages', build)
+
+    @property
+    def manager(self):
+        from aibe_pyq_manager import AIBEPreviousYearsManager
+        return self.cached('manager', lambda: AIBEPreviousYearsManager(str(self.question_bank_path)))
+
+
+def run_timed(fn: Callable, repeat: int, min_time: float) -> List[float]:
+    """Time fn repeat times (at least once, and until min_time has elapsed)"""
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < repeat or (time.perf_counter() - started < min_time and len(timings) < repeat * 10):
+        with redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            measured = fn()
+            timings.append(measured if isinstance(measured, Measured) else time.perf_counter() - t0)
+    return timings
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(sizes: List[int], patterns: List[str], repeat: int = 5,
+              min_time: float = 0.2, pages_dir: Optional[str] = None) -> Dict:
+    """Run every matching benchmark at every size"""
+    names = [name for name in BENCHMARKS
+             if not patterns or any(fnmatch.fnmatch(name, p) for p in patterns)]
+    results = []
+
+    for size in sizes:
+        workdir = Path(tempfile.mkdtemp(prefix=f'aibe_bench_{size}_'))
+        ctx = BenchContext(size, workdir, pages_dir)
+        try:
+            for name in names:
+                try:
+                    with redirect_stdout(io.StringIO()):
+                        fn = BENCHMARKS[name](ctx)
+                    if fn is None:
+                        continue
+                    timings = run_timed(fn, repeat, min_time)
+                except Exception as e:
+                    print(f"   ❌ {name} [n={size}]: {e}")
+                    results.append({'name': name, 'size': size, 'error': str(e)})
+                    continue
+
+                result = {
+                    'name': name,
+                    'size': size,
+                    'runs': len(timings),
+                    'min_s': min(timings),
+                    'median_s': statistics.median(timings),
+                    'mean_s': statistics.fmean(timings),
+                    'stdev_s': statistics.stdev(timings) if len(timings) > 1 else 0.0
+                }
+                results.append(result)
+                print(f"   {name:.<45} n={size:<8} median {result['median_s'] * 1000:>10.3f} ms")
+        finally:
+            ctx.close()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'suite': 'aibe-benchmarks',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': sizes,
+        'results': results
+    }
+
+
+def compare_results(old: Dict, new: Dict, threshold: float = 1.2) -> List[Dict]:
+    """Return rows comparing median times; 'regressed' is set past threshold"""
+    old_index = {(r['name'], r['size']): r for r in old['results'] if 'median_s' in r}
+    rows = []
+    for r in new['results']:
+        before = old_index.get((r['name'], r['size']))
+        if not before or 'median_s' not in r:
+            continue
+        ratio = r['median_s'] / before['median_s'] if before['median_s'] else float('inf')
+        rows.append({
+            'name': r['name'],
+            'size': r['size'],
+            'old_s': before['median_s'],
+            'new_s': r['median_s'],
+            'ratio': ratio,
+            'regressed': ratio > threshold
+        })
+    return rows
+
+
+# ========== QUESTION BANK BENCHMARKS ==========
+
+@benchmark('pyq.load')
+def bench_pyq_load(ctx: BenchContext):
+    from aibe_pyq_manager import AIBEPreviousYearsManager
+    path = str(ctx.question_bank_path)
+    return lambda: AIBEPreviousYearsManager(path)
+
+
+@benchmark('pyq.filter_by_subject')
+def bench_pyq_filter_subject(ctx: BenchContext):
+    manager = ctx.manager
+    return lambda: [manager.filter_by_subject(s) for s in SUBJECTS]
+
+
+@benchmark('pyq.filter_by_year')
+def bench_pyq_filter_year(ctx: BenchContext):
+    manager = ctx.manager
+    return lambda: [manager.filter_by_year(y) for y in YEARS]
+
+
+@benchmark('pyq.filter_by_difficulty')
+def bench_pyq_filter_difficulty(ctx: BenchContext):
+    manager = ctx.manager
+    return lambda: [manager.filter_by_difficulty(d) for d in DIFFICULTIES]
+
+
+@benchmark('pyq.stats')
+def bench_pyq_stats(ctx: BenchContext):
+    manager = ctx.manager
+    return lambda: (manager.get_subject_wise_stats(), manager.get_year_wise_stats(),
+                    manager.get_difficulty_stats())
+
+
+@benchmark('pyq.difficulty_by_subject')
+def bench_pyq_difficulty_by_subject(ctx: BenchContext):
+    manager = ctx.manager
+    return lambda: (manager.get_difficulty_by_subject(),
+                    [manager.cube.count(subject=s, has_case_law=True) for s in SUBJECTS])
+
+
+@benchmark('pyq.citation_graph')
+def bench_pyq_citation_graph(ctx: BenchContext):
+    from citation_graph import CitationGraph
+    questions = ctx.manager.questions
+
+    def run():
+        graph = CitationGraph()
+        graph.add_questions(questions)
+        return graph.citing('Section 34'), graph.top_cases()
+    return run
+
+
+@benchmark('pyq.search_by_keyword')
+def bench_pyq_search(ctx: BenchContext):
+    manager = ctx.manager
+    return lambda: manager.search_by_keyword('section 34')
+
+
+@benchmark('pyq.get_by_id')
+def bench_pyq_get_by_id(ctx: BenchContext):
+    manager = ctx.manager
+    ids = random.Random(1).sample(range(1, ctx.size + 1), min(100, ctx.size))
+    return lambda: [manager.get_by_id(i) for i in ids]
+
+
+@benchmark('pyq.sample_random')
+def bench_pyq_sample(ctx: BenchContext):
+    manager = ctx.manager
+    return lambda: manager.get_random_questions(100)
+
+
+@benchmark('pyq.create_custom_test')
+def bench_pyq_custom_test(ctx: BenchContext):
+    manager = ctx.manager
+    distribution = {s: 7 for s in SUBJECTS}
+    return lambda: manager.create_custom_test(distribution)
+
+
+# ========== SPACED REPETITION BENCHMARKS ==========
+
+@benchmark('srs.next_due')
+def bench_srs_next_due(ctx: BenchContext):
+    from srs_scheduler import Scheduler, schedule
+    rng = random.Random(5)
+    scheduler = Scheduler('bench', str(ctx.workdir / 'reviews'))
+    now = 1_700_000_000
+    scheduler.records = {f"deck_{i % 13}.json:{i:012x}": schedule(None, rng.randint(1, 4),
+                                                                    now - rng.randint(0, 90) * 86400)
+                         for i in range(ctx.size)}
+    scheduler._rebuild_heap()
+    return lambda: scheduler.next_due(50, now=now)
+
+
+@benchmark('srs.review')
+def bench_srs_review(ctx: BenchContext):
+    from srs_scheduler import Scheduler
+    scheduler = Scheduler('bench_review', str(ctx.workdir / 'reviews'))
+    ids = [f"deck.json:{i:012x}" for i in range(ctx.size)]
+    ratings = [random.Random(6).randint(1, 4) for _ in range(100)]
+
+    def run():
+        for i in range(1000):
+            scheduler.review(ids[i % len(ids)], ratings[i % 100], now=1_700_000_000 + i)
+    return run
+
+
+# ========== ADAPTIVE TEST BENCHMARKS ==========
+
+def _attempt_setup(ctx: BenchContext):
+    """Question pool over the synthetic bank plus per-user stats from size answers"""
+    from adaptive_tests import QuestionPool, AttemptStats
+
+    def build():
+        pool = QuestionPool(str(ctx.question_bank_path), mock_paths=())
+        stats = AttemptStats(str(ctx.workdir / 'attempt_stats.json'))
+        rng = random.Random(8)
+        keys = list(pool.questions)
+        for start in range(0, ctx.size, 100):
+            answers = {key.split(':', 1)[1]: rng.randint(0, 3) for key in rng.sample(keys, min(100, len(keys)))}
+            stats.record_attempt({'user': f"user{start % 7}", 'source': 'pyq',
+                                  'timestamp': 1_700_000_000 + start, 'answers': answers}, pool)
+        return pool, stats
+    return ctx.cached('attempts', build)
+
+
+@benchmark('adaptive.ingest')
+def bench_adaptive_ingest(ctx: BenchContext):
+    from adaptive_tests import AttemptStats
+    pool, _ = _attempt_setup(ctx)
+    log_path = ctx.workdir / 'attempts.jsonl'
+    if not log_path.exists():
+        rng = random.Random(9)
+        keys = list(pool.questions)
+        with open(log_path, 'w', encoding='utf-8') as f:
+            for start in range(0, ctx.size, 100):
+                answers = {key.split(':', 1)[1]: rng.randint(0, 3) for key in rng.sample(keys, min(100, len(keys)))}
+                f.write(json.dumps({'user': f"user{start % 7}", 'source': 'pyq', 'answers': answers}) + '\n')
+
+    def run():
+        AttemptStats(str(ctx.workdir / 'ingest_stats.json')).ingest(str(log_path), pool)
+    return run
+
+
+@benchmark('adaptive.assemble_test')
+def bench_adaptive_assemble(ctx: BenchContext):
+    from adaptive_tests import assemble_test
+    pool, stats = _attempt_setup(ctx)
+    return lambda: assemble_test(pool, stats, 'user0', count=100, seed=1, now=1_700_000_000)
+
+
+# ========== SCORING BENCHMARKS ==========
+
+def _scoring_setup(ctx: BenchContext):
+    """Scorer for a 100-question test and size synthetic answer sheets"""
+    import numpy as np
+    from batch_scoring import BatchScorer
+
+    def build():
+        questions = make_question_bank(100)['questions']
+        scorer = BatchScorer(questions, passing_marks=40)
+        rng = np.random.default_rng(10)
+        sheets = rng.integers(-1, 4, size=(ctx.size, len(questions)), dtype=np.int8)
+        return scorer, sheets
+    return ctx.cached('scoring', build)
+
+
+@benchmark('scoring.score')
+def bench_scoring_score(ctx: BenchContext):
+    scorer, sheets = _scoring_setup(ctx)
+    return lambda: scorer.summary(scorer.score(sheets))
+
+
+@benchmark('scoring.item_statistics')
+def bench_scoring_items(ctx: BenchContext):
+    scorer, sheets = _scoring_setup(ctx)
+    return lambda: scorer.item_statistics(sheets)
+
+
+@benchmark('scoring.calibrate_batch')
+def bench_scoring_calibrate(ctx: BenchContext):
+    from batch_scoring import NOT_PRESENTED
+    from item_calibration import presented_moments, calibrate
+    scorer, sheets = _scoring_setup(ctx)
+    # Partial sheets: a quarter of the questions were never shown
+    partial = sheets.copy()
+    partial[:, ::4] = NOT_PRESENTED
+    return lambda: calibrate(presented_moments(scorer, partial))
+
+
+# ========== DECK / GENERATOR BENCHMARKS ==========
+
+@benchmark('deck.add_cards_to_topic')
+def bench_deck_add_cards(ctx: BenchContext):
+    from json_scraper_generator import JSONManager
+    data_dir = ctx.workdir / 'deck_data'
+    json_mgr = JSONManager(str(data_dir))
+    deck = make_deck(ctx.size)
+    new_cards = make_cards(50, seed=1000, prefix='NEW') + deck['flashcards'][:50]
+
+    def run():
+        write_json(data_dir / 'contract_law.json', deck)
+        json_mgr.add_cards_to_topic('contract_law.json', new_cards)
+    return run
+
+
+@benchmark('validate.question_bank')
+def bench_validate_bank(ctx: BenchContext):
+    from data_validator import validate_data
+    bank = ctx.question_bank
+    return lambda: validate_data(bank, 'pyq')
+
+
+@benchmark('validate.deck')
+def bench_validate_deck(ctx: BenchContext):
+    from data_validator import validate_data
+    deck = make_deck(ctx.size)
+    return lambda: validate_data(deck, 'deck')
+
+
+@benchmark('deck.load_topic')
+def bench_deck_load(ctx: BenchContext):
+    from json_scraper_generator import JSONManager
+    data_dir = ctx.workdir / 'deck_load'
+    json_mgr = JSONManager(str(data_dir))
+    write_json(data_dir / 'contract_law.json', make_deck(ctx.size))
+    return lambda: json_mgr.load_topic('contract_law.json')
+
+
+@benchmark('generator.parse_flashcards')
+def bench_parse_flashcards(ctx: BenchContext):
+    from generator_core import FlashcardGenerator
+    generator = FlashcardGenerator()
+    response = make_llm_response(min(ctx.size, 100000))
+    return lambda: generator._parse_flashcards(response)
+
+
+@benchmark('generator.select_context')
+def bench_select_context(ctx: BenchContext):
+    from context_selector import select_context
+    questions = [card['q'] for card in make_cards(ctx.size)]
+    return lambda: select_context(questions, 'Contract Law Indian Contract Act, 1872')
+
+
+# ========== HTML EXTRACTION ==========
+
+def _bench_html_engine(ctx: BenchContext, engine: str):
+    from html_extract import extract_blocks, resolve_engine, RESULT_DIV, JUDGMENT_DIV, WIKI_CONTENT
+    resolve_engine(engine)
+    pages = ctx.html_pages
+    selectors = [RESULT_DIV, JUDGMENT_DIV, WIKI_CONTENT]
+    return lambda: [[b.text for b in extract_blocks(page, selectors, engine=engine)] for page in pages]
+
+
+@benchmark('html.extract_bs4')
+def bench_html_bs4(ctx: BenchContext):
+    return _bench_html_engine(ctx, 'bs4')
+
+
+@benchmark('html.extract_stream')
+def bench_html_stream(ctx: BenchContext):
+    return _bench_html_engine(ctx, 'stream')
+
+
+@benchmark('html.extract_lxml')
+def bench_html_lxml(ctx: BenchContext):
+    return _bench_html_engine(ctx, 'lxml')
+
+
+# ========== DATA API ==========
+
+API_REQUESTS = 200        # per timed run; requests/second = API_REQUESTS / median
+
+
+def _data_server(ctx: BenchContext, cache_size: int):
+    from data_server import DataServer, DataStore
+
+    def build():
+        data_dir = ctx.workdir / 'api_data'
+        _write_topic_tree(data_dir, max(1, ctx.size // len(TOPIC_FILES)))
+        store = DataStore(str(data_dir), str(ctx.workdir), str(ctx.question_bank_path), ())
+        server = DataServer(store, cache_size=cache_size).start()
+        server.close = server.stop
+        return server
+    return ctx.cached(f'data_server_{cache_size}', build)
+
+
+def _bench_api(ctx: BenchContext, cache_size: int, accept: str):
+    from data_server import bench_paths, load_test
+    server = _data_server(ctx, cache_size)
+    paths = bench_paths(server.store)
+    return lambda: load_test(server.url, paths, API_REQUESTS, 4, {'Accept-Encoding': accept})
+
+
+@benchmark('api.requests_cached_gzip')
+def bench_api_cached(ctx: BenchContext):
+    return _bench_api(ctx, 512, 'gzip')
+
+
+@benchmark('api.requests_uncached_gzip')
+def bench_api_uncached(ctx: BenchContext):
+    return _bench_api(ctx, 0, 'gzip')
+
+
+# ========== END-TO-END WORKFLOWS (local fake LLM) ==========
+
+class _MockEnvironment:
+    """Run a workflow inside workdir against a MockLLMServer"""
+
+    def __init__(self, workdir: Path, provider: str = 'openai', latency: float = 0.0):
+        from mock_llm_server import MockLLMServer
+        self.workdir = workdir
+        self.provider = provider
+        self.server = MockLLMServer(latency=latency).start()
+
+    def __enter__(self):
+        self._saved_env = {k: os.environ.get(k) for k in ('LLM_PROVIDER', 'LLM_API_KEY', 'LLM_BASE_URL')}
+        self._saved_cwd = os.getcwd()
+        os.environ['LLM_PROVIDER'] = self.provider
+        os.environ['LLM_API_KEY'] = 'mock'
+        os.environ['LLM_BASE_URL'] = self.server.url if self.provider == 'ollama' else self.server.openai_url
+        os.chdir(self.workdir)
+        return self
+
+    def close(self):
+        self.server.stop()
+
+    def __exit__(self, *exc):
+        os.chdir(self._saved_cwd)
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _mock_workflow(ctx: BenchContext, setup: Callable, workflow: Callable, provider: str = 'groq',
+                   latency: float = 0.0):
+    env = ctx.cached(f'mock_env_{provider}_{latency}', lambda: _MockEnvironment(ctx.workdir, provider, latency))
+
+    def run():
+        with env:
+            setup()
+            workflow()
+    return run
+
+
+def _write_topic_tree(data_dir: Path, cards_per_topic: int):
+    data_dir.mkdir(exist_ok=True)
+    topics = []
+    for topic_id, (title, subtitle, filename) in enumerate(TOPIC_FILES, 1):
+        write_json(data_dir / filename, make_deck(cards_per_topic, topic_id, title, subtitle))
+        topics.append({'id': topic_id, 'title': title, 'subtitle': subtitle,
+                       'file': filename, 'card_count': cards_per_topic})
+    write_json(data_dir / 'topics_index.json', {'topics': topics})
+
+
+@benchmark('workflow.expand_all_topics')
+def bench_workflow_expand_all(ctx: BenchContext):
+    from json_scraper_generator import workflow_expand_all_topics
+    per_topic = max(1, ctx.size // len(TOPIC_FILES))
+    return _mock_workflow(
+        ctx,
+        lambda: _write_topic_tree(ctx.workdir / 'data', per_topic),
+        lambda: workflow_expand_all_topics(min_cards=per_topic + 15, delay=0)
+    )
+
+
+@benchmark('workflow.create_new_topic')
+def bench_workflow_create(ctx: BenchContext):
+    from json_scraper_generator import workflow_create_new_topic
+    return _mock_workflow(
+        ctx,
+        lambda: (ctx.workdir / 'data').mkdir(exist_ok=True),
+        lambda: workflow_create_new_topic(99, 'Benchmark Law', 'Synthetic Act', 'bench_topic.json')
+    )
+
+
+def _bench_expand_json(ctx: BenchContext, workers: int = 1, latency: float = 0.0):
+    from flashcard_generator import FlashcardGenerator, expand_json_flashcards
+    per_topic = max(1, ctx.size // len(TOPIC_FILES))
+    input_file = ctx.workdir / 'flashcards_multi.json'
+    output_file = ctx.workdir / 'flashcards_multi_expanded.json'
+    write_json(input_file, {
+        'topics': [{'id': i, 'title': t, 'subtitle': s} for i, (t, s, _) in enumerate(TOPIC_FILES, 1)],
+        'flashcards': {str(i): make_cards(per_topic, seed=i) for i in range(1, len(TOPIC_FILES) + 1)}
+    })
+
+    def workflow():
+        generator = FlashcardGenerator(provider='openai', api_key='mock',
+                                       config={'base_url': os.environ['LLM_BASE_URL']})
+        expand_json_flashcards(str(input_file), str(output_file), generator,
+                               target_per_topic=per_topic + 15, workers=workers)
+    return _mock_workflow(ctx, lambda: None, workflow, provider='openai', latency=latency)
+
+
+@benchmark('workflow.expand_json_flashcards')
+def bench_workflow_expand_json(ctx: BenchContext):
+    return _bench_expand_json(ctx)
+
+
+# 50ms per LLM call makes the run latency-bound, as with a real provider
+@benchmark('workflow.expand_json_50ms_sequential')
+def bench_workflow_expand_json_sequential(ctx: BenchContext):
+    return _bench_expand_json(ctx, workers=1, latency=0.05)
+
+
+@benchmark('workflow.expand_json_50ms_parallel')
+def bench_workflow_expand_json_parallel(ctx: BenchContext):
+    return _bench_expand_json(ctx, workers=8, latency=0.05)
+
+
+# ========== STARTUP (python -X importtime) ==========
+
+REPO_DIR = Path(__file__).resolve().parent
+
+
+def import_time(args: List[str], cwd: Optional[Path] = None) -> Measured:
+    """
+    Cumulative import time of everything the program imported itself
+
+    Runs python -X importtime <args> and sums the top-level entries after
+    site, i.e. excluding interpreter startup.
+    """
+    env = dict(os.environ, PYTHONPATH=str(REPO_DIR))
+    stderr = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=cwd or REPO_DIR, env=env,
+                            stdin=subprocess.DEVNULL, capture_output=True, text=True).stderr
+    total, after_site = 0, False
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not name.startswith('  ') and cumulative.strip().isdigit():
+            if after_site:
+                total += int(cumulative)
+            after_site = after_site or name.strip() == 'site'
+    return Measured(total / 1e6)
+
+
+def _bench_import(module: str):
+    return lambda: import_time(['-c', f'import {module}'])
+
+
+for _module in ('flashcard_generator', 'json_scraper_generator', 'generator_core', 'batch_jobs', 'data_server'):
+    benchmark(f'startup.import_{_module}')(lambda ctx, module=_module: _bench_import(module))
+
+
+@benchmark('startup.cli_generate_sample')
+def bench_cli_generate_sample(ctx: BenchContext):
+    return lambda: import_time([str(REPO_DIR / 'aibe.py'), 'generate', 'sample'], cwd=ctx.workdir)
+
+
+# ========== CLI ==========
+
+def main():
+    parser = argparse.ArgumentParser(description="AIBE benchmark suite")
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='Comma-separated dataset sizes (e.g. 1000,10000,100000,1000000)')
+    parser.add_argument('--only', action='append', default=[],
+                        help='Glob pattern of benchmark names to run (repeatable)')
+    parser.add_argument('--repeat', type=int, default=5, help='Minimum timed runs per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per benchmark')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Previous JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Slowdown ratio counted as a regression (default 1.2)')
+    parser.add_argument('--pages', help='Directory of saved HTML pages for the html.* benchmarks')
+    parser.add_argument('--list', action='store_true', help='List benchmarks and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for name in BENCHMARKS:
+            print(name)
+        return 0
+
+    sizes = [int(float(s)) for s in args.sizes.split(',') if s.strip()]
+
+    print("AIBE Benchmark Suite")
+    print("=" * 70)
+    report = run_suite(sizes, args.only, repeat=args.repeat, min_time=args.min_time, pages_dir=args.pages)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Saved results: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        rows = compare_results(previous, report, args.threshold)
+
+        print(f"\n📊 Comparison with {args.compare} ({previous.get('commit') or 'unknown commit'})")
+        print("-" * 70)
+        for row in rows:
+            flag = "⚠️ REGRESSION" if row['regressed'] else ""
+            print(f"   {row['name']:.<40} n={row['size']:<8} x{row['ratio']:>6.2f} {flag}")
+
+        if any(row['regressed'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
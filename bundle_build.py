@@ -0,0 +1,180 @@
+"""
+AIBE Static Bundle Build
+Minified, content-hashed copies of the web app's data files with
+precompressed .gz / .br variants and a manifest to resolve them
+
+    python bundle_build.py --out dist
+
+    dist/manifest.json
+    dist/data/topics_index.3f9a0c1b2d4e.json   (+ .gz, .br)
+    dist/data/contract_law.8be1f07a93c2.json   (+ .gz, .br)
+    dist/mock_tests/mock_test_1.c01d9e4f5a6b.json
+
+The manifest maps the paths the app fetches today to their hashed names:
+
+    {"version": 1, "files": {"data/contract_law.json":
+        {"path": "data/contract_law.8be1f07a93c2.json", "sha256": "...",
+         "bytes": 5120, "gzip": 1830, "br": 1544}}}
+
+Hashed files never change, so they can be served with
+"Cache-Control: public, max-age=31536000, immutable"; only manifest.json
+needs revalidating. A rebuild only writes files whose content changed.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+HASH_LENGTH = 12
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+MANIFEST_VERSION = 1
+
+
+def minify(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def hashed_name(logical: str, digest: str) -> str:
+    """data/contract_law.json -> data/contract_law.<hash>.json"""
+    path = Path(logical)
+    return str(path.with_name(f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}").as_posix())
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class BundleBuilder:
+    """Writes hashed, precompressed files into out_dir and tracks them in a manifest"""
+
+    def __init__(self, out_dir: str = 'dist'):
+        self.out_dir = Path(out_dir)
+        self.manifest_path = self.out_dir / 'manifest.json'
+        self.previous: Dict[str, Dict] = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f).get('files', {})
+        self.files: Dict[str, Dict] = {}
+        self.written = 0
+
+    def add(self, logical: str, data) -> Dict:
+        """Minify data and publish it under logical (the path the app fetches)"""
+        body = minify(data)
+        digest = hashlib.sha256(body).hexdigest()
+        entry = {'path': hashed_name(logical, digest), 'sha256': digest, 'bytes': len(body)}
+
+        previous = self.previous.get(logical)
+        target = self.out_dir / entry['path']
+        if (previous and previous['sha256'] == digest and target.exists()
+                and ('br' in previous or not HAS_BROTLI)):
+            # Unchanged since the last build
+            self.files[logical] = previous
+            return previous
+
+        _write_atomic(target, body)
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        _write_atomic(target.with_name(target.name + '.gz'), compressed)
+        entry['gzip'] = len(compressed)
+        if HAS_BROTLI:
+            compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+            _write_atomic(target.with_name(target.name + '.br'), compressed)
+            entry['br'] = len(compressed)
+        self.files[logical] = entry
+        self.written += 1
+        return entry
+
+    def add_file(self, logical: str, path: Path) -> Dict:
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.add(logical, json.load(f))
+
+    def write_manifest(self):
+        manifest = {'version': MANIFEST_VERSION, 'files': dict(sorted(self.files.items()))}
+        _write_atomic(self.manifest_path, json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8'))
+
+    def prune(self) -> int:
+        """Delete hashed files no longer referenced by the manifest; returns files removed"""
+        keep = set()
+        for entry in self.files.values():
+            for suffix in ('', '.gz', '.br'):
+                keep.add((self.out_dir / (entry['path'] + suffix)).resolve())
+        removed = 0
+        for entry in self.previous.values():
+            for suffix in ('', '.gz', '.br'):
+                path = (self.out_dir / (entry['path'] + suffix)).resolve()
+                if path not in keep and path.exists():
+                    path.unlink()
+                    removed += 1
+        return removed
+
+
+def build_bundle(data_dir: str = 'data', out_dir: str = 'dist',
+                 tests: Iterable[str] = ('mock_test_1.json', 'mock_tests/aibe_previous_years_collection.json'),
+                 prune: bool = False) -> BundleBuilder:
+    """
+    Bundle topics_index.json, every deck it lists and the test files
+
+    Tests are published under mock_tests/<name>, where index.html looks for them.
+    """
+    builder = BundleBuilder(out_dir)
+    data_path = Path(data_dir)
+    index_path = data_path / 'topics_index.json'
+    if index_path.exists():
+        builder.add_file('data/topics_index.json', index_path)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            topics = json.load(f).get('topics', [])
+        for topic in topics:
+            deck_path = data_path / topic['file']
+            if deck_path.exists():
+                builder.add_file(f"data/{topic['file']}", deck_path)
+            else:
+                print(f"⚠️  Missing deck: {deck_path}")
+    else:
+        print(f"⚠️  No topics index in {data_dir}")
+
+    for test in tests:
+        test_path = Path(test)
+        if test_path.exists():
+            builder.add_file(f"mock_tests/{test_path.name}", test_path)
+
+    builder.write_manifest()
+    removed = builder.prune() if prune else 0
+    if removed:
+        print(f"🗑️  Pruned {removed} stale files")
+    return builder
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the minified, content-hashed data bundle")
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--out', default='dist')
+    parser.add_argument('--test', action='append', default=None,
+                        help="Mock test / question bank file (repeatable)")
+    parser.add_argument('--prune', action='store_true', help="Remove hashed files from older builds")
+    args = parser.parse_args()
+
+    tests = args.test or ['mock_test_1.json', 'mock_tests/aibe_previous_years_collection.json']
+    builder = build_bundle(args.data_dir, args.out, tests, args.prune)
+
+    raw = sum(entry['bytes'] for entry in builder.files.values())
+    gz = sum(entry.get('gzip', 0) for entry in builder.files.values())
+    br = sum(entry.get('br', 0) for entry in builder.files.values())
+    print(f"📦 {len(builder.files)} files ({builder.written} rebuilt) -> {builder.out_dir}")
+    print(f"   minified {raw / 1024:.1f} KB | gzip {gz / 1024:.1f} KB"
+          + (f" | brotli {br / 1024:.1f} KB" if HAS_BROTLI else " | brotli: pip install brotli"))
+    print(f"💾 Manifest: {builder.manifest_path}")
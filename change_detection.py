@@ -0,0 +1,138 @@
+"""
+AIBE Change Detection
+Per-URL content hashes, conditional GET validators and section-level diffs
+so unchanged pages are not reprocessed and only new or changed sections
+reach flashcard generation.
+
+State lives in data/change_state.json:
+    {url: {etag, last_modified, sha256, sections: {key: hash}, checked_at, changed_at}}
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
+
+
+def paragraph_sections(paragraphs: List[str]) -> Dict[str, str]:
+    """Key free-text paragraphs by their own hash (edits show up as removed + added)"""
+    return {f"para:{text_hash(p)[:16]}": p for p in paragraphs if p.strip()}
+
+
+def act_sections(sections: List[Dict]) -> Dict[str, str]:
+    """Key parsed bare-act sections by their normalized reference"""
+    return {s['key']: f"{s.get('heading', '')}\n{s.get('text', '')}" for s in sections}
+
+
+class ChangeResult:
+    """Outcome of comparing a fetch with the stored state"""
+
+    __slots__ = ('url', 'status', 'added', 'changed', 'removed')
+
+    def __init__(self, url: str, status: str, added: List[str] = None,
+                 changed: List[str] = None, removed: List[str] = None):
+        self.url = url
+        self.status = status  # 'new', 'changed', 'unchanged' or 'not_modified'
+        self.added = added or []
+        self.changed = changed or []
+        self.removed = removed or []
+
+    @property
+    def has_changes(self) -> bool:
+        return self.status in ('new', 'changed')
+
+    @property
+    def fresh_keys(self) -> List[str]:
+        """Sections worth regenerating: new plus changed"""
+        return self.added + self.changed
+
+    def to_dict(self) -> Dict:
+        return {'status': self.status, 'added': self.added, 'changed': self.changed, 'removed': self.removed}
+
+
+class ChangeTracker:
+    """Stores validators and hashes per URL and diffs new fetches against them"""
+
+    def __init__(self, path: str = 'data/change_state.json'):
+        self.path = Path(path)
+        self.state: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for a URL seen before"""
+        entry = self.state.get(url, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def not_modified(self, url: str) -> ChangeResult:
+        """Record a 304 response"""
+        with self._lock:
+            if url in self.state:
+                self.state[url]['checked_at'] = datetime.now().isoformat(timespec='seconds')
+        return ChangeResult(url, 'not_modified')
+
+    def observe(self, url: str, content: str, sections: Optional[Dict[str, str]] = None,
+                headers: Optional[Dict] = None) -> ChangeResult:
+        """
+        Compare fetched content with the stored state and update it
+
+        Args:
+            url: Page URL
+            content: Full extracted text
+            sections: {key: text} for section-level diffs (act_sections / paragraph_sections)
+            headers: Response headers (ETag and Last-Modified are stored)
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        sha = text_hash(content)
+        section_hashes = {key: text_hash(text) for key, text in (sections or {}).items()}
+        headers = headers or {}
+
+        with self._lock:
+            previous = self.state.get(url)
+            entry = {
+                'etag': headers.get('ETag') or headers.get('etag'),
+                'last_modified': headers.get('Last-Modified') or headers.get('last-modified'),
+                'sha256': sha,
+                'sections': section_hashes,
+                'checked_at': now,
+                'changed_at': now
+            }
+
+            if previous is None:
+                self.state[url] = entry
+                return ChangeResult(url, 'new', added=list(section_hashes))
+
+            if previous.get('sha256') == sha:
+                entry['changed_at'] = previous.get('changed_at', now)
+                self.state[url] = entry
+                return ChangeResult(url, 'unchanged')
+
+            old = previous.get('sections', {})
+            added = [k for k in section_hashes if k not in old]
+            changed = [k for k in section_hashes if k in old and old[k] != section_hashes[k]]
+            removed = [k for k in old if k not in section_hashes]
+            self.state[url] = entry
+            return ChangeResult(url, 'changed', added, changed, removed)
+
+    def save(self):
+        """Write state atomically"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
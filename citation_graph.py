@@ -0,0 +1,515 @@
+"""
+AIBE Citation Graph
+Normalized statute and case-law citations linking PYQ questions, flashcards
+and indexed bare-act sections
+
+Citations are normalized so "Art. 21", "Article 21" and "Article 21,
+Constitution of India" are one node, and "Sec. 34 I.P.C." becomes
+"Section 34 IPC". Cases are keyed by party names ("Maneka Gandhi v. Union
+of India (1978)" and "Maneka Gandhi vs Union of India" are one case).
+
+    graph = CitationGraph.load_or_build()
+    graph.citing('Section 34 IPC')           # questions, cards and sections
+    graph.top_cases('Constitutional Law')    # most cited cases in a subject
+    graph.co_cited('Article 21', kind='case')
+
+The built graph is cached in data/citation_graph.json and rebuilt only when
+one of its source files changes.
+"""
+
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable, Tuple
+
+from bare_act_parser import SectionIndex, iter_refs
+
+# Canonical act names and the spellings that refer to them
+ACTS = [
+    ('IPC', r'\bI\.?\s?P\.?\s?C\b\.?|Indian Penal Code|\bPenal Code'),
+    ('CrPC', r'\bCr\.?\s?P\.?\s?C\b\.?|Code of Criminal Procedure|Criminal Procedure Code'),
+    ('CPC', r'\bC\.?\s?P\.?\s?C\b\.?|Code of Civil Procedure|Civil Procedure Code'),
+    ('Evidence Act', r'Evidence Act'),
+    ('Contract Act', r'Contract Act'),
+    ('TPA', r'\bT\.?P\.?A\b\.?|Transfer of Property Act'),
+    ('Hindu Marriage Act', r'Hindu Marriage Act|\bHMA\b'),
+    ('Hindu Succession Act', r'Hindu Succession Act'),
+    ('Companies Act', r'Companies Act'),
+    ('Advocates Act', r'Advocates Act'),
+    ('Arbitration Act', r'Arbitration (?:and|&) Conciliation Act|Arbitration Act'),
+    ('IT Act', r'\bI\.?T\.? Act|Information Technology Act'),
+    ('Copyright Act', r'Copyright Act'),
+    ('Industrial Disputes Act', r'Industrial Disputes Act|\bI\.?D\.? Act'),
+    ('JJ Act', r'\bJ\.?J\.? Act|Juvenile Justice'),
+    ('NI Act', r'\bN\.?I\.? Act|Negotiable Instruments Act'),
+    ('Specific Relief Act', r'Specific Relief Act'),
+    ('Limitation Act', r'Limitation Act'),
+    ('Constitution', r'\bConstitution\b'),
+]
+# Every spelling starts with a capital; the lookahead skips other positions cheaply
+ACT_PATTERN = re.compile('(?=[A-Z])(?:' + '|'.join(f'(?P<a{i}>{pattern})' for i, (_, pattern) in enumerate(ACTS)) + ')')
+
+# Subjects whose bare "Section N" references have an obvious act
+SUBJECT_ACTS = {
+    'Constitutional Law': 'Constitution',
+    'Contract Law': 'Contract Act',
+    'Property Law': 'TPA',
+    'Company Law': 'Companies Act',
+    'Arbitration': 'Arbitration Act',
+    'Evidence Act': 'Evidence Act',
+}
+
+# Bump when extraction rules change so cached graphs are rebuilt
+GRAPH_VERSION = 2
+
+# How far (in characters) an act name may sit from the reference it qualifies
+ACT_WINDOW = 40
+
+PARTY = r"[A-Z][\w.'&-]*"
+CASE_NAME = re.compile(
+    rf"({PARTY}(?:\s+(?:{PARTY}|of|the|and|&))*)\s+(?:v\.|vs\.?|v/s|versus)\s+"
+    rf"({PARTY}(?:\s+(?:{PARTY}|of|the|and|&))*)"
+)
+ABBREVIATIONS = {'co', 'ltd', 'corp', 'inc', 'bros', 'pvt', 'anr', 'ors', 'u.o.i'}
+LEADING_WORDS = {'in', 'the', 'see', 'per', 'as', 'case', 'landmark', 'held', 'under', 'also', 'and', 'from'}
+TRAILING_WORDS = {'of', 'the', 'and', '&'}
+
+
+def find_acts(text: str) -> List[Tuple[int, int, str]]:
+    """(start, end, canonical act) for every act mention"""
+    found = []
+    for match in ACT_PATTERN.finditer(text or ''):
+        index = int(match.lastgroup[1:])
+        found.append((match.start(), match.end(), ACTS[index][0]))
+    return found
+
+
+@lru_cache(maxsize=1024)
+def default_act(text: str) -> Optional[str]:
+    """The act a subject/deck title names, if it names exactly one"""
+    acts = {act for _, _, act in find_acts(text)}
+    if len(acts) == 1:
+        return acts.pop()
+    return SUBJECT_ACTS.get(text)
+
+
+def qualify(ref: str, act: Optional[str]) -> str:
+    """'Section 34' + 'IPC' -> 'Section 34 IPC'; Articles are the Constitution's"""
+    if ref.startswith('Article') and act in (None, 'Constitution'):
+        return ref
+    if ref.startswith('Order') and act is None:
+        act = 'CPC'
+    return f"{ref} {act}" if act else ref
+
+
+def extract_citations(text: str, fallback_act: Optional[str] = None) -> List[str]:
+    """
+    Statutory citations in free text, qualified with their act
+
+    The act is taken from a mention right after the reference ("Section 22,
+    Copyright Act"), else right before it ("JJ Act 2015, Section 2(12)"),
+    else the act of the previous reference in the same text, else fallback_act.
+    """
+    if not text:
+        return []
+    spans = list(iter_refs(text))
+    if not spans:
+        return []
+    acts = find_acts(text)
+    citations = []
+    last_act = None
+    for i, (start, end, refs) in enumerate(spans):
+        next_start = spans[i + 1][0] if i + 1 < len(spans) else len(text)
+        previous_end = spans[i - 1][1] if i else 0
+        after = [act for a_start, _, act in acts if end <= a_start < min(end + ACT_WINDOW, next_start)]
+        before = [act for _, a_end, act in acts if max(start - ACT_WINDOW, previous_end) <= a_end <= start]
+        if after or before:
+            last_act = after[0] if after else before[-1]
+        act = last_act or fallback_act
+        citations.extend(qualify(ref, act) for ref in refs)
+    return list(dict.fromkeys(citations))
+
+
+def normalize_case(name: str) -> str:
+    """Canonical display form: 'Maneka Gandhi vs Union of India (1978)' -> 'Maneka Gandhi v. Union of India'"""
+    name = re.sub(r'\(\s*\d{4}\s*\)|\[\s*\d{4}\s*\]|,?\s*\d{4}\s*$', '', name)
+    name = re.sub(r'\s+(?:v\.|vs\.?|v/s|versus)\s+', ' v. ', name, flags=re.I)
+    return ' '.join(name.split()).strip(' ,;.')
+
+
+def case_key(name: str) -> str:
+    """Lookup key: lowercase party words only"""
+    return ' '.join(re.findall(r'[a-z0-9]+', normalize_case(name).lower()))
+
+
+def extract_cases(text: str) -> List[str]:
+    """Case names ('X v. Y') mentioned in free text, normalized"""
+    cases = []
+    for match in CASE_NAME.finditer(text or ''):
+        left = match.group(1).split()
+        while left and left[0].lower() in LEADING_WORDS:
+            left.pop(0)
+        right = []
+        for word in match.group(2).split():
+            right.append(word)
+            # "Rylands v. Fletcher. If ..." - a full stop after a whole word ends the name
+            stem = word[:-1]
+            if word.endswith('.') and '.' not in stem and len(stem) > 2 and stem.lower() not in ABBREVIATIONS:
+                break
+        while right and right[-1].lower() in TRAILING_WORDS:
+            right.pop()
+        if left and right:
+            cases.append(normalize_case(f"{' '.join(left)} v. {' '.join(right)}"))
+    return list(dict.fromkeys(cases))
+
+
+def citation_sort_key(citation: str) -> List:
+    """Natural order: Article 21 before Article 109"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', citation)]
+
+
+def _split_citation(citation: str) -> Tuple[str, str, Optional[str]]:
+    """'Section 32(1) Evidence Act' -> ('Section 32', '(1)', 'Evidence Act')"""
+    match = re.match(r'^((?:Order \S+ Rule|Section|Article) [0-9A-Z]+)((?:\([^)]*\))*)\s*(.*)$', citation)
+    if not match:
+        return citation, '', None
+    return match.group(1), match.group(2), match.group(3) or None
+
+
+class CitationGraph:
+    """Items (questions, cards, sections) linked to the citations they contain"""
+
+    def __init__(self):
+        self.items: Dict[str, Dict] = {}
+        self.by_ref: Dict[str, set] = defaultdict(set)
+        self.by_case: Dict[str, set] = defaultdict(set)
+        self.by_base: Dict[str, set] = defaultdict(set)
+        self.case_names: Dict[str, str] = {}
+        self.by_respondent: Dict[str, set] = defaultdict(set)
+        self.sources: Dict[str, List[int]] = {}
+        self.version = GRAPH_VERSION
+
+    # ========== BUILDING ==========
+
+    def add_item(self, item_id: str, kind: str, subject: str, label: str,
+                 refs: Iterable[str], cases: Iterable[str]):
+        """Add (or replace) one item and its citations"""
+        if item_id in self.items:
+            self.remove_item(item_id)
+        refs = list(dict.fromkeys(refs))
+        case_keys = []
+        for name in cases:
+            key = self.canonical_case(case_key(name))
+            if key and key not in case_keys:
+                case_keys.append(key)
+                if key not in self.case_names:
+                    self.case_names[key] = normalize_case(name)
+                    self._index_case(key)
+        self.items[item_id] = {'type': kind, 'subject': subject, 'label': label,
+                               'refs': refs, 'cases': case_keys}
+        for ref in refs:
+            self.by_ref[ref].add(item_id)
+            self.by_base[_split_citation(ref)[0]].add(ref)
+        for key in case_keys:
+            self.by_case[key].add(item_id)
+
+    def _index_case(self, key: str):
+        applicant, sep, respondent = key.partition(' v ')
+        if sep:
+            self.by_respondent[respondent].add(key)
+
+    def canonical_case(self, key: str) -> str:
+        """
+        Known key naming the same case, else key itself
+
+        'ashbury railway v riche' and 'ashbury railway carriage co v riche' are
+        one case: same respondent, and one applicant starts with the other
+        (at least two words, so 'state v x' does not swallow 'state of up v x').
+        """
+        if key in self.case_names:
+            return key
+        applicant, sep, respondent = key.partition(' v ')
+        if not sep:
+            return key
+        words = applicant.split()
+        for other in sorted(self.by_respondent.get(respondent, ())):
+            other_words = other.partition(' v ')[0].split()
+            shared = min(len(words), len(other_words))
+            if shared >= 2 and words[:shared] == other_words[:shared]:
+                return other
+        return key
+
+    def remove_item(self, item_id: str):
+        item = self.items.pop(item_id, None)
+        if item is None:
+            return
+        for ref in item['refs']:
+            self.by_ref[ref].discard(item_id)
+            if not self.by_ref[ref]:
+                del self.by_ref[ref]
+                self.by_base[_split_citation(ref)[0]].discard(ref)
+        for key in item['cases']:
+            self.by_case[key].discard(item_id)
+            if not self.by_case[key]:
+                del self.by_case[key]
+
+    def add_question(self, question: Dict):
+        """Index a PYQ question (section/case_law fields plus question and explanation text)"""
+        subject = question.get('subject', '')
+        fallback = default_act(subject)
+        text = '\n'.join([question.get('section', ''), question.get('question', ''),
+                          question.get('explanation', '')])
+        cases = ([question['case_law']] if question.get('case_law') else []) + extract_cases(text)
+        self.add_item(f"question:{question['id']}", 'question', subject, question.get('question', '')[:120],
+                      extract_citations(text, fallback), cases)
+
+    def add_questions(self, questions: Iterable[Dict]):
+        for question in questions:
+            self.add_question(question)
+
+    def add_deck(self, filename: str, deck: Dict):
+        """Index every card of a topic deck (the subtitle names the default act)"""
+        subject = deck.get('topic_title', filename)
+        fallback = default_act(deck.get('topic_subtitle', '')) or default_act(subject)
+        for i, card in enumerate(deck.get('flashcards', [])):
+            text = f"{card.get('q', '')}\n{card.get('a', '')}"
+            self.add_item(f"card:{filename}#{i}", 'card', subject, card.get('q', '')[:120],
+                          extract_citations(text, fallback), extract_cases(text))
+
+    def add_section_index(self, index: SectionIndex):
+        """Index bare-act sections so cross-references between provisions are linked too"""
+        for key, act in index.acts.items():
+            act_name = act['name']
+            fallback = default_act(act_name)
+            for section in act['sections']:
+                text = f"{section.get('heading', '')}\n{section.get('text', '')}"
+                own = qualify(section['key'], fallback)
+                refs = [ref for ref in extract_citations(text, fallback) if ref != own]
+                self.add_item(f"section:{key}:{section['key']}", 'section', act_name,
+                              f"{own} - {section.get('heading', '')}"[:120], refs, extract_cases(text))
+
+    def _track(self, path: Path):
+        stat = path.stat()
+        self.sources[str(path)] = [stat.st_mtime_ns, stat.st_size]
+
+    @classmethod
+    def build(cls, question_file: str = 'mock_tests/aibe_previous_years_collection.json',
+              data_dir: str = 'data', index_path: str = 'data/sections_index.json') -> 'CitationGraph':
+        """Index the question bank, every deck listed in topics_index.json and the section index"""
+        graph = cls()
+        question_path = Path(question_file)
+        if question_path.exists():
+            with open(question_path, 'r', encoding='utf-8') as f:
+                graph.add_questions(json.load(f)['questions'])
+            graph._track(question_path)
+
+        topics_path = Path(data_dir) / 'topics_index.json'
+        if topics_path.exists():
+            with open(topics_path, 'r', encoding='utf-8') as f:
+                topics = json.load(f)['topics']
+            graph._track(topics_path)
+            for topic in topics:
+                deck_path = Path(data_dir) / topic['file']
+                if deck_path.exists():
+                    with open(deck_path, 'r', encoding='utf-8') as f:
+                        graph.add_deck(topic['file'], json.load(f))
+                    graph._track(deck_path)
+
+        if Path(index_path).exists():
+            graph.add_section_index(SectionIndex(index_path))
+            graph._track(Path(index_path))
+        return graph
+
+    # ========== CACHE ==========
+
+    def is_fresh(self) -> bool:
+        """True if no source file changed since the graph was built"""
+        for path, (mtime, size) in self.sources.items():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return False
+            if stat.st_mtime_ns != mtime or stat.st_size != size:
+                return False
+        return True
+
+    def save(self, path: str = 'data/citation_graph.json'):
+        """Write the graph atomically"""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': GRAPH_VERSION, 'sources': self.sources, 'case_names': self.case_names, 'items': self.items},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, target)
+
+    @classmethod
+    def load(cls, path: str = 'data/citation_graph.json') -> 'CitationGraph':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        graph = cls()
+        graph.version = data.get('version')
+        graph.sources = data['sources']
+        graph.case_names = data['case_names']
+        for key in graph.case_names:
+            graph._index_case(key)
+        for item_id, item in data['items'].items():
+            graph.items[item_id] = item
+            for ref in item['refs']:
+                graph.by_ref[ref].add(item_id)
+                graph.by_base[_split_citation(ref)[0]].add(ref)
+            for key in item['cases']:
+                graph.by_case[key].add(item_id)
+        return graph
+
+    @classmethod
+    def load_or_build(cls, cache_path: str = 'data/citation_graph.json', **build_args) -> 'CitationGraph':
+        """Cached graph if its sources are unchanged, else rebuild and re-cache"""
+        if Path(cache_path).exists():
+            graph = cls.load(cache_path)
+            if graph.version == GRAPH_VERSION and graph.is_fresh():
+                return graph
+        graph = cls.build(**build_args)
+        graph.save(cache_path)
+        return graph
+
+    # ========== QUERIES ==========
+
+    def resolve(self, citation: str) -> Tuple[List[str], List[str]]:
+        """
+        Indexed refs and case keys a query names
+
+        "Section 34 IPC" matches that section and its sub-clauses; "Section 34"
+        matches it under any act; "Maneka Gandhi v. UoI" style names match cases.
+        """
+        if re.search(r'\s(?:v\.?|vs\.?|v/s|versus)\s', citation, re.I):
+            key = self.canonical_case(case_key(citation))
+            return [], [key] if key in self.by_case else []
+
+        refs = []
+        for query in extract_citations(citation) or [citation.strip()]:
+            base, clauses, act = _split_citation(query)
+            for ref in self.by_base.get(base, ()):
+                _, ref_clauses, ref_act = _split_citation(ref)
+                if (act is None or ref_act == act) and ref_clauses.startswith(clauses):
+                    refs.append(ref)
+        return sorted(set(refs)), []
+
+    def citing(self, citation: str, kind: Optional[str] = None) -> List[Dict]:
+        """Every item citing a provision or case, optionally only 'question', 'card' or 'section' items"""
+        refs, cases = self.resolve(citation)
+        ids = set()
+        for ref in refs:
+            ids |= self.by_ref[ref]
+        for key in cases:
+            ids |= self.by_case[key]
+        return [dict(self.items[i], id=i) for i in sorted(ids)
+                if kind is None or self.items[i]['type'] == kind]
+
+    def _subject_items(self, subject: Optional[str]) -> Iterable[Dict]:
+        if subject is None:
+            return self.items.values()
+        return (item for item in self.items.values() if item['subject'] == subject)
+
+    def refs(self, subject: Optional[str] = None, kind: Optional[str] = None) -> List[str]:
+        """Distinct citations (optionally within a subject / item type), sorted"""
+        if subject is None and kind is None:
+            return sorted(self.by_ref, key=citation_sort_key)
+        return sorted({ref for item in self._subject_items(subject)
+                       if kind is None or item['type'] == kind for ref in item['refs']}, key=citation_sort_key)
+
+    def top_refs(self, subject: Optional[str] = None, top: Optional[int] = None) -> List[Tuple[str, int]]:
+        counts = Counter(ref for item in self._subject_items(subject) for ref in item['refs'])
+        return counts.most_common(top)
+
+    def top_cases(self, subject: Optional[str] = None, top: Optional[int] = None) -> List[Tuple[str, int]]:
+        counts = Counter(key for item in self._subject_items(subject) for key in item['cases'])
+        return [(self.case_names[key], count) for key, count in counts.most_common(top)]
+
+    def co_cited(self, citation: str, kind: Optional[str] = None, subject: Optional[str] = None,
+                 top: int = 10) -> List[Tuple[str, int]]:
+        """Citations appearing alongside a provision or case (kind: 'case' or 'ref' to restrict)"""
+        refs, cases = self.resolve(citation)
+        ids = set()
+        for ref in refs:
+            ids |= self.by_ref[ref]
+        for key in cases:
+            ids |= self.by_case[key]
+
+        counts = Counter()
+        for item_id in ids:
+            item = self.items[item_id]
+            if subject is not None and item['subject'] != subject:
+                continue
+            if kind in (None, 'ref'):
+                counts.update(ref for ref in item['refs'] if ref not in refs)
+            if kind in (None, 'case'):
+                counts.update(self.case_names[key] for key in item['cases'] if key not in cases)
+        return counts.most_common(top)
+
+    def co_cited_cases(self, subject: Optional[str] = None, top: int = 10) -> List[Tuple[Tuple[str, str], int]]:
+        """Pairs of cases most often cited by the same item"""
+        counts = Counter()
+        for item in self._subject_items(subject):
+            keys = sorted(item['cases'])
+            for i, first in enumerate(keys):
+                for second in keys[i + 1:]:
+                    counts[(self.case_names[first], self.case_names[second])] += 1
+        return counts.most_common(top)
+
+    def stats(self) -> Dict:
+        return {
+            'items': Counter(item['type'] for item in self.items.values()),
+            'citations': len(self.by_ref),
+            'cases': len(self.by_case)
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AIBE citation graph")
+    parser.add_argument('query', nargs='?', help="Provision or case, e.g. 'Section 34 IPC' or 'Article 21'")
+    parser.add_argument('--subject', help="Restrict top/co-cited listings to one subject or topic")
+    parser.add_argument('--questions', default='mock_tests/aibe_previous_years_collection.json')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--cache', default='data/citation_graph.json')
+    parser.add_argument('--rebuild', action='store_true', help="Ignore the cached graph")
+    args = parser.parse_args()
+
+    build_args = {'question_file': args.questions, 'data_dir': args.data_dir,
+                  'index_path': str(Path(args.data_dir) / 'sections_index.json')}
+    if args.rebuild:
+        graph = CitationGraph.build(**build_args)
+        graph.save(args.cache)
+    else:
+        graph = CitationGraph.load_or_build(args.cache, **build_args)
+
+    stats = graph.stats()
+    print("AIBE Citation Graph")
+    print("=" * 60)
+    print(f"   Items: {dict(stats['items'])} | Citations: {stats['citations']} | Cases: {stats['cases']}")
+
+    if args.query:
+        items = graph.citing(args.query)
+        print(f"\n🔗 {len(items)} items citing {args.query}:")
+        for item in items:
+            print(f"   [{item['type']}] {item['subject']}: {item['label']}")
+        print("\n🤝 Co-cited:")
+        for citation, count in graph.co_cited(args.query, subject=args.subject):
+            print(f"   {citation} ({count})")
+    else:
+        print(f"\n📜 Most cited provisions{' in ' + args.subject if args.subject else ''}:")
+        for ref, count in graph.top_refs(args.subject, top=15):
+            print(f"   {ref} ({count})")
+        print(f"\n⚖️  Most cited cases{' in ' + args.subject if args.subject else ''}:")
+        for case, count in graph.top_cases(args.subject, top=15):
+            print(f"   {case} ({count})")
+        pairs = graph.co_cited_cases(args.subject)
+        if pairs:
+            print("\n🤝 Most co-cited case pairs:")
+            for (first, second), count in pairs:
+                print(f"   {first} + {second} ({count})")
@@ -0,0 +1,200 @@
+"""
+AIBE Context Selector
+Picks which existing questions go into a generation prompt, so the model
+sees what a deck already covers without the prompt growing with the deck
+
+Questions become TF-IDF vectors (local, no dependencies). Maximal marginal
+relevance then picks representatives one at a time. Each pick scores high
+on relevance (similar to the topic and to the deck as a whole) and low on
+similarity to what was already picked, until the token budget is spent.
+Whatever budget is left names the most frequent terms of the questions
+that were not picked.
+
+    context = select_context(questions, "Contract Law Indian Contract Act, 1872", budget_tokens=400)
+    context.questions      # representatives, in deck order
+    context.other_terms    # "consideration", "bailment", ... covered but not shown
+
+    python context_selector.py contract_law.json --budget 400
+"""
+
+import math
+import re
+from collections import Counter
+from typing import List, Dict
+
+DEFAULT_BUDGET = 400
+# Weight on novelty vs relevance; 0.7 gave the best deck coverage on the bundled decks
+DIVERSITY = 0.7
+MAX_QUESTION_CHARS = 200
+MAX_CANDIDATES = 1000
+CHARS_PER_TOKEN = 4
+
+TOKEN = re.compile(r"[a-z]+|\d+[a-z]?")
+STOPWORDS = frozenset('''
+a an and are as at be by can does for from has have how in is it its of on or
+the that this to under what when where which who whom whose why with
+section act article case law
+'''.split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (~4 characters per token)"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def terms(text: str) -> List[str]:
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def _normalize(vec: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+    return {term: w / norm for term, w in vec.items() if w}
+
+
+def _vector(counts: Counter, idf: Dict[str, float]) -> Dict[str, float]:
+    """l2-normalized TF-IDF weights"""
+    return _normalize({term: (1 + math.log(count)) * idf.get(term, 0.0) for term, count in counts.items()})
+
+
+def _dot(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(term, 0.0) for term, w in a.items())
+
+
+class Context:
+    """Selected questions plus terms covered by the rest of the deck"""
+
+    def __init__(self, questions: List[str], other_terms: List[str], total: int, tokens: int):
+        self.questions = questions
+        self.other_terms = other_terms
+        self.total = total
+        self.tokens = tokens
+
+    def render(self) -> str:
+        """Prompt text: the representatives, then the remaining subtopics"""
+        if not self.questions:
+            return ""
+        lines = [f"- {q}" for q in self.questions]
+        if self.other_terms:
+            lines.append(f"(+{self.total - len(self.questions)} more, also covering: {', '.join(self.other_terms)})")
+        return "\n".join(lines)
+
+
+def select_context(questions: List[str], query: str = '', budget_tokens: int = DEFAULT_BUDGET,
+                   diversity: float = DIVERSITY) -> Context:
+    """
+    Representative, mutually diverse questions fitting budget_tokens
+
+    query (topic title / subtitle) steers relevance; diversity in [0, 1]
+    trades relevance for spread (0 = most relevant only).
+    """
+    unique = list(dict.fromkeys(q.strip()[:MAX_QUESTION_CHARS] for q in questions if q and q.strip()))
+    costs = [estimate_tokens(q) + 1 for q in unique]
+    if sum(costs) <= budget_tokens:
+        return Context(unique, [], len(unique), sum(costs))
+
+    total = len(unique)
+    if total > MAX_CANDIDATES:
+        # An even sample of a big deck spans the same subtopics, at bounded cost
+        step = total / MAX_CANDIDATES
+        unique = [unique[int(i * step)] for i in range(MAX_CANDIDATES)]
+        costs = [costs[int(i * step)] for i in range(MAX_CANDIDATES)]
+
+    counts = [Counter(terms(q)) for q in unique]
+    df = Counter(term for c in counts for term in c)
+    n = len(unique)
+    idf = {term: math.log((1 + n) / (1 + d)) + 1 for term, d in df.items()}
+    vectors = [_vector(c, idf) for c in counts]
+
+    # Relevance: similarity to the topic and to the deck centroid (typical questions)
+    centroid: Dict[str, float] = {}
+    for vec in vectors:
+        for term, w in vec.items():
+            centroid[term] = centroid.get(term, 0.0) + w
+    centroid = _normalize(centroid)
+    query_vec = _vector(Counter(terms(query)), idf)
+    if query_vec:
+        relevance = [0.5 * _dot(vec, centroid) + 0.5 * _dot(vec, query_vec) for vec in vectors]
+    else:
+        relevance = [_dot(vec, centroid) for vec in vectors]
+
+    # Inverted index: similarity to a pick only touches questions sharing a term
+    postings: Dict[str, List] = {}
+    for i, vec in enumerate(vectors):
+        for term, w in vec.items():
+            postings.setdefault(term, []).append((i, w))
+
+    closest = [0.0] * n          # max similarity to anything selected so far
+    chosen: List[int] = []
+    remaining = set(range(n))
+    spent = 0
+    while remaining:
+        best, best_score = None, -math.inf
+        for i in remaining:
+            if spent + costs[i] > budget_tokens:
+                continue
+            score = (1 - diversity) * relevance[i] - diversity * closest[i]
+            if score > best_score:
+                best, best_score = i, score
+        if best is None:
+            break
+        chosen.append(best)
+        remaining.discard(best)
+        spent += costs[best]
+        sims = [0.0] * n
+        for term, weight in vectors[best].items():
+            for i, w in postings[term]:
+                sims[i] += weight * w
+        closest = [max(c, sim) for c, sim in zip(closest, sims)]
+
+    # Spend what is left on the terms the most unpicked questions use
+    shown = {term for i in chosen for term in counts[i]}
+    other = Counter({term: d for term, d in df.items() if term not in shown})
+    header = estimate_tokens(f"(+{total - len(chosen)} more, also covering: )")
+    other_terms, term_tokens = [], 0
+    for term, _ in other.most_common():
+        cost = estimate_tokens(term + ', ')
+        if spent + header + term_tokens + cost > budget_tokens:
+            break
+        other_terms.append(term)
+        term_tokens += cost
+    if other_terms:
+        spent += header + term_tokens
+
+    return Context([unique[i] for i in sorted(chosen)], other_terms, total, spent)
+
+
+def coverage(questions: List[str], selected: List[str]) -> float:
+    """Mean best TF-IDF similarity of every question to the selected set (1.0 = all shown)"""
+    counts = [Counter(terms(q)) for q in questions]
+    df = Counter(term for c in counts for term in c)
+    idf = {term: math.log((1 + len(questions)) / (1 + d)) + 1 for term, d in df.items()}
+    vectors = [_vector(c, idf) for c in counts]
+    picked = [_vector(Counter(terms(q)), idf) for q in selected]
+    if not questions or not picked:
+        return 0.0
+    return sum(max(_dot(vec, p) for p in picked) for vec in vectors) / len(vectors)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Show the existing-question context a prompt would get")
+    parser.add_argument('deck', help="Deck JSON file (topic_title, flashcards)")
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET, help="Token budget")
+    args = parser.parse_args()
+
+    with open(args.deck, 'r', encoding='utf-8') as f:
+        deck = json.load(f)
+    questions = [card['q'] for card in deck.get('flashcards', [])]
+    query = f"{deck.get('topic_title', '')} {deck.get('topic_subtitle', '')}"
+    context = select_context(questions, query, args.budget)
+
+    print(context.render())
+    first = questions[:len(context.questions)]
+    print(f"\n📊 {len(context.questions)}/{context.total} questions, ~{context.tokens} tokens "
+          f"(all questions: ~{sum(estimate_tokens(q) + 1 for q in questions)})")
+    print(f"   coverage {coverage(questions, context.questions):.3f} "
+          f"vs first {len(first)}: {coverage(questions, first):.3f}")
@@ -0,0 +1,272 @@
+"""
+AIBE Corpus Store
+Persistent, compressed, content-addressed store for scraped legal documents
+
+Layout (default root data/corpus):
+    objects/ab/ab12...ef.zst   - document bodies, zstd (or .gz without zstandard)
+    index.jsonl                - one metadata record per stored (url, body) pair
+
+Identical bodies scraped from different URLs or sources are stored once.
+Records are indexed in memory by topic, source, url and content hash.
+
+    store = CorpusStore()
+    store.put(text, url=url, source='Indian Kanoon', topic='Criminal Law')
+    for record, text in store.iter_documents(topic='Criminal Law'):
+        ...
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Iterator, Tuple
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+
+def content_hash(text: str) -> str:
+    """sha256 of the whitespace-normalized body"""
+    normalized = ' '.join(text.split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+# Scraper result keys copied into index records besides title/url/source/topic;
+# anything else (full text variants, change summaries) stays out of the index
+DOCUMENT_METADATA = ('query', 'fetched_at')
+
+
+class CorpusStore:
+    """Compressed document store with metadata index"""
+
+    def __init__(self, root: str = 'data/corpus', codec: Optional[str] = None, level: int = 10):
+        """
+        Args:
+            root: Store directory
+            codec: 'zstd' or 'gzip' (default: zstd when installed)
+            level: Compression level
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.index_path = self.root / 'index.jsonl'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+        self.codec = codec or ('zstd' if HAS_ZSTD else 'gzip')
+        if self.codec == 'zstd' and not HAS_ZSTD:
+            raise ValueError("zstd codec requested but zstandard is not installed (pip install zstandard)")
+        self.level = level
+
+        self._lock = threading.Lock()
+        # Keyed by record_key in insertion order, so replacing a record is O(1)
+        self.records: Dict[str, Dict] = {}
+        self.by_url: Dict[str, Dict] = {}
+        self.by_hash: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+        self.by_topic: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+        self.by_source: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+        self._load_index()
+
+    # ========== INDEX ==========
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    self._add_to_index(json.loads(line))
+
+    @staticmethod
+    def record_key(record: Dict) -> str:
+        """The URL; documents without one are identified by body, source and topic"""
+        return record.get('url') or f"{record['sha256']}|{record['source']}|{record.get('topic') or ''}"
+
+    def _add_to_index(self, record: Dict):
+        key = self.record_key(record)
+        previous = self.records.get(key)
+        if previous is not None:
+            self._drop_from_index(previous)
+        self.records[key] = record
+        if record.get('url'):
+            self.by_url[record['url']] = record
+        self.by_hash[record['sha256']][key] = record
+        if record.get('topic'):
+            self.by_topic[record['topic']][key] = record
+        self.by_source[record['source']][key] = record
+
+    def _drop_from_index(self, record: Dict):
+        key = self.record_key(record)
+        del self.records[key]
+        del self.by_hash[record['sha256']][key]
+        if record.get('topic'):
+            del self.by_topic[record['topic']][key]
+        del self.by_source[record['source']][key]
+
+    # ========== OBJECTS ==========
+
+    def _object_path(self, sha: str, codec: str) -> Path:
+        suffix = '.zst' if codec == 'zstd' else '.gz'
+        return self.objects_dir / sha[:2] / f"{sha}{suffix}"
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=min(self.level, 9))
+
+    def _decompress(self, data: bytes, codec: str) -> bytes:
+        if codec == 'zstd':
+            if not HAS_ZSTD:
+                raise ValueError("Document stored with zstd but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def _write_object(self, sha: str, data: bytes) -> int:
+        path = self._object_path(sha, self.codec)
+        path.parent.mkdir(exist_ok=True)
+        compressed = self._compress(data)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        return len(compressed)
+
+    # ========== PUBLIC API ==========
+
+    def put(self, content: str, url: Optional[str], source: str, topic: Optional[str] = None,
+            title: Optional[str] = None, fetched_at: Optional[str] = None, **extra) -> Dict:
+        """
+        Store a document; the body is written only if no identical body exists
+
+        Returns the metadata record, with 'duplicate': True when the body
+        was already in the store.
+        """
+        sha = content_hash(content)
+        with self._lock:
+            existing = self.by_hash.get(sha)
+            duplicate = bool(existing)
+            if duplicate:
+                first = next(iter(existing.values()))
+                codec = first['codec']
+                compressed_size = first['compressed_size']
+                current = self.by_url.get(url) if url else None
+                if current and current['sha256'] == sha and current.get('topic') == topic:
+                    return dict(current, duplicate=True)
+            else:
+                codec = self.codec
+                compressed_size = self._write_object(sha, content.encode('utf-8'))
+
+            record = {
+                'url': url,
+                'source': source,
+                'topic': topic,
+                'title': title,
+                'fetched_at': fetched_at or datetime.now().isoformat(timespec='seconds'),
+                'sha256': sha,
+                'size': len(content.encode('utf-8')),
+                'compressed_size': compressed_size,
+                'codec': codec,
+                **extra
+            }
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._add_to_index(record)
+            return dict(record, duplicate=duplicate)
+
+    def put_documents(self, documents: List[Dict], topic: Optional[str] = None) -> Dict:
+        """Store scraper results ({'title', 'url', 'content', 'source'} dicts)"""
+        stored = duplicates = 0
+        for doc in documents:
+            if not doc.get('content'):
+                continue
+            metadata = {k: doc[k] for k in DOCUMENT_METADATA if doc.get(k) is not None}
+            record = self.put(doc['content'], url=doc.get('url'), source=doc.get('source', 'unknown'),
+                              topic=doc.get('topic', topic), title=doc.get('title'), **metadata)
+            if record['duplicate']:
+                duplicates += 1
+            else:
+                stored += 1
+        return {'stored': stored, 'duplicates': duplicates}
+
+    def get_text(self, key: str) -> Optional[str]:
+        """Body by content hash or URL"""
+        record = self.by_url.get(key) or (next(iter(self.by_hash[key].values())) if self.by_hash.get(key) else None)
+        if record is None:
+            return None
+        with open(self._object_path(record['sha256'], record['codec']), 'rb') as f:
+            return self._decompress(f.read(), record['codec']).decode('utf-8')
+
+    def find(self, topic: Optional[str] = None, source: Optional[str] = None) -> List[Dict]:
+        """Records filtered by topic and/or source"""
+        if topic is not None and source is not None:
+            return [r for r in self.by_topic.get(topic, {}).values() if r['source'] == source]
+        if topic is not None:
+            return list(self.by_topic.get(topic, {}).values())
+        if source is not None:
+            return list(self.by_source.get(source, {}).values())
+        return list(self.records.values())
+
+    def iter_documents(self, topic: Optional[str] = None, source: Optional[str] = None,
+                       unique: bool = True) -> Iterator[Tuple[Dict, str]]:
+        """Yield (record, text), decompressing each distinct body once when unique"""
+        seen = set()
+        for record in self.find(topic, source):
+            if unique:
+                if record['sha256'] in seen:
+                    continue
+                seen.add(record['sha256'])
+            yield record, self.get_text(record['sha256'])
+
+    def topics(self) -> Dict[str, int]:
+        return {topic: len(records) for topic, records in self.by_topic.items() if records}
+
+    def sources(self) -> Dict[str, int]:
+        return {source: len(records) for source, records in self.by_source.items() if records}
+
+    def stats(self) -> Dict:
+        bodies = {r['sha256']: r for r in self.records.values()}
+        raw = sum(r['size'] for r in bodies.values())
+        compressed = sum(r['compressed_size'] for r in bodies.values())
+        return {
+            'records': len(self.records),
+            'unique_bodies': len(bodies),
+            'raw_bytes': raw,
+            'compressed_bytes': compressed,
+            'ratio': round(raw / compressed, 2) if compressed else 0.0,
+            'topics': self.topics(),
+            'sources': self.sources()
+        }
+
+    def compact(self):
+        """Rewrite index.jsonl without superseded records"""
+        with self._lock:
+            tmp_path = self.index_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in self.records.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.index_path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    store = CorpusStore(sys.argv[1] if len(sys.argv) > 1 else 'data/corpus')
+    stats = store.stats()
+    print("AIBE Corpus Store")
+    print("=" * 50)
+    print(f"   Records:        {stats['records']}")
+    print(f"   Unique bodies:  {stats['unique_bodies']}")
+    print(f"   Raw size:       {stats['raw_bytes'] / 1024:.1f} KB")
+    print(f"   Compressed:     {stats['compressed_bytes'] / 1024:.1f} KB ({stats['ratio']}x, {store.codec})")
+    print("\n📚 Topics:")
+    for topic, count in sorted(stats['topics'].items()):
+        print(f"   {topic}: {count}")
+    print("\n🌐 Sources:")
+    for source, count in sorted(stats['sources'].items()):
+        print(f"   {source}: {count}")
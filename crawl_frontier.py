@@ -0,0 +1,369 @@
+"""
+AIBE Crawl Frontier
+Priority frontier, URL dedupe and a worker-pool crawler for deep collection
+from legal sources (Indian Kanoon result pages, judgments, related documents).
+
+    frontier = CrawlFrontier(max_depth=2, max_per_host=500)
+    frontier.push('https://indiankanoon.org/search/?formInput=bail', priority=0)
+    crawler = Crawler(frontier, handler=my_handler, workers=8, state_path='data/crawl_bail.json')
+    documents = crawler.run(max_pages=2000)
+
+handler(url, item) fetches and parses one URL and returns (document_or_None,
+[(link, priority, meta), ...]). Lower priority values are crawled first.
+Crawl state (frontier, host counts, failed URLs) is checkpointed to
+state_path and the seen filter's bits to state_path + '.bloom' (rewritten
+only when new URLs were seen), so an interrupted crawl resumes where it
+stopped. URLs whose fetch failed are retried on resume, up to max_retries.
+"""
+
+import base64
+import hashlib
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Callable, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'ref_', '_ga')
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form used for dedupe
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query string, and collapses empty paths to '/'.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or 'https'
+    host = (parts.hostname or '').lower()
+    if parts.port and not ((scheme == 'http' and parts.port == 80) or (scheme == 'https' and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith(TRACKING_PARAMS))
+    path = parts.path or '/'
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def url_host(url: str) -> str:
+    return (urlsplit(url).hostname or '').lower()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on blake2b)"""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001,
+                 bits: Optional[bytearray] = None, hashes: Optional[int] = None, count: int = 0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = hashes or max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Add item; returns False if it was (probably) already present"""
+        new = False
+        for p in self._positions(item):
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                self.bits[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def to_dict(self) -> Dict:
+        """Parameters only; the bit array goes to write_bits"""
+        return {'capacity': self.capacity, 'error_rate': self.error_rate, 'hashes': self.hashes,
+                'count': self.count}
+
+    def write_bits(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_dict(cls, data: Dict, bits_path: Optional[str] = None) -> 'BloomFilter':
+        """Filter from to_dict() plus its bits file (or inline base64 'bits' from older states)"""
+        if 'bits' in data:
+            bits = bytearray(base64.b64decode(data['bits']))
+        elif bits_path and os.path.exists(bits_path):
+            with open(bits_path, 'rb') as f:
+                bits = bytearray(f.read())
+        else:
+            raise FileNotFoundError(f"Bloom filter bits not found: {bits_path}")
+        return cls(data['capacity'], data['error_rate'], bits, data['hashes'], data['count'])
+
+
+class CrawlFrontier:
+    """Priority queue of URLs with dedupe, depth and per-host budgets"""
+
+    def __init__(self, max_depth: int = 2, max_per_host: Optional[int] = None,
+                 host_budgets: Optional[Dict[str, int]] = None, capacity: int = 1_000_000):
+        """
+        Args:
+            max_depth: Links deeper than this are dropped (seeds are depth 0)
+            max_per_host: Default cap on URLs scheduled per host
+            host_budgets: Per-host overrides of max_per_host
+            capacity: Expected number of distinct URLs (sizes the Bloom filter)
+        """
+        self.max_depth = max_depth
+        self.max_per_host = max_per_host
+        self.host_budgets = host_budgets or {}
+        self.seen = BloomFilter(capacity)
+        self.host_counts: Dict[str, int] = {}
+        self.failed: Dict[str, Dict] = {}      # url -> item, re-queued on resume
+        self.attempts: Dict[str, int] = {}     # url -> failed fetches so far
+        self._heap: List[Tuple] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.stats = {'pushed': 0, 'duplicates': 0, 'too_deep': 0, 'over_budget': 0, 'gave_up': 0}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _budget(self, host: str) -> Optional[int]:
+        return self.host_budgets.get(host, self.max_per_host)
+
+    def push(self, url: str, priority: float = 0, depth: int = 0, meta: Optional[Dict] = None) -> bool:
+        """Schedule a URL; returns False if it was rejected"""
+        url = normalize_url(url)
+        host = url_host(url)
+        with self._lock:
+            if depth > self.max_depth:
+                self.stats['too_deep'] += 1
+                return False
+            budget = self._budget(host)
+            if budget is not None and self.host_counts.get(host, 0) >= budget:
+                self.stats['over_budget'] += 1
+                return False
+            if not self.seen.add(url):
+                self.stats['duplicates'] += 1
+                return False
+            self.host_counts[host] = self.host_counts.get(host, 0) + 1
+            heapq.heappush(self._heap, (priority, self._seq, url, depth, meta or {}))
+            self._seq += 1
+            self.stats['pushed'] += 1
+            return True
+
+    def requeue(self, item: Dict):
+        """Put back an item that was popped but not finished (no dedupe check)"""
+        with self._lock:
+            heapq.heappush(self._heap, (item['priority'], self._seq, item['url'], item['depth'], item['meta']))
+            self._seq += 1
+
+    def fail(self, item: Dict, max_retries: int) -> bool:
+        """Record a failed fetch; returns True if the URL will be retried on resume"""
+        url = item['url']
+        with self._lock:
+            self.attempts[url] = self.attempts.get(url, 0) + 1
+            if self.attempts[url] > max_retries:
+                self.failed.pop(url, None)
+                self.stats['gave_up'] += 1
+                return False
+            self.failed[url] = item
+            return True
+
+    def done(self, url: str):
+        """Forget the failures of a URL that was fetched"""
+        with self._lock:
+            self.attempts.pop(url, None)
+            self.failed.pop(url, None)
+
+    def retry_failed(self) -> int:
+        """Re-queue every failed URL still under its retry budget"""
+        with self._lock:
+            items, self.failed = list(self.failed.values()), {}
+        for item in items:
+            self.requeue(item)
+        return len(items)
+
+    def pop(self) -> Optional[Dict]:
+        """Next URL by priority (FIFO among equal priorities)"""
+        with self._lock:
+            if not self._heap:
+                return None
+            priority, _, url, depth, meta = heapq.heappop(self._heap)
+            return {'url': url, 'priority': priority, 'depth': depth, 'meta': meta}
+
+    def to_dict(self, pending: Optional[List[Dict]] = None) -> Dict:
+        with self._lock:
+            queue = [{'priority': p, 'url': u, 'depth': d, 'meta': m} for p, _, u, d, m in sorted(self._heap)]
+            return {
+                'max_depth': self.max_depth,
+                'max_per_host': self.max_per_host,
+                'host_budgets': self.host_budgets,
+                'host_counts': self.host_counts,
+                'stats': self.stats,
+                'queue': (pending or []) + queue,
+                'failed': list(self.failed.values()),
+                'attempts': self.attempts,
+                'seen': self.seen.to_dict()
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict, bloom_path: Optional[str] = None) -> 'CrawlFrontier':
+        """Frontier from to_dict(); failed URLs are queued again"""
+        frontier = cls(data['max_depth'], data.get('max_per_host'), data.get('host_budgets'))
+        frontier.seen = BloomFilter.from_dict(data['seen'], bloom_path)
+        frontier.host_counts = data.get('host_counts', {})
+        frontier.stats = {**frontier.stats, **data.get('stats', {})}
+        frontier.attempts = data.get('attempts', {})
+        for item in data.get('queue', []) + data.get('failed', []):
+            frontier.requeue(item)
+        return frontier
+
+
+class HostThrottle:
+    """Minimum delay between requests to the same host, shared by all workers"""
+
+    def __init__(self, delay: float = 1.0):
+        self.delay = delay
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str):
+        if self.delay <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Crawler:
+    """Runs a CrawlFrontier on a thread pool with periodic checkpoints"""
+
+    def __init__(self, frontier: CrawlFrontier, handler: Callable, workers: int = 8,
+                 state_path: Optional[str] = None, checkpoint_every: int = 50,
+                 throttle: Optional[HostThrottle] = None, max_retries: int = 2):
+        self.frontier = frontier
+        self.handler = handler
+        self.workers = workers
+        self.state_path = state_path
+        self.checkpoint_every = checkpoint_every
+        self.throttle = throttle or HostThrottle(0)
+        self.max_retries = max_retries
+        self.fetched = 0
+        self.failed = 0
+        self._in_flight: Dict = {}
+        self._saved_seen = None    # seen.count when the bloom file was last written
+
+    @classmethod
+    def resume(cls, state_path: str, handler: Callable, **kwargs) -> 'Crawler':
+        """Load frontier state from a previous run"""
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        frontier = CrawlFrontier.from_dict(state['frontier'], f"{state_path}.bloom")
+        crawler = cls(frontier, handler, state_path=state_path, **kwargs)
+        crawler._saved_seen = frontier.seen.count
+        crawler.fetched = state.get('fetched', 0)
+        crawler.failed = state.get('failed', 0)
+        return crawler
+
+    def checkpoint(self):
+        """Write frontier state atomically; in-flight URLs are saved as pending"""
+        if not self.state_path:
+            return
+        Path(self.state_path).parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            'fetched': self.fetched,
+            'failed': self.failed,
+            'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'frontier': self.frontier.to_dict(pending=list(self._in_flight.values()))
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+        # After the JSON: a crash in between leaves queued URLs unmarked (crawled
+        # twice at worst), never marked URLs missing from the queue
+        if self.frontier.seen.count != self._saved_seen:
+            self.frontier.seen.write_bits(f"{self.state_path}.bloom")
+            self._saved_seen = self.frontier.seen.count
+
+    def _work(self, item: Dict):
+        self.throttle.wait(url_host(item['url']))
+        return self.handler(item['url'], item)
+
+    def run(self, max_pages: Optional[int] = None, on_document: Optional[Callable] = None) -> List[Dict]:
+        """
+        Crawl until the frontier is empty or max_pages URLs were handled
+
+        Returns the documents produced by the handler (also passed one by
+        one to on_document, if given, for streaming storage).
+        """
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+        documents = []
+        since_checkpoint = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {}
+            try:
+                while True:
+                    while len(futures) < self.workers and (max_pages is None or
+                                                           self.fetched + len(futures) < max_pages):
+                        item = self.frontier.pop()
+                        if item is None:
+                            break
+                        future = pool.submit(self._work, item)
+                        futures[future] = item
+                        self._in_flight[future] = item
+
+                    if not futures:
+                        break
+
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        item = futures.pop(future)
+                        self._in_flight.pop(future, None)
+                        try:
+                            document, links = future.result()
+                        except Exception as e:
+                            self.failed += 1
+                            retry = self.frontier.fail(item, self.max_retries)
+                            print(f"❌ {item['url']}: {e}{' (retried on resume)' if retry else ''}")
+                            continue
+
+                        self.frontier.done(item['url'])
+                        self.fetched += 1
+                        since_checkpoint += 1
+                        if document:
+                            documents.append(document)
+                            if on_document:
+                                on_document(document)
+                        for link in links or []:
+                            url, priority = link[0], link[1]
+                            meta = link[2] if len(link) > 2 else None
+                            self.frontier.push(url, priority, item['depth'] + 1, meta)
+
+                    if since_checkpoint >= self.checkpoint_every:
+                        self.checkpoint()
+                        since_checkpoint = 0
+            except KeyboardInterrupt:
+                print("\n⏸️  Interrupted - saving crawl state")
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                self.checkpoint()
+
+        return documents
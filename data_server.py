@@ -0,0 +1,584 @@
+"""
+AIBE Data Server
+Local HTTP API over the topic decks (JSONManager) and question banks
+(AIBEPreviousYearsManager), so clients fetch a page of cards instead of
+whole files
+
+    python data_server.py --port 8000
+
+    GET /api/topics                                   topics_index.json + each deck's version
+    GET /api/topics/<file or id>?offset=0&limit=20&q=  deck metadata + a page of cards
+    GET /api/topics/<file or id>/changes?since=N       cards added/changed/removed since version N
+    GET /api/tests                                    question sources (pyq, mock_test_<id>)
+    GET /api/questions?source=pyq&subject=&year=&difficulty=&calibrated=1&q=&offset=&limit=
+    GET /api/stats                                    previous-years counts by subject/year/difficulty
+    GET /data/<file>, /index.html, /mock_tests/...    static files (what index.html fetches today)
+
+Only the API routes send Access-Control-Allow-Origin: *. Static files are an
+allow-list (the app pages, data/*.json, mock_tests/*.json, dist/); dotfiles
+such as .env or .git/ are never served.
+
+Every response carries a strong ETag (per content encoding) and is served
+gzip or brotli compressed when the client accepts it; If-None-Match gets a
+304. Encoded responses are kept in an in-process LRU keyed by path, query,
+encoding and the source files' mtimes, so edits on disk show up on the next
+request without a restart.
+
+    python data_server.py --bench            # requests/second against a local load generator
+"""
+
+import gzip
+import hashlib
+import http.client
+import json
+import mimetypes
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from instrumentation import METRICS
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 500
+MIN_COMPRESS = 512        # bytes; smaller bodies are sent as-is
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5        # dynamic responses; the static bundle build uses 11
+SAFE_NAME = re.compile(r'^[\w.-]+$')
+# Static files the app fetches; nothing else under the web root is served
+STATIC_PAGES = ('index.html', 'aibe-smart-prep-enhanced.html')
+STATIC_JSON_DIRS = ('data', 'mock_tests')
+BUNDLE_DIR = 'dist'
+BUNDLE_SUFFIXES = ('.json', '.gz', '.br')
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded responses: key -> (etag, encoding, body)"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[Tuple[str, str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry: Tuple[str, str, bytes]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """Best supported coding from an Accept-Encoding header (br > gzip > identity)"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    if HAS_BROTLI and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return 'identity'
+
+
+def encode_body(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+def strong_etag(body: bytes, encoding: str) -> str:
+    """Strong validator of the identity body, suffixed per content coding"""
+    digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+    return f'"{digest}"' if encoding == 'identity' else f'"{digest}-{encoding}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags or f"W/{etag}" in tags
+
+
+def paginate(items: List, query: Dict) -> Dict:
+    """Slice items by offset/limit query parameters"""
+    offset = max(0, _int_param(query, 'offset', 0))
+    limit = min(MAX_LIMIT, max(1, _int_param(query, 'limit', DEFAULT_LIMIT)))
+    return {'total': len(items), 'offset': offset, 'limit': limit, 'items': items[offset:offset + limit]}
+
+
+def _int_param(query: Dict, name: str, default: int) -> int:
+    try:
+        return int(query.get(name, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be an integer")
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DataStore:
+    """Decks, question banks and static files, reloaded when they change on disk"""
+
+    def __init__(self, data_dir: str = 'data', root: str = '.',
+                 pyq_path: str = 'mock_tests/aibe_previous_years_collection.json',
+                 mock_paths: Tuple[str, ...] = ('mock_test_1.json',)):
+        from json_scraper_generator import JSONManager
+
+        self.root = Path(root).resolve()
+        self.json_mgr = JSONManager(data_dir)
+        self.data_dir = self.json_mgr.data_dir.resolve()
+        self.pyq_path = Path(pyq_path)
+        self.mock_paths = [Path(p) for p in mock_paths]
+        self._loaded: Dict[str, Tuple[Tuple[int, int], object]] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key: str, path: Path, loader):
+        """Value for path, rebuilt by loader when the file's mtime/size change"""
+        stamp = _stamp(path)
+        with self._lock:
+            entry = self._loaded.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, loader())
+            with self._lock:
+                self._loaded[key] = entry
+        return entry[1]
+
+    # ========== TOPICS ==========
+
+    def topics_index(self) -> Dict:
+        path = self.data_dir / 'topics_index.json'
+        return self._cached('topics_index', path, lambda: self.json_mgr.load_topic('topics_index.json'))
+
+    def topic_file(self, ref: str) -> str:
+        """Deck filename for a filename or topic id"""
+        if ref.isdigit():
+            for topic in self.topics_index().get('topics', []):
+                if str(topic.get('id')) == ref:
+                    return topic['file']
+            raise FileNotFoundError(f"No topic with id {ref}")
+        if not SAFE_NAME.match(ref):
+            raise FileNotFoundError(ref)
+        return ref if ref.endswith('.json') else f"{ref}.json"
+
+    def deck(self, filename: str) -> Dict:
+        path = self.data_dir / filename
+        if not path.is_file():
+            raise FileNotFoundError(filename)
+        return self._cached(f"deck:{filename}", path, lambda: self.json_mgr.load_topic(filename))
+
+    def deck_stamp(self, filename: str):
+        return _stamp(self.data_dir / filename)
+
+    # ========== QUESTION BANKS ==========
+
+    def sources(self) -> Dict[str, Path]:
+        sources = {}
+        if self.pyq_path.exists():
+            sources['pyq'] = self.pyq_path
+        for path in self.mock_paths:
+            if path.exists():
+                test = self._cached(f"mock:{path}", path, lambda p=path: json.loads(p.read_text(encoding='utf-8')))
+                sources[f"mock_test_{test['test_id']}"] = path
+        return sources
+
+    def manager(self):
+        from aibe_pyq_manager import AIBEPreviousYearsManager
+        return self._cached('pyq', self.pyq_path, lambda: AIBEPreviousYearsManager(str(self.pyq_path)))
+
+    def test(self, source: str) -> Dict:
+        """Test JSON for a source ('pyq' or 'mock_test_<id>')"""
+        if source == 'pyq':
+            return self.manager().data
+        path = self.sources().get(source)
+        if path is None:
+            raise FileNotFoundError(f"Unknown source: {source}")
+        return self._cached(f"mock:{path}", path, lambda: json.loads(path.read_text(encoding='utf-8')))
+
+    def questions(self, source: str, query: Dict) -> List[Dict]:
+        """Questions of a source filtered by subject, year, difficulty and keyword"""
+        if source == 'pyq':
+            manager = self.manager()
+            if query.get('difficulty'):
+                questions = manager.filter_by_difficulty(query['difficulty'], calibrated=query.get('calibrated') == '1')
+            else:
+                questions = manager.get_all_questions()
+        else:
+            questions = self.test(source)['questions']
+            if query.get('difficulty'):
+                questions = [q for q in questions if q.get('difficulty') == query['difficulty']]
+        if query.get('subject'):
+            questions = [q for q in questions if q.get('subject') == query['subject']]
+        if query.get('year'):
+            questions = [q for q in questions if q.get('year') == query['year']]
+        if query.get('q'):
+            keyword = query['q'].lower()
+            questions = [q for q in questions if keyword in q.get('question', '').lower()]
+        return questions
+
+    # ========== STATIC FILES ==========
+
+    def static_path(self, url_path: str) -> Path:
+        """
+        Allow-listed file: the app pages, data/*.json (from data_dir),
+        mock_tests/*.json and the bundle output; never dotfiles or anything else
+        """
+        relative = url_path.lstrip('/') or 'index.html'
+        parts = relative.split('/')
+        if any(not part or part.startswith('.') for part in parts):
+            raise FileNotFoundError(url_path)
+        base = self.root
+        if len(parts) == 1 and relative in STATIC_PAGES:
+            pass
+        elif len(parts) == 2 and parts[0] in STATIC_JSON_DIRS and relative.endswith('.json'):
+            if parts[0] == 'data':
+                base, relative = self.data_dir, parts[1]
+        elif parts[0] == BUNDLE_DIR and relative.endswith(BUNDLE_SUFFIXES):
+            pass
+        else:
+            raise FileNotFoundError(url_path)
+        path = (base / relative).resolve()
+        if base not in path.parents or not path.is_file():
+            raise FileNotFoundError(url_path)
+        return path
+
+
+class DataServer:
+    """Threaded HTTP server exposing a DataStore"""
+
+    def __init__(self, store: Optional[DataStore] = None, host: str = '127.0.0.1', port: int = 0,
+                 cache_size: int = 512):
+        """
+        Args:
+            store: Data to serve (default: ./data and the repo's question banks)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            cache_size: Encoded responses kept in the LRU (0 disables it)
+        """
+        self.store = store or DataStore()
+        self.cache = ResponseCache(cache_size)
+        self.stats = Counter()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'DataServer':
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ========== ROUTING ==========
+
+    def resolve(self, path: str, query: Dict) -> Tuple[object, str, object]:
+        """
+        (stamp, content type, producer) for a request
+
+        stamp identifies the version of the underlying files; producer builds
+        the identity body and is only called on a cache miss.
+        """
+        store = self.store
+        parts = [p for p in path.split('/') if p]
+
+        if parts[:1] == ['api']:
+            if parts == ['api', 'topics']:
+                index_path = store.data_dir / 'topics_index.json'
+                decks = [t['file'] for t in store.topics_index().get('topics', [])
+                         if (store.data_dir / t['file']).is_file()]
+                stamp = (_stamp(index_path),) + tuple(store.deck_stamp(f) for f in decks)
+                return stamp, 'application/json', self._topics
+            if len(parts) == 3 and parts[1] == 'topics':
+                filename = store.topic_file(parts[2])
+                return store.deck_stamp(filename), 'application/json', lambda: self._deck_page(filename, query)
+            if len(parts) == 4 and parts[1] == 'topics' and parts[3] == 'changes':
+                filename = store.topic_file(parts[2])
+                since = _int_param(query, 'since', -1)
+                if since < 0:
+                    raise ValueError("'since' is required (the deck version the client holds)")
+                return store.deck_stamp(filename), 'application/json', \
+                    lambda: store.json_mgr.changes.changes_since(filename, since, store.deck(filename))
+            if parts == ['api', 'tests']:
+                sources = store.sources()
+                return tuple(_stamp(p) for p in sources.values()), 'application/json', self._tests
+            if parts == ['api', 'questions']:
+                source = query.get('source', 'pyq')
+                path_for = store.sources().get(source)
+                if path_for is None:
+                    raise FileNotFoundError(f"Unknown source: {source}")
+                return _stamp(path_for), 'application/json', lambda: self._question_page(source, query)
+            if parts == ['api', 'stats']:
+                return _stamp(store.pyq_path), 'application/json', self._stats
+            raise FileNotFoundError(path)
+
+        file_path = store.static_path(path)
+        content_type = mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+        return _stamp(file_path), content_type, file_path.read_bytes
+
+    def _topics(self) -> Dict:
+        """topics_index.json plus each deck's current version (for delta sync)"""
+        index = dict(self.store.topics_index())
+        topics = []
+        for topic in index.get('topics', []):
+            try:
+                topics.append({**topic, 'version': self.store.deck(topic['file']).get('version', 0)})
+            except FileNotFoundError:
+                topics.append(topic)
+        index['topics'] = topics
+        return index
+
+    def _deck_page(self, filename: str, query: Dict) -> Dict:
+        deck = self.store.deck(filename)
+        cards = deck.get('flashcards', [])
+        if query.get('q'):
+            keyword = query['q'].lower()
+            cards = [c for c in cards if keyword in c.get('q', '').lower() or keyword in c.get('a', '').lower()]
+        page = paginate(cards, query)
+        meta = {key: value for key, value in deck.items() if key != 'flashcards'}
+        return {**meta, 'file': filename, 'card_count': len(deck.get('flashcards', [])),
+                'total': page['total'], 'offset': page['offset'], 'limit': page['limit'],
+                'flashcards': page['items']}
+
+    def _question_page(self, source: str, query: Dict) -> Dict:
+        page = paginate(self.store.questions(source, query), query)
+        return {'source': source, 'total': page['total'], 'offset': page['offset'],
+                'limit': page['limit'], 'questions': page['items']}
+
+    def _tests(self) -> Dict:
+        tests = []
+        for source in self.store.sources():
+            test = self.store.test(source)
+            tests.append({'source': source,
+                          'name': test.get('test_name') or test.get('collection_name', source),
+                          'total_questions': len(test.get('questions', []))})
+        return {'tests': tests}
+
+    def _stats(self) -> Dict:
+        manager = self.store.manager()
+        return {'total': manager.cube.total,
+                'subjects': manager.get_subject_wise_stats(),
+                'years': manager.get_year_wise_stats(),
+                'difficulty': manager.get_difficulty_stats(),
+                'difficulty_by_subject': manager.get_difficulty_by_subject()}
+
+    def respond(self, path: str, query: Dict, accept_encoding: str) -> Tuple[str, str, str, bytes]:
+        """(etag, encoding, content type, encoded body) for a GET, via the LRU"""
+        stamp, content_type, producer = self.resolve(path, query)
+        encoding = choose_encoding(accept_encoding)
+        key = (path, tuple(sorted(query.items())), encoding, stamp)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached[0], cached[1], content_type, cached[2]
+
+        self.stats['cache_misses'] += 1
+        with METRICS.span('api.render', path=path) as span:
+            value = producer()
+            body = value if isinstance(value, bytes) else \
+                json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            if len(body) < MIN_COMPRESS:
+                encoding = 'identity'
+            etag = strong_etag(body, encoding)
+            encoded = encode_body(body, encoding)
+            span['bytes'] = len(encoded)
+        self.cache.put(key, (etag, encoding, encoded))
+        return etag, encoding, content_type, encoded
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as separate writes; without this keep-alive
+            # clients stall on Nagle + delayed ACK (~40ms per response)
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b'', headers: Dict = None, head_only: bool = False):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                if urlsplit(self.path).path.startswith('/api/'):
+                    self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body and not head_only:
+                    self.wfile.write(body)
+
+            def _error(self, status: int, message: str):
+                body = json.dumps({'error': message}).encode('utf-8')
+                self._send(status, body, {'Content-Type': 'application/json'})
+
+            def do_GET(self, head_only: bool = False):
+                server.stats['requests'] += 1
+                url = urlsplit(self.path)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                try:
+                    etag, encoding, content_type, body = server.respond(
+                        url.path, query, self.headers.get('Accept-Encoding', ''))
+                except FileNotFoundError as e:
+                    self._error(404, f"Not found: {e}")
+                    return
+                except ValueError as e:
+                    self._error(400, str(e))
+                    return
+                except Exception as e:
+                    self._error(500, f"{type(e).__name__}: {e}")
+                    return
+
+                headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+                if etag_matches(self.headers.get('If-None-Match', ''), etag):
+                    server.stats['not_modified'] += 1
+                    self._send(304, headers=headers)
+                    return
+                headers['Content-Type'] = content_type + ('; charset=utf-8' if 'json' in content_type else '')
+                if encoding != 'identity':
+                    headers['Content-Encoding'] = encoding
+                self._send(200, body, headers, head_only)
+
+            def do_HEAD(self):
+                self.do_GET(head_only=True)
+
+        return Handler
+
+
+# ========== LOAD GENERATOR ==========
+
+def load_test(url: str, paths: List[str], requests: int = 1000, concurrency: int = 8,
+              headers: Optional[Dict] = None) -> Dict:
+    """
+    Fire requests GETs (cycling through paths) over concurrency keep-alive
+    connections; returns requests/second and status counts
+    """
+    host, _, port = urlsplit(url).netloc.partition(':')
+    per_worker = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+
+    def worker(index: int) -> Counter:
+        statuses = Counter()
+        connection = http.client.HTTPConnection(host, int(port or 80), timeout=30)
+        try:
+            for n in range(per_worker[index]):
+                connection.request('GET', paths[(index + n * concurrency) % len(paths)], headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+                statuses[response.status] += 1
+        finally:
+            connection.close()
+        return statuses
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    statuses = sum(results, Counter())
+    return {'requests': requests, 'seconds': elapsed, 'rps': requests / elapsed if elapsed else 0.0,
+            'status': dict(statuses)}
+
+
+def bench_paths(store: DataStore) -> List[str]:
+    """A mix of deck pages, filtered question pages and stats"""
+    paths = ['/api/topics', '/api/tests', '/api/stats']
+    for topic in store.topics_index().get('topics', []):
+        for offset in (0, 20, 40):
+            paths.append(f"/api/topics/{topic['file']}?offset={offset}&limit=20")
+    manager = store.manager()
+    for subject in list(manager.get_subject_wise_stats())[:10]:
+        paths.append(f"/api/questions?subject={subject.replace(' ', '+')}&limit=20")
+    for difficulty in ('Easy', 'Medium', 'Hard'):
+        paths.append(f"/api/questions?difficulty={difficulty}&limit=50")
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AIBE local data API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--root', default='.', help="Web root for static files (index.html)")
+    parser.add_argument('--pyq', default='mock_tests/aibe_previous_years_collection.json')
+    parser.add_argument('--mock', action='append', default=None, help="Mock test file (repeatable)")
+    parser.add_argument('--cache-size', type=int, default=512, help="Encoded responses kept in memory")
+    parser.add_argument('--bench', action='store_true', help="Measure requests/second and exit")
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    store = DataStore(args.data_dir, args.root, args.pyq, tuple(args.mock or ['mock_test_1.json']))
+
+    if args.bench:
+        paths = bench_paths(store)
+        print(f"🚀 {args.requests} requests over {args.concurrency} connections, {len(paths)} distinct paths")
+        for cache_size in (0, args.cache_size):
+            for accept in ('identity', 'gzip'):
+                with DataServer(store, args.host, 0, cache_size) as server:
+                    result = load_test(server.url, paths, args.requests, args.concurrency,
+                                       {'Accept-Encoding': accept})
+                label = f"cache={cache_size} {accept}"
+                print(f"   {label:.<30} {result['rps']:>9.0f} req/s  {result['status']}")
+        raise SystemExit(0)
+
+    server = DataServer(store, args.host, args.port, args.cache_size)
+    print(f"🌐 Serving {store.data_dir} and {store.root} on {server.url}")
+    print(f"   Brotli: {'yes' if HAS_BROTLI else 'no (pip install brotli)'}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopped")
+    finally:
+        server.httpd.server_close()
@@ -0,0 +1,462 @@
+"""
+AIBE Data Validator
+Schema and integrity checks for topic decks, topics_index.json, mock tests,
+the previous-years collection and flashcard sets, with JSON-path errors
+
+    python data_validator.py                     # repo root, data/ and mock_tests/
+    python data_validator.py data --fix          # also rewrite derived counts
+    python data_validator.py --json report.json
+
+Schemas are small declarative specs compiled once into nested closures, so
+checking a file is plain function calls with no spec interpretation per
+value. Files are checked in parallel worker processes; cross-file checks
+(an index's card_count against each deck) run afterwards on the per-file
+facts the workers return.
+
+--fix rewrites only derived fields: card_count / total_cards / total_topics
+in topics_index.json and total_questions in tests and collections.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import List, Dict, Callable, Optional, Tuple
+
+DIFFICULTIES = ('Easy', 'Medium', 'Hard')
+
+Issue = Tuple[str, str, str]   # (severity, json path, message)
+
+
+# ========== SCHEMA COMPILER ==========
+
+def _type_name(value) -> str:
+    return {dict: 'object', list: 'array', str: 'string', bool: 'boolean', type(None): 'null'}.get(
+        type(value), 'number')
+
+
+def compile_schema(spec: Dict) -> Callable[[object, str, List[Issue]], None]:
+    """
+    Compile a spec into validate(value, path, issues)
+
+    Spec keys:
+        type      'object', 'array', 'string', 'int', 'number'
+        fields    {name: spec} required object fields
+        optional  {name: spec} optional object fields
+        items     spec for array elements
+        min       minimum array length / string length
+        unique    element field that must be unique within an array
+        enum      allowed values
+        check     extra fn(value, path, issues) run after the structural checks
+    """
+    kind = spec.get('type')
+    checks: List[Callable] = []
+
+    if kind == 'object':
+        required = [(name, '.' + name, compile_schema(sub)) for name, sub in spec.get('fields', {}).items()]
+        optional = [(name, '.' + name, compile_schema(sub)) for name, sub in spec.get('optional', {}).items()]
+
+        def check_object(value, path, issues):
+            if type(value) is not dict:
+                issues.append(('error', path, f"expected object, got {_type_name(value)}"))
+                return False
+            for name, suffix, validate in required:
+                if name in value:
+                    validate(value[name], path + suffix, issues)
+                else:
+                    issues.append(('error', path + suffix, "missing required field"))
+            for name, suffix, validate in optional:
+                if name in value:
+                    validate(value[name], path + suffix, issues)
+            return True
+        checks.append(check_object)
+
+    elif kind == 'array':
+        validate_item = compile_schema(spec['items']) if 'items' in spec else None
+        minimum = spec.get('min', 0)
+        unique = spec.get('unique')
+
+        def check_array(value, path, issues):
+            if type(value) is not list:
+                issues.append(('error', path, f"expected array, got {_type_name(value)}"))
+                return False
+            if len(value) < minimum:
+                issues.append(('error', path, f"expected at least {minimum} items, got {len(value)}"))
+            if validate_item is not None:
+                for i, item in enumerate(value):
+                    validate_item(item, f"{path}[{i}]", issues)
+            if unique:
+                seen = {}
+                for i, item in enumerate(value):
+                    key = item.get(unique) if type(item) is dict else None
+                    if key is None:
+                        continue
+                    if key in seen:
+                        issues.append(('error', f"{path}[{i}].{unique}",
+                                       f"duplicate {unique} {key!r} (first at [{seen[key]}])"))
+                    else:
+                        seen[key] = i
+            return True
+        checks.append(check_array)
+
+    elif kind == 'string':
+        minimum = spec.get('min', 0)
+
+        def check_string(value, path, issues):
+            if type(value) is not str:
+                issues.append(('error', path, f"expected string, got {_type_name(value)}"))
+                return False
+            if minimum and len(value.strip()) < minimum:
+                issues.append(('error', path, "empty string" if minimum == 1 else f"shorter than {minimum}"))
+            return True
+        checks.append(check_string)
+
+    elif kind in ('int', 'number'):
+        allowed = (int,) if kind == 'int' else (int, float)
+
+        def check_number(value, path, issues):
+            if type(value) not in allowed:
+                issues.append(('error', path, f"expected {'integer' if kind == 'int' else 'number'}, "
+                                              f"got {_type_name(value)}"))
+                return False
+            return True
+        checks.append(check_number)
+
+    if 'enum' in spec:
+        allowed_values = tuple(spec['enum'])
+
+        def check_enum(value, path, issues):
+            if value not in allowed_values:
+                issues.append(('error', path, f"{value!r} not one of {', '.join(map(str, allowed_values))}"))
+                return False
+            return True
+        checks.append(check_enum)
+
+    if 'check' in spec:
+        extra = spec['check']
+
+        def check_extra(value, path, issues):
+            extra(value, path, issues)
+            return True
+        checks.append(check_extra)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(value, path, issues):
+        # Structural failures stop later checks on the same value
+        for check in checks:
+            if not check(value, path, issues):
+                return
+    return validate
+
+
+# ========== CROSS-FIELD CHECKS ==========
+
+def _check_answer_index(question, path, issues):
+    options, correct = question.get('options'), question.get('correct')
+    if type(options) is list and type(correct) is int and not 0 <= correct < len(options):
+        issues.append(('error', f"{path}.correct", f"answer index {correct} outside options[0..{len(options) - 1}]"))
+
+
+def _check_total(field: str, items: str):
+    def check(value, path, issues):
+        if type(value.get(items)) is list and field in value and value[field] != len(value[items]):
+            issues.append(('error', f"{path}.{field}",
+                           f"{value[field]} but {items} has {len(value[items])} (fixable)"))
+    return check
+
+
+def _check_index_totals(index, path, issues):
+    _check_total('total_topics', 'topics')(index, path, issues)
+    topics = index.get('topics')
+    if type(topics) is list and type(index.get('total_cards')) is int:
+        total = sum(t['card_count'] for t in topics if type(t) is dict and type(t.get('card_count')) is int)
+        if index['total_cards'] != total:
+            issues.append(('error', f"{path}.total_cards", f"{index['total_cards']} but card_count sums to {total} (fixable)"))
+
+
+def _check_duplicate_questions(cards, path, issues):
+    seen = {}
+    for i, card in enumerate(cards):
+        if type(card) is dict and type(card.get('q')) is str:
+            key = ' '.join(card['q'].lower().split())
+            if key in seen:
+                issues.append(('warning', f"{path}[{i}].q", f"duplicate question (first at [{seen[key]}])"))
+            else:
+                seen[key] = i
+
+
+CARD = {'type': 'object', 'fields': {'q': {'type': 'string', 'min': 1}, 'a': {'type': 'string', 'min': 1}}}
+CARDS = {'type': 'array', 'items': CARD, 'check': _check_duplicate_questions}
+_validate_cards = compile_schema(CARDS)
+
+
+def _check_topic_cards(value, path, issues):
+    """flashcards_template.json style sets: {topic id: [cards]}"""
+    if type(value.get('flashcards')) is dict:
+        for key, cards in value['flashcards'].items():
+            _validate_cards(cards, f"{path}.flashcards.{key}", issues)
+
+OPTIONS = {'type': 'array', 'min': 2, 'items': {'type': 'string', 'min': 1}}
+QUESTION_FIELDS = {
+    'id': {'type': 'int'},
+    'subject': {'type': 'string', 'min': 1},
+    'question': {'type': 'string', 'min': 1},
+    'options': OPTIONS,
+    'correct': {'type': 'int'},
+}
+
+SCHEMAS = {
+    'deck': {
+        'type': 'object',
+        'fields': {
+            'topic_id': {'type': 'int'},
+            'topic_title': {'type': 'string', 'min': 1},
+            'topic_subtitle': {'type': 'string'},
+            'flashcards': CARDS,
+        },
+        'optional': {'version': {'type': 'int'}},
+    },
+    'index': {
+        'type': 'object',
+        'fields': {
+            'topics': {'type': 'array', 'unique': 'id', 'items': {
+                'type': 'object',
+                'fields': {'id': {'type': 'int'}, 'title': {'type': 'string', 'min': 1},
+                           'file': {'type': 'string', 'min': 1}},
+                'optional': {'subtitle': {'type': 'string'}, 'card_count': {'type': 'int'}},
+            }},
+        },
+        'optional': {'total_topics': {'type': 'int'}, 'total_cards': {'type': 'int'}},
+        'check': _check_index_totals,
+    },
+    'mock_test': {
+        'type': 'object',
+        'fields': {
+            'test_id': {'type': 'int'},
+            'questions': {'type': 'array', 'min': 1, 'unique': 'id', 'items': {
+                'type': 'object', 'fields': QUESTION_FIELDS,
+                'optional': {'explanation': {'type': 'string'}}, 'check': _check_answer_index,
+            }},
+        },
+        'optional': {'test_name': {'type': 'string'}, 'total_questions': {'type': 'int'},
+                     'passing_marks': {'type': 'number'}, 'duration_minutes': {'type': 'int'}},
+        'check': _check_total('total_questions', 'questions'),
+    },
+    'pyq': {
+        'type': 'object',
+        'fields': {
+            'collection_name': {'type': 'string', 'min': 1},
+            'questions': {'type': 'array', 'min': 1, 'unique': 'id', 'items': {
+                'type': 'object', 'fields': {**QUESTION_FIELDS, 'year': {'type': 'string', 'min': 1}},
+                'optional': {'explanation': {'type': 'string'}, 'section': {'type': 'string'},
+                             'case_law': {'type': 'string'}, 'difficulty': {'enum': DIFFICULTIES},
+                             'calibrated_difficulty': {'enum': DIFFICULTIES}},
+                'check': _check_answer_index,
+            }},
+        },
+        'optional': {'total_questions': {'type': 'int'}},
+        'check': _check_total('total_questions', 'questions'),
+    },
+    'flashcard_set': {
+        'type': 'object',
+        'fields': {
+            'topics': {'type': 'array', 'unique': 'id', 'items': {
+                'type': 'object', 'fields': {'id': {'type': 'int'}, 'title': {'type': 'string', 'min': 1}},
+                'optional': {'subtitle': {'type': 'string'}},
+            }},
+            'flashcards': {'type': 'object'},
+        },
+        'check': _check_topic_cards,
+    },
+}
+
+VALIDATORS = {kind: compile_schema(spec) for kind, spec in SCHEMAS.items()}
+
+
+def valid_cards(cards: List) -> List[Dict]:
+    """Cards with a non-empty string q and a (for filtering LLM output)"""
+    return [card for card in cards
+            if type(card) is dict and type(card.get('q')) is str and type(card.get('a')) is str
+            and card['q'].strip() and card['a'].strip()]
+
+
+def detect_kind(data) -> Optional[str]:
+    """File type from its top-level keys"""
+    if type(data) is not dict:
+        return None
+    if 'flashcards' in data:
+        return 'flashcard_set' if type(data['flashcards']) is dict else 'deck'
+    if 'test_id' in data:
+        return 'mock_test'
+    if 'collection_name' in data:
+        return 'pyq'
+    if 'topics' in data:
+        return 'index'
+    return None
+
+
+def validate_data(data, kind: Optional[str] = None) -> List[Issue]:
+    kind = kind or detect_kind(data)
+    if kind is None:
+        return [('warning', '$', "unrecognised file type (not a deck, index, mock test or collection)")]
+    issues: List[Issue] = []
+    VALIDATORS[kind](data, '$', issues)
+    return issues
+
+
+def validate_file(path: str) -> Dict:
+    """Validate one file; returns kind, issues and facts for cross-file checks"""
+    result = {'path': path, 'kind': None, 'issues': [], 'facts': {}}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        result['issues'] = [('error', '$', f"unreadable JSON: {e}")]
+        return result
+    result['kind'] = detect_kind(data)
+    result['issues'] = validate_data(data, result['kind'])
+    if result['kind'] == 'deck' and type(data.get('flashcards')) is list:
+        result['facts']['card_count'] = len(data['flashcards'])
+    elif result['kind'] == 'index' and type(data.get('topics')) is list:
+        result['facts']['topics'] = [(i, t.get('file'), t.get('card_count'))
+                                     for i, t in enumerate(data['topics']) if type(t) is dict]
+    return result
+
+
+# ========== CORPUS ==========
+
+def find_files(roots: List[str]) -> List[str]:
+    """JSON data files under roots (non-recursive; skips change logs, bundles and state)"""
+    files = []
+    for root in roots:
+        root_path = Path(root)
+        if root_path.is_file():
+            files.append(str(root_path))
+        elif root_path.is_dir():
+            files.extend(str(p) for p in sorted(root_path.glob('*.json')))
+    return list(dict.fromkeys(files))
+
+
+def cross_file_issues(results: List[Dict]) -> List[Dict]:
+    """Index entries against the decks next to them; returns rows {path, issue, fix}"""
+    decks = {str(Path(r['path']).resolve()): r['facts']['card_count']
+             for r in results if 'card_count' in r['facts']}
+    rows = []
+    for result in results:
+        base = Path(result['path']).parent
+        for i, filename, card_count in result['facts'].get('topics', []):
+            if not filename:
+                continue
+            deck_path = (base / filename).resolve()
+            path = f"$.topics[{i}]"
+            if str(deck_path) not in decks:
+                if not deck_path.exists():
+                    rows.append({'path': result['path'], 'issue': ('error', f"{path}.file", f"{filename} not found")})
+                continue
+            actual = decks[str(deck_path)]
+            if card_count != actual:
+                rows.append({'path': result['path'],
+                             'issue': ('error', f"{path}.card_count",
+                                       f"{card_count} but {filename} has {actual} cards (fixable)")})
+    return rows
+
+
+def validate_corpus(files: List[str], workers: Optional[int] = None) -> List[Dict]:
+    """Validate files in parallel and append cross-file issues to their results"""
+    if len(files) > 1 and (workers is None or workers > 1):
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(validate_file, files, chunksize=4))
+    else:
+        results = [validate_file(path) for path in files]
+    by_path = {r['path']: r for r in results}
+    for row in cross_file_issues(results):
+        by_path[row['path']]['issues'].append(row['issue'])
+    return results
+
+
+def fix_derived_fields(path: str, results: List[Dict]) -> List[str]:
+    """Rewrite derived counts in one file; returns descriptions of the changes"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    kind = detect_kind(data)
+    changes = []
+
+    if kind in ('mock_test', 'pyq') and type(data.get('questions')) is list:
+        if 'total_questions' in data and data['total_questions'] != len(data['questions']):
+            changes.append(f"total_questions {data['total_questions']} -> {len(data['questions'])}")
+            data['total_questions'] = len(data['questions'])
+
+    elif kind == 'index' and type(data.get('topics')) is list:
+        decks = {str(Path(r['path']).resolve()): r['facts']['card_count']
+                 for r in results if 'card_count' in r['facts']}
+        base = Path(path).parent
+        for topic in data['topics']:
+            actual = decks.get(str((base / topic.get('file', '')).resolve()))
+            if actual is not None and topic.get('card_count') != actual:
+                changes.append(f"{topic['file']} card_count {topic.get('card_count')} -> {actual}")
+                topic['card_count'] = actual
+        if 'total_topics' in data and data['total_topics'] != len(data['topics']):
+            changes.append(f"total_topics {data['total_topics']} -> {len(data['topics'])}")
+            data['total_topics'] = len(data['topics'])
+        if 'total_cards' in data:
+            total = sum(t.get('card_count', 0) for t in data['topics'] if type(t.get('card_count')) is int)
+            if data['total_cards'] != total:
+                changes.append(f"total_cards {data['total_cards']} -> {total}")
+                data['total_cards'] = total
+
+    if changes:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        os.replace(tmp_path, path)
+    return changes
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description="Validate AIBE data files")
+    parser.add_argument('paths', nargs='*', default=['.', 'data', 'mock_tests'],
+                        help="Files or directories (default: ., data, mock_tests)")
+    parser.add_argument('--fix', action='store_true', help="Rewrite card_count / total_* fields")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--warnings', action='store_true', help="Also print warnings")
+    parser.add_argument('--json', help="Write the full report to this file")
+    args = parser.parse_args()
+
+    files = find_files(args.paths)
+    t0 = time.perf_counter()
+    results = validate_corpus(files, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    if args.fix:
+        for result in results:
+            if result['kind'] in ('index', 'mock_test', 'pyq'):
+                for change in fix_derived_fields(result['path'], results):
+                    print(f"🔧 {result['path']}: {change}")
+        results = validate_corpus(files, args.workers)
+
+    errors = warnings = 0
+    for result in results:
+        file_errors = [i for i in result['issues'] if i[0] == 'error']
+        file_warnings = [i for i in result['issues'] if i[0] == 'warning']
+        errors += len(file_errors)
+        warnings += len(file_warnings)
+        shown = result['issues'] if args.warnings else file_errors
+        if shown:
+            print(f"\n❌ {result['path']} ({result['kind'] or 'unknown'})")
+            for severity, path, message in shown:
+                print(f"   {'⚠️ ' if severity == 'warning' else '  '}{path}: {message}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print(f"\n{'✅' if not errors else '❌'} {len(files)} files checked in {elapsed:.2f}s: "
+          f"{errors} errors, {warnings} warnings")
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,158 @@
+"""
+AIBE Deck Sync
+Per-topic version counters and change logs, so clients holding an older
+copy of a deck fetch only the cards added, changed or removed since
+
+JSONManager.save_topic bumps the deck's "version" field whenever its cards
+change and appends one line per version to data/changes/<deck>.jsonl:
+
+    {"v": 4, "t": 1718000000, "add": [{"id": ..., "card": {...}}],
+     "update": [{"id": ..., "card": {...}}], "remove": [id, ...]}
+
+Card ids are the same "<deck file>:<question hash>" ids the SRS scheduler
+uses. A patch from version N collapses every later line into one set of
+operations; when the log no longer reaches back to N the patch is the full
+deck instead ("full": true).
+
+    python deck_sync.py patch contract_law.json --since 3 -o contract_law.patch.json
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import List, Dict, Optional
+
+from srs_scheduler import card_id
+
+
+def diff_cards(filename: str, old_cards: List[Dict], new_cards: List[Dict]) -> Dict[str, List]:
+    """Cards added, changed and removed between two versions of a deck"""
+    old = {card_id(filename, card): card for card in old_cards}
+    new = {card_id(filename, card): card for card in new_cards}
+    return {
+        'add': [{'id': cid, 'card': card} for cid, card in new.items() if cid not in old],
+        'update': [{'id': cid, 'card': card} for cid, card in new.items() if cid in old and old[cid] != card],
+        'remove': [cid for cid in old if cid not in new],
+    }
+
+
+def has_changes(changes: Dict[str, List]) -> bool:
+    return any(changes.get(op) for op in ('add', 'update', 'remove'))
+
+
+class DeckChangeLog:
+    """Append-only per-deck change logs under <data_dir>/changes"""
+
+    def __init__(self, data_dir: str = 'data'):
+        self.root = Path(data_dir) / 'changes'
+
+    def path(self, filename: str) -> Path:
+        return self.root / f"{Path(filename).stem}.jsonl"
+
+    def append(self, filename: str, version: int, changes: Dict[str, List]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = {'v': version, 't': int(time.time()), **{op: changes.get(op, []) for op in ('add', 'update', 'remove')}}
+        with open(self.path(filename), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def entries(self, filename: str, since: int = 0) -> List[Dict]:
+        """Log lines with v > since, in version order"""
+        path = self.path(filename)
+        if not path.exists():
+            return []
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if entry['v'] > since:
+                        entries.append(entry)
+        return entries
+
+    def changes_since(self, filename: str, since: int, deck: Dict) -> Dict:
+        """
+        Collapsed patch taking a client from version since to the deck's version
+
+        Adds come in deck order; a card added and removed within the range
+        does not appear at all.
+        """
+        version = deck.get('version', 0)
+        patch = {'file': filename, 'from': since, 'to': version}
+        if since == version:
+            return {**patch, 'add': [], 'update': [], 'remove': []}
+
+        entries = self.entries(filename, since)
+        # The log must cover every version after since, without gaps
+        if since > version or [e['v'] for e in entries] != list(range(since + 1, version + 1)):
+            return {**patch, 'from': None, 'full': True, 'flashcards': deck.get('flashcards', [])}
+
+        existed: Dict[str, bool] = {}
+        final: Dict[str, Optional[Dict]] = {}
+        for entry in entries:
+            for op in ('add', 'update'):
+                for item in entry[op]:
+                    existed.setdefault(item['id'], op == 'update')
+                    final[item['id']] = item['card']
+            for cid in entry['remove']:
+                existed.setdefault(cid, True)
+                final[cid] = None
+
+        order = {card_id(filename, card): i for i, card in enumerate(deck.get('flashcards', []))}
+        added = [cid for cid, card in final.items() if card is not None and not existed[cid]]
+        added.sort(key=lambda cid: order.get(cid, len(order)))
+        return {
+            **patch,
+            'add': [{'id': cid, 'card': final[cid]} for cid in added],
+            'update': [{'id': cid, 'card': card} for cid, card in final.items() if card is not None and existed[cid]],
+            'remove': [cid for cid, card in final.items() if card is None and existed[cid]],
+        }
+
+
+def apply_patch(filename: str, cards: List[Dict], patch: Dict) -> List[Dict]:
+    """Client side: bring a local card list up to patch['to']"""
+    if patch.get('full'):
+        return list(patch['flashcards'])
+    removed = set(patch['remove'])
+    updated = {item['id']: item['card'] for item in patch['update']}
+    result = []
+    for card in cards:
+        cid = card_id(filename, card)
+        if cid not in removed:
+            result.append(updated.get(cid, card))
+    return result + [item['card'] for item in patch['add']]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AIBE deck change logs and delta patches")
+    parser.add_argument('--data-dir', default='data')
+    sub = parser.add_subparsers(dest='command', required=True)
+    log = sub.add_parser('log', help="Show a deck's version history")
+    log.add_argument('file')
+    patch = sub.add_parser('patch', help="Write the patch from a version to the current deck")
+    patch.add_argument('file')
+    patch.add_argument('--since', type=int, required=True)
+    patch.add_argument('-o', '--output', help="Patch file (default: <deck>.v<since>-v<current>.patch.json)")
+    args = parser.parse_args()
+
+    changelog = DeckChangeLog(args.data_dir)
+    with open(Path(args.data_dir) / args.file, 'r', encoding='utf-8') as f:
+        deck = json.load(f)
+
+    if args.command == 'log':
+        print(f"📚 {args.file}: version {deck.get('version', 0)}, {len(deck.get('flashcards', []))} cards")
+        for entry in changelog.entries(args.file):
+            print(f"   v{entry['v']:<4} {time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['t']))} "
+                  f"+{len(entry['add'])} ~{len(entry['update'])} -{len(entry['remove'])}")
+
+    elif args.command == 'patch':
+        result = changelog.changes_since(args.file, args.since, deck)
+        output = args.output or f"{Path(args.file).stem}.v{args.since}-v{result['to']}.patch.json"
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, separators=(',', ':'))
+        if result.get('full'):
+            print(f"⚠️  Log does not reach back to v{args.since}; wrote the full deck to {output}")
+        else:
+            print(f"✅ v{args.since} -> v{result['to']}: +{len(result['add'])} ~{len(result['update'])} "
+                  f"-{len(result['remove'])} ({Path(output).stat().st_size} bytes) -> {output}")
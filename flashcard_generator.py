@@ -5,183 +5,44 @@ Generates flashcards using various LLM providers and expands JSON data
 
 import json
 import os
-from typing import List, Dict
-import requests
+import time
 
-class FlashcardGenerator:
-    def __init__(self, provider='groq', api_key=None, config=None):
-        """
-        Initialize the flashcard generator
-        
-        Args:
-            provider: 'groq', 'openrouter', 'ollama', or 'openai'
-            api_key: API key for the provider
-            config: Additional configuration dict
-        """
-        self.provider = provider
-        self.api_key = api_key
-        self.config = config or {}
-        
-    def generate_flashcards(self, topic_title, topic_subtitle, count=15, existing_questions=None):
-        """
-        Generate flashcards for a specific topic
-        
-        Args:
-            topic_title: Main topic title
-            topic_subtitle: Topic subtitle/description
-            count: Number of cards to generate
-            existing_questions: List of existing questions to avoid duplication
-            
-        Returns:
-            List of flashcard dicts with 'q' and 'a' keys
-        """
-        existing_q_text = ""
-        if existing_questions:
-            existing_q_text = "\n\nExisting questions to avoid duplicating:\n" + "\n".join([f"- {q}" for q in existing_questions[:10]])
-        
-        prompt = f"""Generate {count} high-quality AIBE exam flashcards for the topic: "{topic_title}" ({topic_subtitle}).
+from generator_core import FlashcardGenerator, llm_config_from_env
+from instrumentation import METRICS
 
-Requirements:
-- Each card should have a clear Question (q) and detailed Answer (a)
-- Focus on exam-relevant concepts, sections, case laws, and principles
-- Answers should be comprehensive but concise (2-4 sentences)
-- Cover different subtopics within {topic_title}
-- Include section numbers, legal principles, and practical examples
-- Make questions progressively challenging
-- Avoid duplicating existing questions{existing_q_text}
 
-Format response as a JSON array:
-[
-  {{"q": "Question 1?", "a": "Answer 1"}},
-  {{"q": "Question 2?", "a": "Answer 2"}}
-]
+def _save_json_atomic(path, data):
+    """Write via a temp file so readers never see a half-written output"""
+    tmp_path = f"{path}.tmp"
+    with METRICS.span('storage.save', file=path) as span:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        span['bytes'] = os.path.getsize(path)
 
-Return ONLY the JSON array, no additional text or markdown formatting."""
 
-        response = self._call_llm(prompt)
-        return self._parse_flashcards(response)
-    
-    def _call_llm(self, prompt):
-        """Call the configured LLM provider"""
-        
-        system_prompt = "You are an expert in Indian law preparing AIBE exam questions. Generate high-quality flashcards in valid JSON format only."
-        
-        if self.provider == 'groq':
-            return self._call_groq(prompt, system_prompt)
-        elif self.provider == 'openrouter':
-            return self._call_openrouter(prompt, system_prompt)
-        elif self.provider == 'ollama':
-            return self._call_ollama(prompt, system_prompt)
-        elif self.provider == 'openai':
-            return self._call_openai(prompt, system_prompt)
-        else:
-            raise ValueError(f"Unknown provider: {self.provider}")
-    
-    def _call_groq(self, prompt, system_prompt):
-        """Call Groq API"""
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": self.config.get('model', 'llama-3.1-70b-versatile'),
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.8,
-            "max_tokens": 4000
-        }
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
-    
-    def _call_openrouter(self, prompt, system_prompt):
-        """Call OpenRouter API"""
-        url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://aibe-prep.local",
-            "X-Title": "AIBE Prep"
-        }
-        data = {
-            "model": self.config.get('model', 'meta-llama/llama-3.1-8b-instruct:free'),
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ]
-        }
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
-    
-    def _call_ollama(self, prompt, system_prompt):
-        """Call Ollama local API"""
-        url = f"{self.config.get('base_url', 'http://localhost:11434')}/api/chat"
-        data = {
-            "model": self.config.get('model', 'llama3.1'),
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            "stream": False
-        }
-        
-        response = requests.post(url, json=data)
-        response.raise_for_status()
-        return response.json()['message']['content']
-    
-    def _call_openai(self, prompt, system_prompt):
-        """Call OpenAI-compatible API"""
-        url = f"{self.config.get('base_url', 'https://api.openai.com/v1')}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": self.config.get('model', 'gpt-3.5-turbo'),
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ]
-        }
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
-    
-    def _parse_flashcards(self, response):
-        """Parse LLM response to extract flashcards"""
-        content = response.strip()
-        
-        # Remove markdown code blocks
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0]
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0]
-        
-        # Try to find JSON array
-        import re
-        json_match = re.search(r'\[[\s\S]*\]', content)
-        if json_match:
-            content = json_match.group(0)
-        
-        try:
-            cards = json.loads(content)
-            if not isinstance(cards, list):
-                raise ValueError("Response is not a list")
-            return cards
-        except Exception as e:
-            print(f"Error parsing response: {e}")
-            print(f"Response: {content[:200]}")
-            return []
+def _expand_topic(generator, topic, existing_cards, needed):
+    """Generate cards for one topic, dropping any whose question is already in the deck"""
+    existing_questions = [card['q'] for card in existing_cards]
+    new_cards = generator.generate_flashcards(
+        topic['title'],
+        topic['subtitle'],
+        count=needed,
+        existing_questions=existing_questions
+    )
+    seen = set(existing_questions)
+    unique_cards = []
+    for card in new_cards:
+        if card['q'] not in seen:
+            seen.add(card['q'])
+            unique_cards.append(card)
+    METRICS.incr('cards.added', len(unique_cards))
+    METRICS.incr('cards.duplicates', len(new_cards) - len(unique_cards))
+    return unique_cards, len(new_cards) - len(unique_cards)
 
 
-def expand_json_flashcards(input_file, output_file, generator, target_per_topic=15):
+def expand_json_flashcards(input_file, output_file, generator, target_per_topic=15, workers=1, resume=False,
+                           save_interval=1.0):
     """
     Expand existing JSON flashcards to meet minimum count
     
@@ -190,57 +51,67 @@ def expand_json_flashcards(input_file, output_file, generator, target_per_topic=
         output_file: Path to output JSON file
         generator: FlashcardGenerator instance
         target_per_topic: Minimum cards per topic
+        workers: Topics generated concurrently (bounded thread pool)
+        resume: Continue from a partially written output_file
+        save_interval: Minimum seconds between partial saves
+    
+    Finished topics are merged as they complete and the output is rewritten
+    atomically at most every save_interval seconds, so an interrupted run
+    keeps its progress (pick it up again with resume=True).
     """
+    source = output_file if resume and os.path.exists(output_file) else input_file
     
     # Load existing data
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with METRICS.span('storage.load', file=source, bytes=os.path.getsize(source)):
+        with open(source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
     
     topics = data.get('topics', [])
     flashcards = data.get('flashcards', {})
+    expanded_data = {
+        'topics': topics,
+        'flashcards': flashcards
+    }
     
-    print(f"Loaded {len(topics)} topics")
+    print(f"Loaded {len(topics)} topics" + (f" (resuming {output_file})" if source == output_file else ""))
     
-    # Process each topic
+    pending = []
     for topic in topics:
         topic_id = str(topic['id'])
-        existing_cards = flashcards.get(topic_id, [])
-        existing_count = len(existing_cards)
-        
-        print(f"\nTopic {topic_id}: {topic['title']}")
-        print(f"  Existing cards: {existing_count}")
-        
+        existing_count = len(flashcards.get(topic_id, []))
         if existing_count < target_per_topic:
-            needed = target_per_topic - existing_count
-            print(f"  Generating {needed} more cards...")
-            
-            existing_questions = [card['q'] for card in existing_cards]
-            
-            try:
-                new_cards = generator.generate_flashcards(
-                    topic['title'],
-                    topic['subtitle'],
-                    count=needed,
-                    existing_questions=existing_questions
-                )
-                
-                flashcards[topic_id] = existing_cards + new_cards
-                print(f"  ✅ Generated {len(new_cards)} cards")
-                
-            except Exception as e:
-                print(f"  ❌ Error: {e}")
+            pending.append((topic, target_per_topic - existing_count))
         else:
-            print(f"  ✅ Already has enough cards")
+            print(f"  ✅ Topic {topic_id}: {topic['title']} already has {existing_count} cards")
     
-    # Save expanded data
-    expanded_data = {
-        'topics': topics,
-        'flashcards': flashcards
-    }
+    last_save = time.monotonic()
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(expanded_data, f, indent=2, ensure_ascii=False)
+    def finish(topic, new_cards, duplicates):
+        nonlocal last_save
+        topic_id = str(topic['id'])
+        flashcards[topic_id] = flashcards.get(topic_id, []) + new_cards
+        if time.monotonic() - last_save >= save_interval:
+            _save_json_atomic(output_file, expanded_data)
+            last_save = time.monotonic()
+        print(f"  ✅ Topic {topic_id}: {topic['title']} +{len(new_cards)} cards"
+              + (f" ({duplicates} duplicates dropped)" if duplicates else ""))
+    
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    print(f"Generating for {len(pending)} topics on {max(1, workers)} workers")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(_expand_topic, generator, topic, list(flashcards.get(str(topic['id']), [])), needed): topic
+            for topic, needed in pending
+        }
+        # Saves happen on this thread only, in completion order
+        for future in as_completed(futures):
+            topic = futures[future]
+            try:
+                finish(topic, *future.result())
+            except Exception as e:
+                print(f"  ❌ Topic {topic['id']}: {topic['title']}: {e}")
     
+    _save_json_atomic(output_file, expanded_data)
     print(f"\n✅ Saved expanded flashcards to {output_file}")
 
 
@@ -283,15 +154,29 @@ def create_sample_json():
 # Example usage
 if __name__ == "__main__":
     import sys
+    from profiling import pop_profile_flag, maybe_profile
+    
+    # --profile / --profile=PREFIX wraps the expansion run
+    profile_prefix = pop_profile_flag(sys.argv)
     
     print("AIBE Flashcard Generator")
     print("=" * 50)
     
+    import argparse
+    parser = argparse.ArgumentParser(description="Expand a {topics, flashcards} JSON file")
+    parser.add_argument('command', nargs='?', choices=['sample'], help="Only write flashcards_sample.json")
+    parser.add_argument('--input', help="Input JSON (default: flashcards_sample.json, created if missing)")
+    parser.add_argument('--output', default='flashcards_expanded.json')
+    parser.add_argument('--target', type=int, default=15, help="Minimum cards per topic")
+    parser.add_argument('--workers', type=int, default=1, help="Topics generated concurrently")
+    parser.add_argument('--resume', action='store_true', help="Continue a partially written output file")
+    args = parser.parse_args()
+    
     # Configuration
     PROVIDER = os.environ.get('LLM_PROVIDER', 'groq')
     API_KEY = os.environ.get('LLM_API_KEY', '')
     
-    if len(sys.argv) > 1 and sys.argv[1] == 'sample':
+    if args.command == 'sample':
         create_sample_json()
         sys.exit(0)
     
@@ -304,18 +189,11 @@ if __name__ == "__main__":
         print("\nOr create sample JSON: python script.py sample")
         sys.exit(1)
     
-    # Configure generator
-    config = {}
+    # Provider defaults live in generator_core.PROVIDERS; LLM_BASE_URL / LLM_MODEL /
+    # LLM_CACHE override them (see mock_llm_server.py for offline runs)
+    config = llm_config_from_env()
     if PROVIDER == 'ollama':
-        config = {
-            'base_url': 'http://localhost:11434',
-            'model': 'llama3.1'
-        }
         API_KEY = None  # Ollama doesn't need API key
-    elif PROVIDER == 'openrouter':
-        config = {'model': 'meta-llama/llama-3.1-8b-instruct:free'}
-    elif PROVIDER == 'groq':
-        config = {'model': 'llama-3.1-70b-versatile'}
     
     generator = FlashcardGenerator(
         provider=PROVIDER,
@@ -324,20 +202,23 @@ if __name__ == "__main__":
     )
     
     # Check for input file
-    input_file = 'flashcards_sample.json'
-    output_file = 'flashcards_expanded.json'
+    input_file = args.input or 'flashcards_sample.json'
+    output_file = args.output
     
     if not os.path.exists(input_file):
         print(f"\n⚠️  Input file '{input_file}' not found!")
+        if args.input:
+            sys.exit(1)
         print("Creating sample file first...")
         create_sample_json()
     
     print(f"\n📚 Expanding flashcards from {input_file}")
-    print(f"   Target: 15 cards per topic")
-    print(f"   Provider: {PROVIDER}\n")
+    print(f"   Target: {args.target} cards per topic")
+    print(f"   Provider: {PROVIDER}, {args.workers} workers\n")
     
     try:
-        expand_json_flashcards(input_file, output_file, generator, target_per_topic=15)
+        maybe_profile(profile_prefix, expand_json_flashcards, input_file, output_file, generator,
+                      target_per_topic=args.target, workers=args.workers, resume=args.resume)
         print("\n" + "=" * 50)
         print("✅ Done! Use the expanded JSON in your HTML app.")
         
@@ -345,3 +226,5 @@ if __name__ == "__main__":
         print(f"\n❌ Error: {e}")
         import traceback
         traceback.print_exc()
+    
+    METRICS.finish_run()
@@ -0,0 +1,443 @@
+"""
+AIBE Generator Core
+The FlashcardGenerator shared by flashcard_generator.py and
+json_scraper_generator.py: prompts, a provider registry, pooled HTTP
+sessions, retries, an optional response cache and METRICS spans
+
+Providers are looked up by name, so adding a service is one call:
+
+    register_provider(Provider('together', 'https://api.together.xyz/v1',
+                               'meta-llama/Llama-3-70b-chat-hf'))
+    generator = FlashcardGenerator(provider='together', api_key=key)
+
+Generator config keys (all optional):
+    base_url, model, timeout   override the provider defaults
+    retries, backoff           retry 429 / 5xx / connection errors (default 2, 1s doubling)
+    cache                      ResponseCache; responses that parsed into cards are reused
+    throttle                   HostThrottle spacing calls (default: the shared LLM_THROTTLE)
+    context_tokens             budget for existing questions shown in prompts (context_selector.py)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Optional
+
+from context_selector import DEFAULT_BUDGET, select_context
+from crawl_frontier import HostThrottle
+from data_validator import valid_cards
+from instrumentation import METRICS, llm_usage
+
+SYSTEM_PROMPT = ("You are an expert in Indian law preparing AIBE exam questions. "
+                 "Generate high-quality flashcards in valid JSON format only.")
+MAX_CONTENT_LENGTH = 8000
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 60
+
+# Shared by every generator in the process; delay is 0 (off) unless a
+# caller such as batch_jobs.py sets it
+LLM_THROTTLE = HostThrottle(0)
+
+
+# ========== PROVIDERS ==========
+
+class Provider:
+    """How to reach one LLM service"""
+
+    def __init__(self, name: str, base_url: str, model: str, protocol: str = 'openai',
+                 headers: Optional[Dict] = None, options: Optional[Dict] = None,
+                 timeout: float = 60, needs_key: bool = True):
+        """
+        Args:
+            protocol: 'openai' (POST /chat/completions) or 'ollama' (POST /api/chat)
+            headers: Extra request headers
+            options: Extra request body fields (temperature, max_tokens, ...)
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol: {protocol}")
+        self.name = name
+        self.base_url = base_url
+        self.model = model
+        self.protocol = protocol
+        self.headers = headers or {}
+        self.options = options or {}
+        self.timeout = timeout
+        self.needs_key = needs_key
+
+
+# protocol -> (endpoint path, payload -> response text)
+PROTOCOLS = {
+    'openai': ('/chat/completions', lambda payload: payload['choices'][0]['message']['content']),
+    'ollama': ('/api/chat', lambda payload: payload['message']['content']),
+}
+
+PROVIDERS: Dict[str, Provider] = {}
+
+
+def register_provider(provider: Provider) -> Provider:
+    PROVIDERS[provider.name] = provider
+    return provider
+
+
+register_provider(Provider('groq', 'https://api.groq.com/openai/v1', 'llama-3.1-70b-versatile',
+                           options={'temperature': 0.8, 'max_tokens': 4000}))
+register_provider(Provider('openrouter', 'https://openrouter.ai/api/v1', 'meta-llama/llama-3.1-8b-instruct:free',
+                           headers={'HTTP-Referer': 'https://aibe-prep.local', 'X-Title': 'AIBE Prep'}))
+register_provider(Provider('openai', 'https://api.openai.com/v1', 'gpt-3.5-turbo'))
+register_provider(Provider('ollama', 'http://localhost:11434', 'llama3.1', protocol='ollama',
+                           options={'stream': False}, timeout=120, needs_key=False))
+
+
+def get_provider(name: str) -> Provider:
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown provider: {name} (registered: {', '.join(PROVIDERS)})")
+    return PROVIDERS[name]
+
+
+# ========== SESSIONS & CACHE ==========
+
+_local = threading.local()
+
+
+def http_session():
+    """Per-thread requests session, so calls reuse keep-alive connections"""
+    if not hasattr(_local, 'session'):
+        # Imported on first use: requests costs ~100ms of startup
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+    return _local.session
+
+
+class ResponseCache:
+    """LRU of LLM responses, optionally persisted as a JSON-lines file"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 4096):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._remember(entry['k'], entry['r'])
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _remember(self, key: str, response: str):
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: str):
+        with self._lock:
+            self._remember(key, response)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'k': key, 'r': response}, ensure_ascii=False) + '\n')
+
+
+@contextmanager
+def llm_errors():
+    """
+    Collect the LLM calls that fail on this thread inside the block
+
+    The generate_* helpers swallow errors and return [], so callers that need
+    to tell "nothing new" from "never reached the LLM" (batch_jobs.py) check this.
+
+        with llm_errors() as errors:
+            workflow_add_cards('contract_law.json', 10)
+        if errors: ...
+    """
+    previous = getattr(_local, 'errors', None)
+    _local.errors = errors = []
+    try:
+        yield errors
+    finally:
+        _local.errors = previous
+
+
+_caches: Dict[str, ResponseCache] = {}
+
+
+def shared_cache(path: str) -> ResponseCache:
+    """One ResponseCache per file for the whole process"""
+    if path not in _caches:
+        _caches[path] = ResponseCache(path)
+    return _caches[path]
+
+
+def llm_config_from_env() -> Dict:
+    """Generator config from LLM_BASE_URL (mock or proxy server), LLM_MODEL and LLM_CACHE"""
+    config = {}
+    if os.environ.get('LLM_BASE_URL'):
+        config['base_url'] = os.environ['LLM_BASE_URL'].rstrip('/')
+    if os.environ.get('LLM_MODEL'):
+        config['model'] = os.environ['LLM_MODEL']
+    if os.environ.get('LLM_CACHE'):
+        config['cache'] = shared_cache(os.environ['LLM_CACHE'])
+    return config
+
+
+# ========== GENERATOR ==========
+
+class FlashcardGenerator:
+    """Generate flashcards from topics, scraped content or bare-act sections"""
+
+    def __init__(self, provider: str = 'groq', api_key: Optional[str] = None, config: Optional[Dict] = None):
+        """
+        Args:
+            provider: Registered provider name ('groq', 'openrouter', 'ollama', 'openai', ...)
+            api_key: API key for the provider
+            config: Overrides, see the module docstring
+        """
+        self.provider = provider
+        self.api_key = api_key
+        self.config = config or {}
+
+    # ---------- prompts ----------
+
+    def generate_flashcards(self, topic_title: str, topic_subtitle: str, count: int = 15,
+                            existing_questions: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Generate flashcards for a topic, avoiding existing questions
+
+        Raises on LLM errors (callers decide whether to skip the topic).
+        """
+        existing_q_text = self._existing_context(existing_questions, topic_title, topic_subtitle)
+
+        prompt = f"""Generate {count} high-quality AIBE exam flashcards for the topic: "{topic_title}" ({topic_subtitle}).
+
+Requirements:
+- Each card should have a clear Question (q) and detailed Answer (a)
+- Focus on exam-relevant concepts, sections, case laws, and principles
+- Answers should be comprehensive but concise (2-4 sentences)
+- Cover different subtopics within {topic_title}
+- Include section numbers, legal principles, and practical examples
+- Make questions progressively challenging
+- Avoid duplicating existing questions{existing_q_text}
+
+Format response as a JSON array:
+[
+  {{"q": "Question 1?", "a": "Answer 1"}},
+  {{"q": "Question 2?", "a": "Answer 2"}}
+]
+
+Return ONLY the JSON array, no additional text or markdown formatting."""
+
+        return self.generate(prompt)
+
+    def generate_from_content(self, content: str, topic: str, count: int = 15) -> List[Dict]:
+        """Generate flashcards from scraped content"""
+        if len(content) > MAX_CONTENT_LENGTH:
+            content = content[:MAX_CONTENT_LENGTH] + "..."
+
+        prompt = f"""Based on the following content about {topic}, generate {count} high-quality AIBE exam flashcards.
+
+CONTENT:
+{content}
+
+REQUIREMENTS:
+- Extract key legal concepts, definitions, sections, and principles
+- Each card should have a clear Question (q) and detailed Answer (a)
+- Focus on exam-relevant information
+- Answers should be 2-4 sentences
+- Include section numbers and case laws where mentioned
+- Cover different aspects of the topic
+
+Format response as JSON array:
+[
+  {{"q": "Question 1?", "a": "Answer 1"}},
+  {{"q": "Question 2?", "a": "Answer 2"}}
+]
+
+Return ONLY the JSON array, no additional text."""
+
+        try:
+            cards = self.generate(prompt)
+            print(f"✅ Generated {len(cards)} flashcards from content")
+            return cards
+        except Exception as e:
+            print(f"❌ Error generating flashcards: {e}")
+            return []
+
+    def generate_from_sections(self, sections: List[Dict], topic: str, count: int = 15) -> List[Dict]:
+        """Generate flashcards from parsed bare-act sections (see bare_act_parser.chunk_sections)"""
+        from bare_act_parser import format_section
+        content = "\n\n".join(format_section(section) for section in sections)
+        return self.generate_from_content(content, topic, count=count)
+
+    def generate_topic_cards(self, topic_title: str, topic_subtitle: str, count: int = 15,
+                             existing_questions: Optional[List[str]] = None) -> List[Dict]:
+        """Generate flashcards for a topic using LLM knowledge"""
+        existing_q_text = self._existing_context(existing_questions, topic_title, topic_subtitle)
+
+        prompt = f"""Generate {count} high-quality AIBE exam flashcards for: "{topic_title}" ({topic_subtitle}).
+
+REQUIREMENTS:
+- Cover key concepts, sections, case laws, and principles
+- Each card: clear Question (q) and detailed Answer (a)
+- Answers: 2-4 sentences, exam-focused
+- Include relevant section numbers
+- Progressive difficulty
+- Different subtopics{existing_q_text}
+
+Format: JSON array only
+[
+  {{"q": "Question?", "a": "Answer"}},
+  ...
+]"""
+
+        try:
+            return self.generate(prompt)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return []
+
+    def _existing_context(self, existing_questions: Optional[List[str]], topic_title: str,
+                          topic_subtitle: str) -> str:
+        """Prompt section listing representative existing questions within the context budget"""
+        if not existing_questions:
+            return ""
+        with METRICS.span('llm.context', items=len(existing_questions)) as span:
+            context = select_context(existing_questions, f"{topic_title} {topic_subtitle}",
+                                     self.config.get('context_tokens', DEFAULT_BUDGET))
+            text = context.render()
+            span['bytes'] = len(text)
+        return "\n\nExisting questions to avoid duplicating:\n" + text if text else ""
+
+    # ---------- engine ----------
+
+    def generate(self, prompt: str, system_prompt: str = SYSTEM_PROMPT) -> List[Dict]:
+        """Call the LLM (or the cache) and parse the cards out of the response"""
+        cache: Optional[ResponseCache] = self.config.get('cache')
+        key = None
+        if cache is not None:
+            provider = get_provider(self.provider)
+            key = ResponseCache.key(self.provider, self.config.get('base_url', provider.base_url),
+                                    self.config.get('model', provider.model), system_prompt, prompt)
+            response = cache.get(key)
+            if response is not None:
+                METRICS.incr('llm.cache_hits')
+                return self._parse_flashcards(response)
+
+        response = self._call_llm(prompt, system_prompt)
+        cards = self._parse_flashcards(response)
+        if key and cards:
+            # Only responses that produced cards are worth replaying
+            cache.put(key, response)
+        return cards
+
+    def _call_llm(self, prompt: str, system_prompt: str = SYSTEM_PROMPT) -> str:
+        """POST one chat request to the configured provider, retrying transient failures"""
+        provider = get_provider(self.provider)
+        path, extract = PROTOCOLS[provider.protocol]
+        url = f"{self.config.get('base_url', provider.base_url)}{path}"
+        headers = dict(provider.headers)
+        if self.api_key and provider.needs_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        data = {
+            'model': self.config.get('model', provider.model),
+            'messages': [
+                {'role': 'system', 'content': system_prompt},
+                {'role': 'user', 'content': prompt}
+            ],
+            **provider.options
+        }
+
+        self.config.get('throttle', LLM_THROTTLE).wait(self.provider)
+        try:
+            return self._post_with_retries(url, headers, data, extract, len(prompt))
+        except Exception as e:
+            errors = getattr(_local, 'errors', None)
+            if errors is not None:
+                errors.append(f"{type(e).__name__}: {e}")
+            raise
+
+    def _post_with_retries(self, url: str, headers: Dict, data: Dict, extract, prompt_chars: int) -> str:
+        """_call_llm's request loop: retry 429 / 5xx / connection errors with backoff"""
+        import requests
+        provider = get_provider(self.provider)
+        retries = self.config.get('retries', 2)
+        backoff = self.config.get('backoff', 1.0)
+        with METRICS.span('llm.call', provider=self.provider, prompt_chars=prompt_chars):
+            for attempt in range(retries + 1):
+                try:
+                    response = http_session().post(url, headers=headers, json=data,
+                                                   timeout=self.config.get('timeout', provider.timeout))
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt == retries:
+                        raise
+                    delay = backoff * 2 ** attempt
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt == retries:
+                        response.raise_for_status()
+                        return extract(self._llm_json(response))
+                    retry_after = response.headers.get('Retry-After', '')
+                    delay = min(float(retry_after), MAX_RETRY_AFTER) if retry_after.isdigit() else backoff * 2 ** attempt
+                METRICS.incr('llm.retries', provider=self.provider)
+                time.sleep(delay)
+
+    def _llm_json(self, response) -> Dict:
+        """Decode an LLM HTTP response and record bytes and token usage"""
+        payload = response.json()
+        METRICS.annotate(bytes=len(response.content), status=response.status_code, **llm_usage(payload))
+        return payload
+
+    def _parse_flashcards(self, response: str) -> List[Dict]:
+        """Parse LLM response to extract flashcards"""
+        with METRICS.span('llm.parse', bytes=len(response)) as span:
+            cards = self._parse_flashcards_text(response)
+            span['items'] = len(cards)
+        if not cards:
+            METRICS.incr('llm.parse_failures')
+        return cards
+
+    def _parse_flashcards_text(self, response: str) -> List[Dict]:
+        content = response.strip()
+
+        # Remove markdown code blocks
+        if '```json' in content:
+            content = content.split('```json')[1].split('```')[0]
+        elif '```' in content:
+            content = content.split('```')[1].split('```')[0]
+
+        # Find JSON array
+        json_match = re.search(r'\[[\s\S]*\]', content)
+        if json_match:
+            content = json_match.group(0)
+
+        try:
+            cards = json.loads(content)
+            if not isinstance(cards, list):
+                raise ValueError("Response is not a list")
+            return valid_cards(cards)
+        except Exception as e:
+            print(f"Parse error: {e}")
+            print(f"Response: {content[:200]}")
+            return []
@@ -0,0 +1,351 @@
+"""
+AIBE HTML Extraction
+Streaming text extraction for the legal source pages
+
+Only the subtrees that LegalContentScraper actually reads are collected
+(div.result, div.judgments, #mw-content-text); everything else is tokenized
+and discarded without building a DOM. Engines:
+
+    'lxml'   - libxml2 SAX-style parser target (fastest, needs lxml)
+    'stream' - stdlib html.parser.HTMLParser (no dependencies)
+    'bs4'    - BeautifulSoup full DOM (original behaviour, for comparison)
+    'auto'   - lxml if installed, else stream
+
+Compare engines on saved pages:
+    python html_extract.py compare pages/*.html
+"""
+
+import importlib.util
+import sys
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+# lxml.etree is imported by the lxml engine on first use, not at startup
+HAS_LXML = importlib.util.find_spec('lxml') is not None
+
+
+# (tag or None for any tag, attribute, value); class values match any class token
+RESULT_DIV = ('div', 'class', 'result')
+JUDGMENT_DIV = ('div', 'class', 'judgments')
+WIKI_CONTENT = (None, 'id', 'mw-content-text')
+
+SKIP_TAGS = frozenset({'script', 'style'})
+VOID_TAGS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                       'link', 'meta', 'param', 'source', 'track', 'wbr'})
+CHUNK_SIZE = 64 * 1024
+
+
+class _StopParsing(Exception):
+    """Raised from a parser callback once enough blocks were collected"""
+
+
+def clean_text(text: str) -> str:
+    """Strip each line, split on double spaces, drop empty pieces (one phrase per line)"""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return '\n'.join(chunk for chunk in chunks if chunk)
+
+
+class HTMLBlock:
+    """Text, paragraphs and links of one matched element"""
+
+    __slots__ = ('selector', 'pieces', 'paragraphs', 'links')
+
+    def __init__(self, selector: Tuple):
+        self.selector = selector
+        self.pieces: List[str] = []
+        self.paragraphs: List[str] = []
+        self.links: List[Dict] = []
+
+    @property
+    def text(self) -> str:
+        return clean_text('\n'.join(self.pieces))
+
+    def first_link(self, css_class: str) -> Optional[Dict]:
+        """First <a> carrying the given class"""
+        for link in self.links:
+            if css_class in link['classes']:
+                return link
+        return None
+
+
+def _matches(selector: Tuple, tag: str, attrs: Dict) -> bool:
+    want_tag, attr, value = selector
+    if want_tag and tag != want_tag:
+        return False
+    actual = attrs.get(attr)
+    if actual is None:
+        return False
+    if attr == 'class':
+        return value in actual.split()
+    return actual == value
+
+
+class _ExtractorCore:
+    """
+    Parser-agnostic state machine
+
+    Receives start/end/data events (also usable directly as an lxml parser
+    target) and fills HTMLBlocks for the outermost matching elements.
+    """
+
+    def __init__(self, selectors: List[Tuple], limit: Optional[int] = None):
+        self.selectors = selectors
+        self.limit = limit
+        self.blocks: List[HTMLBlock] = []
+        self._stack: List[str] = []
+        self._block: Optional[HTMLBlock] = None
+        self._block_depth = 0
+        self._skip_depth = 0
+        self._para: Optional[List[str]] = None
+        self._para_depth = 0
+        self._link: Optional[Dict] = None
+        self._link_depth = 0
+        # Parsers may split one text node across several data() calls
+        self._in_text = False
+
+    # lxml target interface
+    def start(self, tag, attrib):
+        self._in_text = False
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in VOID_TAGS:
+            return
+        self._stack.append(tag)
+        depth = len(self._stack)
+
+        if self._block is None:
+            attrs = dict(attrib)
+            for selector in self.selectors:
+                if _matches(selector, tag, attrs):
+                    self._block = HTMLBlock(selector)
+                    self._block_depth = depth
+                    break
+            return
+
+        if self._skip_depth:
+            return
+        if tag in SKIP_TAGS:
+            self._skip_depth = depth
+        elif tag == 'p' and self._para is None:
+            self._para = []
+            self._para_depth = depth
+        elif tag == 'a' and self._link is None:
+            attrs = dict(attrib)
+            self._link = {'href': attrs.get('href', ''), 'classes': (attrs.get('class') or '').split(),
+                          'pieces': []}
+            self._link_depth = depth
+
+    def end(self, tag):
+        self._in_text = False
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag not in self._stack:
+            return
+        # Pop implicitly closed elements too (unclosed <p>, <li>, ...)
+        while self._stack:
+            depth = len(self._stack)
+            popped = self._stack.pop()
+            self._close(depth)
+            if popped == tag:
+                break
+
+    def _close(self, depth: int):
+        if self._block is None:
+            return
+        if self._skip_depth == depth:
+            self._skip_depth = 0
+        if self._para is not None and self._para_depth == depth:
+            self._block.paragraphs.append(''.join(self._para).strip())
+            self._para = None
+        if self._link is not None and self._link_depth == depth:
+            link = self._link
+            link['text'] = ''.join(link.pop('pieces')).strip()
+            self._block.links.append(link)
+            self._link = None
+        if self._block_depth == depth:
+            self.blocks.append(self._block)
+            self._block = None
+            if self.limit and len(self.blocks) >= self.limit:
+                raise _StopParsing()
+
+    def data(self, text):
+        if self._block is None or self._skip_depth:
+            return
+        if self._in_text:
+            self._block.pieces[-1] += text
+        else:
+            self._block.pieces.append(text)
+            self._in_text = True
+        if self._para is not None:
+            self._para.append(text)
+        if self._link is not None:
+            self._link['pieces'].append(text)
+
+    def comment(self, text):
+        self._in_text = False
+
+    def close(self):
+        while self._stack and self._block is not None:
+            depth = len(self._stack)
+            self._stack.pop()
+            self._close(depth)
+        return self.blocks
+
+
+class _StreamParser(HTMLParser):
+    """html.parser front end for _ExtractorCore"""
+
+    def __init__(self, core: _ExtractorCore):
+        super().__init__(convert_charrefs=True)
+        self.core = core
+
+    def handle_starttag(self, tag, attrs):
+        self.core.start(tag, [(k, v or '') for k, v in attrs])
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        self.core.end(tag)
+
+    def handle_data(self, data):
+        self.core.data(data)
+
+    def handle_comment(self, data):
+        self.core.comment(data)
+
+
+def _decode(content, encoding: Optional[str]) -> str:
+    if isinstance(content, str):
+        return content
+    return content.decode(encoding or 'utf-8', errors='replace')
+
+
+def _extract_stream(content, selectors, limit, encoding) -> List[HTMLBlock]:
+    core = _ExtractorCore(selectors, limit)
+    parser = _StreamParser(core)
+    text = _decode(content, encoding)
+    try:
+        for offset in range(0, len(text), CHUNK_SIZE):
+            parser.feed(text[offset:offset + CHUNK_SIZE])
+        parser.close()
+    except _StopParsing:
+        pass
+    return core.close()
+
+
+def _extract_lxml(content, selectors, limit, encoding) -> List[HTMLBlock]:
+    from lxml import etree
+    core = _ExtractorCore(selectors, limit)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+        encoding = 'utf-8'
+    parser = etree.HTMLParser(target=core, encoding=encoding, recover=True)
+    try:
+        for offset in range(0, len(content), CHUNK_SIZE):
+            parser.feed(content[offset:offset + CHUNK_SIZE])
+        parser.close()
+    except _StopParsing:
+        pass
+    except etree.XMLSyntaxError:
+        pass
+    return core.close()
+
+
+def _extract_bs4(content, selectors, limit, encoding) -> List[HTMLBlock]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding if not isinstance(content, str) else None)
+
+    def attrs_of(element):
+        return {k: ' '.join(v) if isinstance(v, list) else v for k, v in element.attrs.items()}
+
+    candidates = [(element, selector) for element in soup.find_all(True)
+                  for selector in selectors if _matches(selector, element.name, attrs_of(element))]
+    matched = {id(element) for element, _ in candidates}
+
+    blocks = []
+    for element, selector in candidates:
+        if any(id(parent) in matched for parent in element.parents):
+            continue
+        for junk in element(list(SKIP_TAGS)):
+            junk.decompose()
+        block = HTMLBlock(selector)
+        block.pieces = [element.get_text(separator='\n')]
+        block.paragraphs = [p.text.strip() for p in element.find_all('p')]
+        block.links = [{'href': a.get('href', ''), 'classes': a.get('class') or [],
+                        'text': a.text.strip()} for a in element.find_all('a')]
+        blocks.append(block)
+        if limit and len(blocks) >= limit:
+            break
+    return blocks
+
+
+ENGINES = {
+    'lxml': _extract_lxml,
+    'stream': _extract_stream,
+    'bs4': _extract_bs4,
+}
+
+
+def resolve_engine(engine: str = 'auto') -> str:
+    """Map 'auto' to the fastest available engine"""
+    if engine == 'auto':
+        return 'lxml' if HAS_LXML else 'stream'
+    if engine == 'lxml' and not HAS_LXML:
+        raise ValueError("lxml engine requested but lxml is not installed (pip install lxml)")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown HTML engine: {engine}")
+    return engine
+
+
+def extract_blocks(content, selectors: List[Tuple], limit: Optional[int] = None,
+                   engine: str = 'auto', encoding: Optional[str] = None) -> List[HTMLBlock]:
+    """
+    Extract the outermost elements matching any selector
+
+    Args:
+        content: Page body (bytes or str)
+        selectors: List of (tag, attribute, value) tuples, e.g. RESULT_DIV
+        limit: Stop parsing after this many blocks
+        engine: 'auto', 'lxml', 'stream' or 'bs4'
+        encoding: Byte encoding of content (default utf-8)
+    """
+    return ENGINES[resolve_engine(engine)](content, selectors, limit, encoding)
+
+
+def compare_engines(paths: List[str], selectors: List[Tuple] = None, repeat: int = 3) -> List[Dict]:
+    """Time every available engine on saved pages and check their text agrees"""
+    selectors = selectors or [RESULT_DIV, JUDGMENT_DIV, WIKI_CONTENT]
+    engines = [e for e in ENGINES if e != 'lxml' or HAS_LXML]
+    rows = []
+    for path in paths:
+        content = Path(path).read_bytes()
+        texts = {}
+        row = {'file': path, 'bytes': len(content)}
+        for engine in engines:
+            best = float('inf')
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                blocks = extract_blocks(content, selectors, engine=engine)
+                best = min(best, time.perf_counter() - t0)
+            texts[engine] = [b.text for b in blocks]
+            row[f'{engine}_s'] = best
+        row['blocks'] = len(texts['bs4'])
+        row['agree'] = all(t == texts['bs4'] for t in texts.values())
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != 'compare':
+        print("Usage: python html_extract.py compare page1.html [page2.html ...]")
+        sys.exit(1)
+
+    print("AIBE HTML Extraction - engine comparison")
+    print("=" * 70)
+    for row in compare_engines(sys.argv[2:]):
+        timings = '  '.join(f"{k[:-2]} {v * 1000:.1f}ms" for k, v in row.items() if k.endswith('_s'))
+        status = "✅" if row['agree'] else "⚠️  text differs"
+        print(f"{Path(row['file']).name} ({row['bytes'] // 1024} KB, {row['blocks']} blocks): {timings} {status}")
@@ -0,0 +1,269 @@
+"""
+AIBE Instrumentation
+Lightweight spans and counters for the scraper, generator and storage layers
+
+    from instrumentation import METRICS
+
+    with METRICS.span('http.fetch', url=url) as s:
+        response = session.get(url)
+        s['bytes'] = len(response.content)
+
+    METRICS.incr('cache.hits')
+
+Set AIBE_METRICS_LOG=metrics.jsonl to stream every span as a JSON line, and
+AIBE_METRICS_PROM=metrics.prom to write a Prometheus text file at the end of
+a run. finish_run() prints the summary table.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+NUMERIC_FIELDS = ('bytes', 'prompt_tokens', 'completion_tokens', 'items', 'retries')
+RESERVOIR_SIZE = 1024
+
+
+class _SpanStats:
+    """Running aggregate for one span name"""
+
+    __slots__ = ('count', 'errors', 'total', 'max', 'sums', 'samples', '_random')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.sums = defaultdict(float)
+        self.samples = []
+        self._random = random.Random(0)
+
+    def add(self, elapsed: float, fields: Dict, error: bool):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        if error:
+            self.errors += 1
+        for key in NUMERIC_FIELDS:
+            value = fields.get(key)
+            if isinstance(value, (int, float)):
+                self.sums[key] += value
+
+        # Reservoir sample keeps percentiles bounded in memory
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(elapsed)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.samples[slot] = elapsed
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class Metrics:
+    """Thread-safe registry of span aggregates and counters"""
+
+    def __init__(self, log_path: Optional[str] = None, prom_path: Optional[str] = None):
+        self.log_path = log_path
+        self.prom_path = prom_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._log_file = None
+        self.reset()
+
+    def reset(self):
+        """Drop all recorded data"""
+        with self._lock:
+            self.spans: Dict[str, _SpanStats] = defaultdict(_SpanStats)
+            self.counters: Dict[str, float] = defaultdict(float)
+            self.started_at = time.time()
+
+    def configure(self, log_path: Optional[str] = None, prom_path: Optional[str] = None):
+        """Set (or change) the JSON-lines log and Prometheus output paths"""
+        with self._lock:
+            if self._log_file:
+                self._log_file.close()
+                self._log_file = None
+            self.log_path = log_path
+            self.prom_path = prom_path
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, **fields):
+        """
+        Time a block of work
+
+        Yields a dict the caller can fill with bytes, prompt_tokens,
+        completion_tokens, items, retries, or any other labels.
+        """
+        record = dict(fields)
+        stack = self._stack()
+        stack.append(record)
+        error = None
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if error is not None:
+                record['error'] = f"{type(error).__name__}: {error}"
+            self._record(name, elapsed, record, error is not None)
+
+    def annotate(self, **fields):
+        """Add fields to the innermost open span on this thread"""
+        stack = self._stack()
+        if stack:
+            stack[-1].update(fields)
+
+    def incr(self, name: str, value: float = 1, **labels):
+        """Increase a counter"""
+        key = name
+        if labels:
+            key += '{' + ','.join(f'{k}="{v}"' for k, v in sorted(labels.items())) + '}'
+        with self._lock:
+            self.counters[key] += value
+
+    def _record(self, name: str, elapsed: float, fields: Dict, error: bool):
+        with self._lock:
+            self.spans[name].add(elapsed, fields, error)
+            if self.log_path:
+                if self._log_file is None:
+                    self._log_file = open(self.log_path, 'a', encoding='utf-8')
+                line = {'ts': round(time.time(), 6), 'span': name, 'seconds': round(elapsed, 6)}
+                line.update(fields)
+                self._log_file.write(json.dumps(line, ensure_ascii=False, default=str) + '\n')
+                self._log_file.flush()
+
+    def summary(self) -> Dict:
+        """Aggregates keyed by span name, plus counters"""
+        with self._lock:
+            spans = {
+                name: {
+                    'count': stats.count,
+                    'errors': stats.errors,
+                    'total_s': stats.total,
+                    'mean_s': stats.total / stats.count if stats.count else 0.0,
+                    'p50_s': stats.percentile(50),
+                    'p95_s': stats.percentile(95),
+                    'max_s': stats.max,
+                    **{key: value for key, value in stats.sums.items()}
+                }
+                for name, stats in sorted(self.spans.items())
+            }
+            return {'spans': spans, 'counters': dict(sorted(self.counters.items()))}
+
+    def print_summary(self):
+        """Print the end-of-run table"""
+        data = self.summary()
+        if not data['spans'] and not data['counters']:
+            return
+
+        print(f"\n{'='*96}")
+        print("⏱️  RUN METRICS")
+        print(f"{'='*96}")
+        print(f"{'span':<22}{'count':>7}{'err':>5}{'total s':>10}{'mean ms':>10}"
+              f"{'p95 ms':>10}{'max ms':>10}{'bytes':>11}{'tokens':>11}")
+        print('-' * 96)
+        for name, s in data['spans'].items():
+            tokens = s.get('prompt_tokens', 0) + s.get('completion_tokens', 0)
+            print(f"{name:<22}{s['count']:>7}{s['errors']:>5}{s['total_s']:>10.2f}"
+                  f"{s['mean_s'] * 1000:>10.1f}{s['p95_s'] * 1000:>10.1f}{s['max_s'] * 1000:>10.1f}"
+                  f"{int(s.get('bytes', 0)):>11}{int(tokens):>11}")
+
+        if data['counters']:
+            print('-' * 96)
+            for name, value in data['counters'].items():
+                print(f"{name:<60}{value:>14g}")
+        print(f"{'='*96}")
+
+    def prometheus_text(self) -> str:
+        """Render aggregates in the Prometheus text exposition format"""
+        data = self.summary()
+        lines = [
+            '# HELP aibe_span_seconds Wall time spent in instrumented spans',
+            '# TYPE aibe_span_seconds summary'
+        ]
+        for name, s in data['spans'].items():
+            label = f'span="{name}"'
+            lines.append(f'aibe_span_seconds{{{label},quantile="0.5"}} {s["p50_s"]:.6f}')
+            lines.append(f'aibe_span_seconds{{{label},quantile="0.95"}} {s["p95_s"]:.6f}')
+            lines.append(f'aibe_span_seconds_sum{{{label}}} {s["total_s"]:.6f}')
+            lines.append(f'aibe_span_seconds_count{{{label}}} {s["count"]}')
+
+        lines += ['# HELP aibe_span_errors_total Spans that raised', '# TYPE aibe_span_errors_total counter']
+        for name, s in data['spans'].items():
+            lines.append(f'aibe_span_errors_total{{span="{name}"}} {s["errors"]}')
+
+        for field in NUMERIC_FIELDS:
+            metric = f'aibe_span_{field}_total'
+            rows = [(name, s[field]) for name, s in data['spans'].items() if field in s]
+            if rows:
+                lines += [f'# TYPE {metric} counter']
+                lines += [f'{metric}{{span="{name}"}} {value:g}' for name, value in rows]
+
+        if data['counters']:
+            lines += ['# TYPE aibe_events_total counter']
+            for key, value in data['counters'].items():
+                name, _, labels = key.partition('{')
+                label_text = f'name="{name}"' + (',' + labels.rstrip('}') if labels else '')
+                lines.append(f'aibe_events_total{{{label_text}}} {value:g}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write the Prometheus text file (atomically)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def finish_run(self, print_table: bool = True):
+        """Print the summary, write the Prometheus file, and close the log"""
+        if print_table:
+            self.print_summary()
+        if self.prom_path:
+            self.write_prometheus(self.prom_path)
+            print(f"📈 Metrics written: {self.prom_path}")
+        with self._lock:
+            if self._log_file:
+                self._log_file.close()
+                self._log_file = None
+
+
+def llm_usage(payload: Dict) -> Dict:
+    """Token counts from an OpenAI-style or Ollama response body"""
+    usage = payload.get('usage')
+    if usage:
+        return {
+            'prompt_tokens': usage.get('prompt_tokens', 0),
+            'completion_tokens': usage.get('completion_tokens', 0)
+        }
+    if 'eval_count' in payload or 'prompt_eval_count' in payload:
+        return {
+            'prompt_tokens': payload.get('prompt_eval_count', 0),
+            'completion_tokens': payload.get('eval_count', 0)
+        }
+    return {}
+
+
+METRICS = Metrics(
+    log_path=os.environ.get('AIBE_METRICS_LOG') or None,
+    prom_path=os.environ.get('AIBE_METRICS_PROM') or None
+)
@@ -0,0 +1,275 @@
+"""
+AIBE Item Calibration
+Empirical difficulty and discrimination per question from attempt logs,
+written back to the question files next to the hand-assigned labels
+
+Each test source (the previous-years bank, mock_test_<id>) keeps running
+per-question moments in data/item_calibration.json together with how far
+each attempt log has been read, so a new batch of attempts only costs the
+new lines:
+
+    calibrator = ItemCalibrator.load()
+    calibrator.ingest('logs/attempts.jsonl')
+    calibrator.save()
+    calibrator.apply('pyq')
+
+Adaptive and practice attempts only show part of a bank, so every moment
+is taken over the students who were shown the question, and scores are the
+share correct of what each student was shown.
+
+Fields added to each question with enough responses:
+    calibrated_difficulty   Easy / Medium / Hard from the observed p-value
+    item_stats              {p, b, r_pb, n}: p-value, Rasch difficulty
+                            (PROX logits), point-biserial, responses
+The original 'difficulty' field is left untouched.
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+from typing import List, Dict, Iterable
+
+import numpy as np
+
+from batch_scoring import BatchScorer, NOT_PRESENTED, merge_moments
+
+EASY_P = 0.70             # p >= EASY_P is Easy
+HARD_P = 0.40             # p < HARD_P is Hard
+MIN_RESPONSES = 30        # fewer responses keep the hand label
+PROX_SCALE = 2.89         # 1.7 ** 2, logistic vs normal ogive
+
+MOMENT_KEYS = ('n', 'sum_x', 'sum_t', 'sum_t2', 'sum_xt')
+
+
+def presented_moments(scorer: BatchScorer, sheets: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-question sufficient statistics over the students shown each question
+
+    Scores are the share correct of the questions shown, so sheets of
+    different lengths are comparable. Person-level sums feed the PROX
+    spread correction.
+    """
+    shown = sheets != NOT_PRESENTED
+    correct = (sheets == scorer.key) & shown
+    shown_f = shown.astype(np.float64)
+    correct_f = correct.astype(np.float64)
+    lengths = shown_f.sum(axis=1)
+    scores = correct_f.sum(axis=1) / np.maximum(lengths, 1)
+
+    # Person logits, clipped half a question in from 0% and 100%
+    half = 0.5 / np.maximum(lengths, 1)
+    clipped = np.clip(scores, half, 1 - half)
+    theta = np.log(clipped / (1 - clipped))[lengths > 0]
+    return {
+        'n': shown_f.sum(axis=0),
+        'sum_x': correct_f.sum(axis=0),
+        'sum_t': shown_f.T @ scores,
+        'sum_t2': shown_f.T @ (scores * scores),
+        'sum_xt': correct_f.T @ scores,
+        'persons': np.array([len(theta), theta.sum(), (theta * theta).sum()]),
+    }
+
+
+def calibrate(moments: Dict[str, np.ndarray], min_responses: int = MIN_RESPONSES) -> Dict[str, np.ndarray]:
+    """p-values, PROX Rasch difficulties, point-biserials and labels from presented_moments"""
+    n = moments['n']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = moments['sum_x'] / n
+        mean_t = moments['sum_t'] / n
+        var_t = moments['sum_t2'] / n - mean_t ** 2
+        cov = moments['sum_xt'] / n - p * mean_t
+        r = cov / np.sqrt(p * (1 - p) * var_t)
+
+        # PROX: centred item logits widened by the spread of person abilities
+        clipped = np.clip(p, 0.5 / np.maximum(n, 1), 1 - 0.5 / np.maximum(n, 1))
+        logits = np.log((1 - clipped) / clipped)
+    enough = n >= min_responses
+    if enough.any():
+        logits = logits - logits[enough].mean()
+    persons, sum_theta, sum_theta2 = moments['persons']
+    var_theta = max(0.0, sum_theta2 / persons - (sum_theta / persons) ** 2) if persons else 0.0
+    b = logits * math.sqrt(1 + var_theta / PROX_SCALE)
+
+    labels = np.where(p >= EASY_P, 'Easy', np.where(p < HARD_P, 'Hard', 'Medium'))
+    return {'p': np.nan_to_num(p), 'b': np.nan_to_num(b), 'r_pb': np.nan_to_num(r),
+            'n': n, 'label': labels, 'calibrated': enough}
+
+
+class ItemCalibrator:
+    """Running item moments per test source, fed incrementally from attempt logs"""
+
+    def __init__(self, path: str = 'data/item_calibration.json',
+                 pyq_path: str = 'mock_tests/aibe_previous_years_collection.json',
+                 mock_paths: Iterable[str] = ('mock_test_1.json',)):
+        self.path = Path(path)
+        self.test_files: Dict[str, str] = {}
+        self.scorers: Dict[str, BatchScorer] = {}
+        # source -> {'ids': [...], moment key -> list}
+        self.sources: Dict[str, Dict] = {}
+        self.offsets: Dict[str, int] = {}
+        for test_path in [pyq_path, *mock_paths]:
+            if test_path and Path(test_path).exists():
+                self.add_test_file(test_path)
+
+    @classmethod
+    def load(cls, path: str = 'data/item_calibration.json', **test_files) -> 'ItemCalibrator':
+        calibrator = cls(path, **test_files)
+        if calibrator.path.exists():
+            with open(calibrator.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            calibrator.sources = data['sources']
+            calibrator.offsets = data.get('offsets', {})
+        return calibrator
+
+    def save(self):
+        """Write moments and log offsets atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sources': self.sources, 'offsets': self.offsets}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def add_test_file(self, path: str) -> str:
+        """Register a mock test or the previous-years bank; returns its source name"""
+        scorer = BatchScorer.from_test_file(path)
+        self.scorers[scorer.source] = scorer
+        self.test_files[scorer.source] = path
+        return scorer.source
+
+    # ========== MOMENTS ==========
+
+    def moments(self, source: str) -> Dict[str, np.ndarray]:
+        """Accumulated moments aligned to the test file's current question order"""
+        scorer = self.scorers[source]
+        stored = self.sources.get(source)
+        size = len(scorer.ids)
+        aligned = {key: np.zeros(size) for key in MOMENT_KEYS}
+        aligned['persons'] = np.zeros(3)
+        if stored:
+            # Questions added since the last save start from zero; removed ones are dropped
+            position = {str(qid): i for i, qid in enumerate(stored['ids'])}
+            old = np.array([position.get(str(qid), -1) for qid in scorer.ids])
+            known = old >= 0
+            for key in MOMENT_KEYS:
+                aligned[key][known] = np.asarray(stored[key], dtype=np.float64)[old[known]]
+            aligned['persons'] = np.asarray(stored['persons'], dtype=np.float64)
+        return aligned
+
+    def add_sheets(self, source: str, answers: List[Dict]):
+        """Fold {question_id: option} sheets for one source into its moments"""
+        scorer = self.scorers[source]
+        batch = presented_moments(scorer, scorer.sheets_from_answers(answers, absent=NOT_PRESENTED))
+        total = merge_moments(self.moments(source), batch)
+        self.sources[source] = {'ids': scorer.ids, **{key: value.tolist() for key, value in total.items()}}
+
+    def ingest(self, log_path: str) -> int:
+        """Read new complete lines of a JSONL attempt log; returns attempts counted"""
+        key = str(Path(log_path).resolve())
+        offset = self.offsets.get(key, 0)
+        batches: Dict[str, List[Dict]] = {}
+        with open(log_path, 'rb') as f:
+            if offset > os.fstat(f.fileno()).st_size:
+                offset = 0  # log was truncated or replaced
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partially written line; pick it up next time
+                offset += len(line)
+                if line.strip():
+                    attempt = json.loads(line)
+                    if attempt.get('source') in self.scorers:
+                        batches.setdefault(attempt['source'], []).append(attempt['answers'])
+        for source, answers in batches.items():
+            self.add_sheets(source, answers)
+        self.offsets[key] = offset
+        return sum(len(answers) for answers in batches.values())
+
+    # ========== RESULTS ==========
+
+    def calibration(self, source: str, min_responses: int = MIN_RESPONSES) -> Dict[str, np.ndarray]:
+        return calibrate(self.moments(source), min_responses)
+
+    def apply(self, source: str, min_responses: int = MIN_RESPONSES) -> Dict[str, int]:
+        """
+        Write calibrated_difficulty and item_stats into the source's test file
+
+        For the previous-years bank that is mock_tests/aibe_previous_years_collection.json,
+        the copy index.html and every tool read; the root-level copy is not updated.
+
+        Returns counts of questions calibrated and of those whose hand label
+        disagrees with the calibrated one.
+        """
+        path = self.test_files[source]
+        with open(path, 'r', encoding='utf-8') as f:
+            test = json.load(f)
+        result = self.calibration(source, min_responses)
+        column = self.scorers[source].columns
+        calibrated = relabelled = 0
+        for question in test['questions']:
+            i = column.get(str(question['id']))
+            if i is None or not result['calibrated'][i]:
+                continue
+            label = str(result['label'][i])
+            question['calibrated_difficulty'] = label
+            question['item_stats'] = {
+                'p': round(float(result['p'][i]), 3),
+                'b': round(float(result['b'][i]), 2),
+                'r_pb': round(float(result['r_pb'][i]), 3),
+                'n': int(result['n'][i]),
+            }
+            calibrated += 1
+            relabelled += question.get('difficulty') not in (None, label)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(test, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        os.replace(tmp_path, path)
+        return {'calibrated': calibrated, 'relabelled': relabelled}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="AIBE item calibration from attempt logs")
+    parser.add_argument('--state', default='data/item_calibration.json')
+    parser.add_argument('--pyq', default='mock_tests/aibe_previous_years_collection.json')
+    parser.add_argument('--mock', action='append', default=None, help="Mock test file (repeatable)")
+    parser.add_argument('--min-responses', type=int, default=MIN_RESPONSES)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('ingest', help="Fold new lines of attempt logs into the moments").add_argument('logs', nargs='+')
+    report = sub.add_parser('report', help="Show questions whose hand label disagrees with the data")
+    report.add_argument('--source', default='pyq')
+    apply = sub.add_parser('apply', help="Write calibrated fields back into the test files")
+    apply.add_argument('--source', action='append', help="Only these sources (repeatable)")
+    args = parser.parse_args()
+
+    calibrator = ItemCalibrator.load(args.state, pyq_path=args.pyq, mock_paths=args.mock or ['mock_test_1.json'])
+
+    if args.command == 'ingest':
+        for log in args.logs:
+            t0 = time.perf_counter()
+            counted = calibrator.ingest(log)
+            print(f"✅ {log}: {counted} new attempts in {time.perf_counter() - t0:.2f}s")
+        calibrator.save()
+        print(f"💾 Saved moments for {len(calibrator.sources)} sources to {calibrator.path}")
+
+    elif args.command == 'report':
+        scorer = calibrator.scorers[args.source]
+        result = calibrator.calibration(args.source, args.min_responses)
+        print(f"📊 {args.source}: {int(result['calibrated'].sum())}/{len(scorer.ids)} questions "
+              f"with >= {args.min_responses} responses")
+        print("\n⚠️  Hand label vs observed difficulty:")
+        for i, question in enumerate(scorer.questions):
+            label = str(result['label'][i])
+            if result['calibrated'][i] and question.get('difficulty') not in (None, label):
+                print(f"   Q{question['id']:<4} {question.get('difficulty'):<6} -> {label:<6} "
+                      f"p={result['p'][i]:.2f} b={result['b'][i]:+.2f} r={result['r_pb'][i]:+.2f}")
+
+    elif args.command == 'apply':
+        for source in args.source or [s for s in calibrator.sources if s in calibrator.test_files]:
+            counts = calibrator.apply(source, args.min_responses)
+            print(f"✅ {calibrator.test_files[source]}: {counts['calibrated']} calibrated, "
+                  f"{counts['relabelled']} differ from the hand label")
@@ -5,47 +5,91 @@ Scrapes legal content from websites and generates flashcards using LLM
 
 import json
 import os
-import re
+import threading
 import time
 from typing import List, Dict, Optional
 from datetime import datetime
 from pathlib import Path
 
-try:
-    import requests
-    from bs4 import BeautifulSoup
-except ImportError:
-    print("Installing required packages...")
-    os.system("pip install requests beautifulsoup4 lxml --break-system-packages")
-    import requests
-    from bs4 import BeautifulSoup
+from change_detection import ChangeTracker, act_sections, paragraph_sections
+from corpus_store import CorpusStore
+from crawl_frontier import CrawlFrontier, Crawler, HostThrottle, url_host
+from deck_sync import DeckChangeLog, diff_cards, has_changes
+from generator_core import FlashcardGenerator, llm_config_from_env
+from srs_scheduler import card_id
+from bare_act_parser import SectionIndex, parse_sections, chunk_sections
+from html_extract import HTMLBlock, RESULT_DIV, JUDGMENT_DIV, WIKI_CONTENT, extract_blocks, resolve_engine
+from instrumentation import METRICS
+
+# Shared by every scraper in the process; delay is 0 (off) unless a caller
+# such as batch_jobs.py sets it (LLM calls use generator_core.LLM_THROTTLE)
+HTTP_THROTTLE = HostThrottle(0)
 
 
 class LegalContentScraper:
     """Scrapes legal content from various sources"""
     
-    def __init__(self):
+    def __init__(self, html_engine: str = 'auto', change_tracker: Optional[ChangeTracker] = None):
+        """
+        Args:
+            html_engine: 'auto', 'lxml', 'stream' or 'bs4' (see html_extract.py)
+            change_tracker: Enables conditional GETs and section diffs for
+                Wikipedia and bare act pages (see change_detection.py)
+        """
+        import requests  # only scraping needs it (pip install requests)
+        self.html_engine = resolve_engine(html_engine)
+        self.change_tracker = change_tracker
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+    
+    def _session(self):
+        """self.session on the creating thread, a per-thread copy on crawl workers"""
+        if threading.get_ident() == self._owner:
+            return self.session
+        if not hasattr(self._local, 'session'):
+            self._local.session = type(self.session)()
+            self._local.session.headers.update(self.session.headers)
+        return self._local.session
+    
+    def _fetch(self, url: str, timeout: int = 10, conditional: bool = False):
+        """GET a page, recording latency, status and bytes (conditional: send stored validators)"""
+        headers = self.change_tracker.conditional_headers(url) if conditional and self.change_tracker else None
+        HTTP_THROTTLE.wait(url_host(url))
+        with METRICS.span('http.fetch', url=url) as span:
+            response = self._session().get(url, timeout=timeout, headers=headers)
+            span['status'] = response.status_code
+            span['bytes'] = len(response.content)
+        return response
+    
+    def _extract_blocks(self, response, selectors: List, limit: Optional[int] = None) -> List[HTMLBlock]:
+        """Pull only the matching elements out of a page"""
+        with METRICS.span('html.parse', bytes=len(response.content), engine=self.html_engine) as span:
+            # Only trust an explicit charset; requests falls back to ISO-8859-1 for text/html
+            declared = 'charset=' in response.headers.get('Content-Type', '').lower()
+            blocks = extract_blocks(response.content, selectors, limit=limit, engine=self.html_engine,
+                                    encoding=response.encoding if declared else None)
+            span['items'] = len(blocks)
+        return blocks
     
     def scrape_indiankanoon(self, query: str, max_results: int = 5) -> List[Dict]:
         """Scrape content from Indian Kanoon"""
         results = []
         try:
             url = f"https://indiankanoon.org/search/?formInput={query.replace(' ', '%20')}"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self._fetch(url)
             
-            for result in soup.find_all('div', class_='result')[:max_results]:
-                title_elem = result.find('a', class_='cite')
+            for result in self._extract_blocks(response, [RESULT_DIV], limit=max_results):
+                title_elem = result.first_link('cite')
                 if title_elem:
-                    title = title_elem.text.strip()
+                    title = title_elem['text']
                     link = 'https://indiankanoon.org' + title_elem['href']
                     
                     # Get content from result page
-                    content = self._extract_text(result)
+                    content = result.text
                     
                     results.append({
                         'title': title,
@@ -60,6 +104,71 @@ class LegalContentScraper:
         
         return results
     
+    def crawl_indiankanoon(self, query: str, max_docs: int = 100, result_pages: int = 5,
+                           follow_related: bool = True, max_depth: int = 2, workers: int = 8,
+                           delay: float = 0.5, state_path: Optional[str] = None,
+                           on_document=None) -> List[Dict]:
+        """
+        Crawl Indian Kanoon: paginate search results, fetch each judgment, and follow related judgments
+        
+        Args:
+            query: Search query
+            max_docs: Stop after this many pages (search pages + documents) were fetched
+            result_pages: Number of search result pages to seed
+            follow_related: Also queue /doc/ links found inside judgments
+            max_depth: Link depth limit (search pages are 0, their results 1)
+            workers: Concurrent fetches
+            delay: Minimum seconds between requests to the same host
+            state_path: Checkpoint file; an existing one is resumed
+            on_document: Callback receiving each document as it is crawled
+        """
+        base = 'https://indiankanoon.org'
+        
+        def handle(url: str, item: Dict):
+            response = self._fetch(url, timeout=20)
+            response.raise_for_status()
+            
+            if '/search/' in url:
+                links = []
+                for result in self._extract_blocks(response, [RESULT_DIV]):
+                    cite = result.first_link('cite')
+                    if cite and cite['href'].startswith('/doc/'):
+                        links.append((base + cite['href'], 1, {'title': cite['text']}))
+                return None, links
+            
+            judgments = self._extract_blocks(response, [JUDGMENT_DIV], limit=1)
+            if not judgments:
+                return None, []
+            block = judgments[0]
+            text = block.text
+            document = {
+                'title': item['meta'].get('title') or text.split('\n', 1)[0],
+                'url': url,
+                'content': text,
+                'source': 'Indian Kanoon',
+                'query': query
+            }
+            links = []
+            if follow_related:
+                links = [(base + link['href'], 2, {'title': link['text']})
+                         for link in block.links if link['href'].startswith('/doc/')]
+            return document, links
+        
+        throttle = HostThrottle(delay)
+        if state_path and os.path.exists(state_path):
+            crawler = Crawler.resume(state_path, handle, workers=workers, throttle=throttle)
+            print(f"⏯️  Resuming crawl: {len(crawler.frontier)} queued, {crawler.fetched} fetched")
+        else:
+            frontier = CrawlFrontier(max_depth=max_depth)
+            for page in range(result_pages):
+                frontier.push(f"{base}/search/?formInput={query.replace(' ', '%20')}&pagenum={page}", priority=0)
+            crawler = Crawler(frontier, handle, workers=workers, state_path=state_path, throttle=throttle)
+        
+        documents = crawler.run(max_pages=max_docs, on_document=on_document)
+        print(f"✅ Crawled {len(documents)} documents from Indian Kanoon "
+              f"({crawler.fetched} fetched, {crawler.failed} failed, {len(crawler.frontier)} queued)")
+        return documents
+    
     def scrape_wikipedia_legal(self, topic: str) -> Dict:
         """Scrape legal topic from Wikipedia"""
         try:
@@ -73,28 +182,41 @@ class LegalContentScraper:
             
             for term in search_terms:
                 url = f"https://en.wikipedia.org/wiki/{term.replace(' ', '_')}"
-                response = self.session.get(url, timeout=10)
+                response = self._fetch(url, conditional=True)
+                
+                if response.status_code == 304:
+                    print(f"⏭️  Wikipedia article unchanged: {term}")
+                    return {
+                        'title': term,
+                        'url': url,
+                        'content': '',
+                        'source': 'Wikipedia',
+                        'changes': self.change_tracker.not_modified(url).to_dict()
+                    }
                 
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    content_div = soup.find('div', {'id': 'mw-content-text'})
+                    content_divs = self._extract_blocks(response, [WIKI_CONTENT], limit=1)
                     
-                    if content_div:
+                    if content_divs:
                         # Extract paragraphs
-                        paragraphs = []
-                        for p in content_div.find_all('p', limit=10):
-                            text = p.text.strip()
-                            if len(text) > 50:  # Skip short paragraphs
-                                paragraphs.append(text)
+                        paragraphs = [text for text in content_divs[0].paragraphs[:10]
+                                      if len(text) > 50]  # Skip short paragraphs
                         
                         if paragraphs:
                             print(f"✅ Found Wikipedia article: {term}")
-                            return {
+                            result = {
                                 'title': term,
                                 'url': url,
                                 'content': '\n\n'.join(paragraphs),
                                 'source': 'Wikipedia'
                             }
+                            if self.change_tracker:
+                                sections = paragraph_sections(paragraphs)
+                                change = self.change_tracker.observe(url, result['content'], sections,
+                                                                     response.headers)
+                                result['changes'] = change.to_dict()
+                                result['new_content'] = '\n\n'.join(sections[k] for k in change.fresh_keys)
+                            return result
             
             print(f"⚠️  No Wikipedia article found for: {topic}")
             return {}
@@ -110,214 +232,43 @@ class LegalContentScraper:
         try:
             # Try IndianKanoon for bare acts
             url = f"https://indiankanoon.org/search/?formInput={act_name.replace(' ', '%20')}%20bare%20act"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self._fetch(url)
             
             # Extract first result
-            first_result = soup.find('div', class_='result')
-            if first_result:
-                link_elem = first_result.find('a', class_='cite')
+            first_results = self._extract_blocks(response, [RESULT_DIV], limit=1)
+            if first_results:
+                link_elem = first_results[0].first_link('cite')
                 if link_elem:
                     act_url = 'https://indiankanoon.org' + link_elem['href']
-                    act_response = self.session.get(act_url, timeout=10)
-                    act_soup = BeautifulSoup(act_response.content, 'html.parser')
+                    act_response = self._fetch(act_url, conditional=True)
+                    
+                    if act_response.status_code == 304:
+                        results['url'] = act_url
+                        results['changes'] = self.change_tracker.not_modified(act_url).to_dict()
+                        print(f"⏭️  Bare act unchanged: {act_name}")
+                        return results
                     
                     # Extract sections
-                    content_div = act_soup.find('div', class_='judgments')
-                    if content_div:
-                        text = self._extract_text(content_div)
+                    content_divs = self._extract_blocks(act_response, [JUDGMENT_DIV], limit=1)
+                    if content_divs:
+                        text = content_divs[0].text
                         results['content'] = text
                         results['url'] = act_url
+                        results['sections'] = parse_sections(text)
+                        
+                        if self.change_tracker:
+                            change = self.change_tracker.observe(act_url, text, act_sections(results['sections']),
+                                                                 act_response.headers)
+                            fresh = set(change.fresh_keys)
+                            results['changes'] = change.to_dict()
+                            results['changed_sections'] = [s for s in results['sections'] if s['key'] in fresh]
                         
-            print(f"✅ Scraped bare act content for: {act_name}")
+            print(f"✅ Scraped bare act content for: {act_name} ({len(results['sections'])} sections)")
             
         except Exception as e:
             print(f"❌ Error scraping bare acts: {e}")
         
         return results
-    
-    def _extract_text(self, element) -> str:
-        """Extract clean text from BeautifulSoup element"""
-        # Remove script and style elements
-        for script in element(['script', 'style']):
-            script.decompose()
-        
-        text = element.get_text(separator='\n')
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-        
-        return text
-
-
-class FlashcardGenerator:
-    """Generate flashcards from content using LLM"""
-    
-    def __init__(self, provider='groq', api_key=None, config=None):
-        self.provider = provider
-        self.api_key = api_key
-        self.config = config or {}
-    
-    def generate_from_content(self, content: str, topic: str, count: int = 15) -> List[Dict]:
-        """Generate flashcards from scraped content"""
-        
-        # Truncate content if too long
-        max_content_length = 8000
-        if len(content) > max_content_length:
-            content = content[:max_content_length] + "..."
-        
-        prompt = f"""Based on the following content about {topic}, generate {count} high-quality AIBE exam flashcards.
-
-CONTENT:
-{content}
-
-REQUIREMENTS:
-- Extract key legal concepts, definitions, sections, and principles
-- Each card should have a clear Question (q) and detailed Answer (a)
-- Focus on exam-relevant information
-- Answers should be 2-4 sentences
-- Include section numbers and case laws where mentioned
-- Cover different aspects of the topic
-
-Format response as JSON array:
-[
-  {{"q": "Question 1?", "a": "Answer 1"}},
-  {{"q": "Question 2?", "a": "Answer 2"}}
-]
-
-Return ONLY the JSON array, no additional text."""
-
-        try:
-            response = self._call_llm(prompt)
-            cards = self._parse_flashcards(response)
-            print(f"✅ Generated {len(cards)} flashcards from content")
-            return cards
-        except Exception as e:
-            print(f"❌ Error generating flashcards: {e}")
-            return []
-    
-    def generate_topic_cards(self, topic_title: str, topic_subtitle: str, count: int = 15) -> List[Dict]:
-        """Generate flashcards for a topic using LLM knowledge"""
-        
-        prompt = f"""Generate {count} high-quality AIBE exam flashcards for: "{topic_title}" ({topic_subtitle}).
-
-REQUIREMENTS:
-- Cover key concepts, sections, case laws, and principles
-- Each card: clear Question (q) and detailed Answer (a)
-- Answers: 2-4 sentences, exam-focused
-- Include relevant section numbers
-- Progressive difficulty
-- Different subtopics
-
-Format: JSON array only
-[
-  {{"q": "Question?", "a": "Answer"}},
-  ...
-]"""
-
-        try:
-            response = self._call_llm(prompt)
-            cards = self._parse_flashcards(response)
-            return cards
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            return []
-    
-    def _call_llm(self, prompt: str) -> str:
-        """Call configured LLM"""
-        system_prompt = "You are an expert in Indian law preparing AIBE exam questions. Generate high-quality flashcards in valid JSON format only."
-        
-        if self.provider == 'groq':
-            return self._call_groq(prompt, system_prompt)
-        elif self.provider == 'openrouter':
-            return self._call_openrouter(prompt, system_prompt)
-        elif self.provider == 'ollama':
-            return self._call_ollama(prompt, system_prompt)
-        else:
-            raise ValueError(f"Unknown provider: {self.provider}")
-    
-    def _call_groq(self, prompt: str, system_prompt: str) -> str:
-        """Call Groq API"""
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": self.config.get('model', 'llama-3.1-70b-versatile'),
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.8,
-            "max_tokens": 4000
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=60)
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
-    
-    def _call_openrouter(self, prompt: str, system_prompt: str) -> str:
-        """Call OpenRouter API"""
-        url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://aibe-prep.local",
-            "X-Title": "AIBE Prep"
-        }
-        data = {
-            "model": self.config.get('model', 'meta-llama/llama-3.1-8b-instruct:free'),
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ]
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=60)
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
-    
-    def _call_ollama(self, prompt: str, system_prompt: str) -> str:
-        """Call Ollama local API"""
-        url = f"{self.config.get('base_url', 'http://localhost:11434')}/api/chat"
-        data = {
-            "model": self.config.get('model', 'llama3.1'),
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            "stream": False
-        }
-        
-        response = requests.post(url, json=data, timeout=120)
-        response.raise_for_status()
-        return response.json()['message']['content']
-    
-    def _parse_flashcards(self, response: str) -> List[Dict]:
-        """Parse LLM response to extract flashcards"""
-        content = response.strip()
-        
-        # Remove markdown
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0]
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0]
-        
-        # Find JSON array
-        json_match = re.search(r'\[[\s\S]*\]', content)
-        if json_match:
-            content = json_match.group(0)
-        
-        try:
-            cards = json.loads(content)
-            if not isinstance(cards, list):
-                raise ValueError("Not a list")
-            return [card for card in cards if 'q' in card and 'a' in card]
-        except Exception as e:
-            print(f"Parse error: {e}")
-            return []
 
 
 class JSONManager:
@@ -326,20 +277,46 @@ class JSONManager:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        # Per-deck version counters + change logs for delta sync (deck_sync.py)
+        self.changes = DeckChangeLog(str(self.data_dir))
     
     def load_topic(self, filename: str) -> Dict:
         """Load topic JSON file"""
         filepath = self.data_dir / filename
         if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with METRICS.span('storage.load', file=filename) as span:
+                span['bytes'] = filepath.stat().st_size
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    return json.load(f)
         return {}
     
-    def save_topic(self, filename: str, data: Dict):
-        """Save topic JSON file"""
+    def save_topic(self, filename: str, data: Dict, changes: Optional[Dict] = None):
+        """
+        Save topic JSON file
+
+        Decks get their "version" bumped and a change-log line when their
+        cards change. changes ({'add', 'update', 'remove'} from the caller)
+        skips re-reading the file to diff against it.
+        """
         filepath = self.data_dir / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if 'flashcards' in data:
+            base_version = data.get('version', 0)
+            if changes is None:
+                previous = self.load_topic(filename)
+                changes = diff_cards(filename, previous.get('flashcards', []), data['flashcards'])
+                base_version = previous.get('version', 0)
+            if has_changes(changes):
+                data['version'] = base_version + 1
+            else:
+                changes = None
+        with METRICS.span('storage.save', file=filename) as span:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.write('\n')
+            span['bytes'] = filepath.stat().st_size
+        # Logged after the deck is written: a missing line only forces clients to a full download
+        if changes:
+            self.changes.append(filename, data['version'], changes)
         print(f"💾 Saved: {filepath}")
     
     def add_cards_to_topic(self, filename: str, new_cards: List[Dict]):
@@ -351,13 +328,19 @@ class JSONManager:
             return
         
         existing_cards = data.get('flashcards', [])
-        existing_questions = {card['q'] for card in existing_cards}
         
         # Filter duplicates
-        unique_cards = [card for card in new_cards if card['q'] not in existing_questions]
+        with METRICS.span('storage.dedupe', file=filename) as span:
+            existing_questions = {card['q'] for card in existing_cards}
+            unique_cards = [card for card in new_cards if card['q'] not in existing_questions]
+            span['items'] = len(new_cards)
+        METRICS.incr('cards.added', len(unique_cards))
+        METRICS.incr('cards.duplicates', len(new_cards) - len(unique_cards))
         
         data['flashcards'] = existing_cards + unique_cards
-        self.save_topic(filename, data)
+        self.save_topic(filename, data, changes={
+            'add': [{'id': card_id(filename, card), 'card': card} for card in unique_cards]
+        })
         
         print(f"✅ Added {len(unique_cards)} unique cards (filtered {len(new_cards) - len(unique_cards)} duplicates)")
     
@@ -382,7 +365,8 @@ class JSONManager:
             new_cards = generator.generate_topic_cards(
                 data['topic_title'],
                 data['topic_subtitle'],
-                count=needed
+                count=needed,
+                existing_questions=[card['q'] for card in data.get('flashcards', [])]
             )
             
             if new_cards:
@@ -391,44 +375,76 @@ class JSONManager:
 
 # ========== MAIN WORKFLOWS ==========
 
-def workflow_scrape_and_generate(topic: str, search_queries: List[str], output_file: str):
-    """Complete workflow: scrape content and generate flashcards"""
+def workflow_scrape_and_generate(topic: str, search_queries: List[str], output_file: str, delay: float = 2,
+                                 crawl_docs: int = 0, incremental: bool = False):
+    """
+    Complete workflow: scrape content and generate flashcards
+    
+    delay: seconds between requests; crawl_docs > 0 crawls up to that many
+    Indian Kanoon pages per query (judgments + related) instead of reading snippets;
+    incremental: skip pages unchanged since the last incremental run and only
+    generate from new or changed sections
+    """
     
     print(f"\n{'='*60}")
     print(f"WORKFLOW: Scrape and Generate for {topic}")
     print(f"{'='*60}\n")
     
     # Initialize
-    scraper = LegalContentScraper()
+    tracker = ChangeTracker('data/change_state.json') if incremental else None
+    scraper = LegalContentScraper(change_tracker=tracker)
     generator = FlashcardGenerator(
         provider=os.environ.get('LLM_PROVIDER', 'groq'),
         api_key=os.environ.get('LLM_API_KEY'),
-        config={}
+        config=llm_config_from_env()
     )
     json_mgr = JSONManager('data')
+    corpus = CorpusStore('data/corpus')
     
     all_content = []
+    skipped = 0
     
     # Scrape from multiple sources
     for query in search_queries:
         print(f"\n🔍 Searching: {query}")
         
         # Indian Kanoon
-        results = scraper.scrape_indiankanoon(query, max_results=3)
+        if crawl_docs:
+            results = scraper.crawl_indiankanoon(
+                query, max_docs=crawl_docs, delay=delay,
+                on_document=lambda doc: corpus.put_documents([doc], topic)
+            )
+        else:
+            results = scraper.scrape_indiankanoon(query, max_results=3)
+            corpus.put_documents(results, topic)
+        if tracker:
+            # Search snippets and judgments have no validators; compare hashes only
+            fresh = [item for item in results if tracker.observe(item['url'], item['content']).has_changes]
+            skipped += len(results) - len(fresh)
+            results = fresh
         all_content.extend(results)
-        time.sleep(2)  # Rate limiting
+        time.sleep(delay)  # Rate limiting
         
         # Wikipedia
         wiki_result = scraper.scrape_wikipedia_legal(query)
         if wiki_result:
+            corpus.put_documents([wiki_result], topic)
+            if tracker:
+                wiki_result = dict(wiki_result, content=wiki_result.get('new_content', ''))
+                skipped += not wiki_result['content']
             all_content.append(wiki_result)
-        time.sleep(2)
+        time.sleep(delay)
+    
+    if tracker:
+        print(f"\n⏭️  {skipped} unchanged sources skipped")
     
     # Combine content
     combined_content = "\n\n---\n\n".join([item['content'] for item in all_content if item.get('content')])
     
     if not combined_content:
-        print("❌ No content scraped!")
+        if tracker:
+            tracker.save()
+        print("✅ Nothing changed since the last run" if tracker else "❌ No content scraped!")
         return
     
     print(f"\n✅ Scraped {len(all_content)} sources, {len(combined_content)} characters total")
@@ -441,12 +457,61 @@ def workflow_scrape_and_generate(topic: str, search_queries: List[str], output_f
         # Add to JSON
         json_mgr.add_cards_to_topic(output_file, flashcards)
         print(f"\n✅ Successfully added flashcards to {output_file}")
+        # Only now are the changed sources done with; saved earlier, a failed
+        # generation would leave them marked as seen and never retried
+        if tracker:
+            tracker.save()
     else:
         print("\n❌ No flashcards generated!")
 
 
-def workflow_expand_all_topics(min_cards: int = 15):
-    """Expand all topics to minimum card count"""
+def workflow_generate_from_corpus(topic: str, output_file: str, source: Optional[str] = None,
+                                  cards_per_batch: int = 15, max_batches: Optional[int] = None,
+                                  max_chars: int = 8000, delay: float = 2):
+    """Generate flashcards from documents already in the local corpus (no scraping)"""
+    
+    print(f"\n{'='*60}")
+    print(f"WORKFLOW: Generate from Corpus for {topic}")
+    print(f"{'='*60}\n")
+    
+    generator = FlashcardGenerator(
+        provider=os.environ.get('LLM_PROVIDER', 'groq'),
+        api_key=os.environ.get('LLM_API_KEY'),
+        config=llm_config_from_env()
+    )
+    json_mgr = JSONManager('data')
+    corpus = CorpusStore('data/corpus')
+    
+    # Pack documents into prompt-sized batches
+    batches, batch = [], ''
+    for record, text in corpus.iter_documents(topic=topic, source=source):
+        for start in range(0, len(text), max_chars):
+            piece = text[start:start + max_chars]
+            if batch and len(batch) + len(piece) > max_chars:
+                batches.append(batch)
+                batch = ''
+            batch += ("\n\n---\n\n" if batch else '') + piece
+    if batch:
+        batches.append(batch)
+    
+    if not batches:
+        print(f"❌ No corpus documents for topic: {topic}")
+        return
+    
+    batches = batches[:max_batches] if max_batches else batches
+    print(f"📦 {len(batches)} batches from local corpus")
+    
+    for i, content in enumerate(batches, 1):
+        print(f"\n🤖 Batch {i}/{len(batches)}")
+        cards = generator.generate_from_content(content, topic, count=cards_per_batch)
+        if cards:
+            json_mgr.add_cards_to_topic(output_file, cards)
+        if i < len(batches):
+            time.sleep(delay)  # Rate limiting
+
+
+def workflow_expand_all_topics(min_cards: int = 15, delay: float = 3):
+    """Expand all topics to minimum card count (delay: seconds between LLM calls)"""
     
     print(f"\n{'='*60}")
     print(f"WORKFLOW: Expand All Topics to {min_cards} cards")
@@ -455,7 +520,7 @@ def workflow_expand_all_topics(min_cards: int = 15):
     generator = FlashcardGenerator(
         provider=os.environ.get('LLM_PROVIDER', 'groq'),
         api_key=os.environ.get('LLM_API_KEY'),
-        config={}
+        config=llm_config_from_env()
     )
     json_mgr = JSONManager('data')
     
@@ -472,7 +537,7 @@ def workflow_expand_all_topics(min_cards: int = 15):
         print(f"\n📚 Processing: {topic_info['title']}")
         
         json_mgr.ensure_minimum_cards(filename, min_cards, generator)
-        time.sleep(3)  # Rate limiting
+        time.sleep(delay)  # Rate limiting
 
 
 def workflow_create_new_topic(topic_id: int, title: str, subtitle: str, filename: str):
@@ -485,7 +550,7 @@ def workflow_create_new_topic(topic_id: int, title: str, subtitle: str, filename
     generator = FlashcardGenerator(
         provider=os.environ.get('LLM_PROVIDER', 'groq'),
         api_key=os.environ.get('LLM_API_KEY'),
-        config={}
+        config=llm_config_from_env()
     )
     json_mgr = JSONManager('data')
     
@@ -509,10 +574,120 @@ def workflow_create_new_topic(topic_id: int, title: str, subtitle: str, filename
     print(f"\n✅ Created new topic with {len(cards)} cards!")
 
 
+def workflow_generate_from_act(act_name: str, output_file: str, refs: Optional[List[str]] = None,
+                               cards_per_batch: int = 15, index_path: str = 'data/sections_index.json',
+                               delay: float = 2, refresh: bool = False):
+    """
+    Generate cards section-by-section from an indexed bare act (scraped once, then reused)
+    
+    refresh: re-check the act page (conditional GET) and generate only from
+    sections added or amended since it was last scraped
+    """
+    
+    print(f"\n{'='*60}")
+    print(f"WORKFLOW: Generate from Bare Act - {act_name}")
+    print(f"{'='*60}\n")
+    
+    generator = FlashcardGenerator(
+        provider=os.environ.get('LLM_PROVIDER', 'groq'),
+        api_key=os.environ.get('LLM_API_KEY'),
+        config=llm_config_from_env()
+    )
+    json_mgr = JSONManager('data')
+    index = SectionIndex(index_path)
+    
+    if refresh:
+        tracker = ChangeTracker('data/change_state.json')
+        print(f"🔄 Checking {act_name} for amendments...")
+        act = LegalContentScraper(change_tracker=tracker).scrape_bare_acts(act_name)
+        changes = act.get('changes', {})
+        if changes.get('status') in ('not_modified', 'unchanged'):
+            tracker.save()
+            print("✅ No changes since the last scrape")
+            return
+        if not act.get('sections'):
+            print("❌ No sections found!")
+            return
+        index.add_act(act_name, act['sections'], url=act.get('url'))
+        index.save()
+        if changes.get('status') == 'changed':
+            print(f"📝 {len(changes['added'])} added, {len(changes['changed'])} changed, "
+                  f"{len(changes['removed'])} removed")
+            fresh = {s['key'] for s in act['changed_sections']}
+            candidates = index.sections(act_name, refs) if refs else act['changed_sections']
+            refs = [s['key'] for s in candidates if s['key'] in fresh]
+            if not refs:
+                tracker.save()
+                print("✅ None of the requested sections changed")
+                return
+    elif not index.has_act(act_name):
+        print(f"🔍 {act_name} not indexed yet, scraping...")
+        act = LegalContentScraper().scrape_bare_acts(act_name)
+        if not act.get('sections'):
+            print("❌ No sections found!")
+            return
+        index.add_act(act_name, act['sections'], url=act.get('url'))
+        index.save()
+    
+    sections = index.sections(act_name, refs)
+    if not sections:
+        print("❌ None of the requested sections are in the index!")
+        return
+    
+    batches = chunk_sections(sections, max_chars=8000)
+    print(f"📖 {len(sections)} sections in {len(batches)} batches")
+    
+    failed = 0
+    for i, batch in enumerate(batches, 1):
+        print(f"\n🤖 Batch {i}/{len(batches)}: {batch[0]['key']} - {batch[-1]['key']}")
+        cards = generator.generate_from_sections(batch, act_name, count=cards_per_batch)
+        if cards:
+            json_mgr.add_cards_to_topic(output_file, cards)
+        else:
+            failed += 1
+        if i < len(batches):
+            time.sleep(delay)  # Rate limiting
+    
+    if refresh:
+        # Mark the amendments as seen only once every batch produced cards,
+        # so a failed or interrupted run sees them again next time
+        if failed:
+            print(f"⚠️  {failed} batches produced no cards; the changes will be picked up again next run")
+        else:
+            tracker.save()
+
+
+def workflow_add_cards(filename: str, count: int):
+    """Add LLM-generated cards to an existing topic file"""
+    
+    generator = FlashcardGenerator(
+        provider=os.environ.get('LLM_PROVIDER', 'groq'),
+        api_key=os.environ.get('LLM_API_KEY'),
+        config=llm_config_from_env()
+    )
+    json_mgr = JSONManager('data')
+    
+    data = json_mgr.load_topic(filename)
+    if data:
+        print(f"\n🤖 Generating {count} new cards...")
+        new_cards = generator.generate_topic_cards(
+            data['topic_title'],
+            data['topic_subtitle'],
+            count=count,
+            existing_questions=[card['q'] for card in data.get('flashcards', [])]
+        )
+        if new_cards:
+            json_mgr.add_cards_to_topic(filename, new_cards)
+
+
 # ========== CLI INTERFACE ==========
 
 if __name__ == "__main__":
     import sys
+    from profiling import pop_profile_flag, maybe_profile
+    
+    # --profile / --profile=PREFIX wraps the selected workflow
+    profile_prefix = pop_profile_flag(sys.argv)
     
     print("="*60)
     print("AIBE Flashcard Web Scraper & JSON Generator")
@@ -538,43 +713,41 @@ if __name__ == "__main__":
     print("2. Expand all topics to 15+ cards")
     print("3. Create new topic from scratch")
     print("4. Add cards to existing topic (LLM only)")
+    print("5. Generate from bare act sections")
     
-    choice = input("\nEnter choice (1-4): ").strip()
+    choice = input("\nEnter choice (1-5): ").strip()
     
     if choice == '1':
         topic = input("Topic name: ")
         queries = input("Search queries (comma-separated): ").split(',')
         output = input("Output filename (e.g., torts.json): ")
-        workflow_scrape_and_generate(topic, [q.strip() for q in queries], output)
+        incremental = input("Skip pages unchanged since last run? (y/N): ").strip().lower() == 'y'
+        maybe_profile(profile_prefix, workflow_scrape_and_generate, topic, [q.strip() for q in queries], output,
+                      incremental=incremental)
     
     elif choice == '2':
         min_cards = int(input("Minimum cards per topic (default 15): ") or "15")
-        workflow_expand_all_topics(min_cards)
+        maybe_profile(profile_prefix, workflow_expand_all_topics, min_cards)
     
     elif choice == '3':
         topic_id = int(input("Topic ID: "))
         title = input("Topic title: ")
         subtitle = input("Topic subtitle: ")
         filename = input("Filename (e.g., new_topic.json): ")
-        workflow_create_new_topic(topic_id, title, subtitle, filename)
+        maybe_profile(profile_prefix, workflow_create_new_topic, topic_id, title, subtitle, filename)
     
     elif choice == '4':
         filename = input("Existing topic file: ")
         count = int(input("Number of cards to add: "))
-        
-        generator = FlashcardGenerator(provider=provider, api_key=api_key)
-        json_mgr = JSONManager('data')
-        
-        data = json_mgr.load_topic(filename)
-        if data:
-            print(f"\n🤖 Generating {count} new cards...")
-            new_cards = generator.generate_topic_cards(
-                data['topic_title'],
-                data['topic_subtitle'],
-                count=count
-            )
-            if new_cards:
-                json_mgr.add_cards_to_topic(filename, new_cards)
+        maybe_profile(profile_prefix, workflow_add_cards, filename, count)
+    
+    elif choice == '5':
+        act_name = input("Act name (e.g., Indian Contract Act 1872): ")
+        refs = input("Sections (comma-separated, blank for all): ").strip()
+        output = input("Output filename (e.g., contract_law.json): ")
+        refresh = input("Re-check for amended sections only? (y/N): ").strip().lower() == 'y'
+        maybe_profile(profile_prefix, workflow_generate_from_act, act_name, output,
+                      [r.strip() for r in refs.split(',')] if refs else None, refresh=refresh)
     
     else:
         print("Invalid choice!")
@@ -582,3 +755,4 @@ if __name__ == "__main__":
     print("\n" + "="*60)
     print("✅ Done!")
     print("="*60)
+    METRICS.finish_run()
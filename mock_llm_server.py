@@ -0,0 +1,355 @@
+"""
+AIBE Mock LLM Server
+Local stand-in for the Groq / OpenRouter / OpenAI chat-completions API and
+the Ollama /api/chat API, for offline throughput and retry testing.
+
+Point a FlashcardGenerator at it through config['base_url']:
+
+    python mock_llm_server.py --port 8800 --latency 0.2 --rate-limit 0.05
+
+    FlashcardGenerator(provider='openai', api_key='mock',
+                       config={'base_url': 'http://127.0.0.1:8800/v1'})
+    FlashcardGenerator(provider='ollama',
+                       config={'base_url': 'http://127.0.0.1:8800'})
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Dict, Optional
+
+
+CHAT_COMPLETION_PATHS = (
+    '/chat/completions',
+    '/v1/chat/completions',
+    '/openai/v1/chat/completions',
+    '/api/v1/chat/completions',
+)
+OLLAMA_CHAT_PATH = '/api/chat'
+
+
+def load_fixtures(path: str) -> List[str]:
+    """
+    Load recorded LLM responses from a fixture file
+
+    Accepts a JSON-lines file with one {"content": ...} object per line
+    (as written by --record), or a JSON list whose items are either raw
+    response strings or lists of {"q", "a"} cards.
+    """
+    text = Path(path).read_text(encoding='utf-8')
+    fixtures = []
+
+    if path.endswith('.jsonl'):
+        for line in text.splitlines():
+            line = line.strip()
+            if line:
+                fixtures.append(json.loads(line)['content'])
+        return fixtures
+
+    for item in json.loads(text):
+        if isinstance(item, str):
+            fixtures.append(item)
+        else:
+            fixtures.append(json.dumps(item, ensure_ascii=False))
+    return fixtures
+
+
+def canned_flashcards(prompt: str, default_count: int = 15) -> str:
+    """Build a deterministic flashcard JSON array that answers the prompt"""
+    count_match = re.search(r'[Gg]enerate (\d+)', prompt)
+    count = int(count_match.group(1)) if count_match else default_count
+
+    topic_match = (re.search(r'topic: "([^"]+)"', prompt) or
+                   re.search(r'for: "([^"]+)"', prompt) or
+                   re.search(r'content about (.+?), generate', prompt))
+    topic = topic_match.group(1) if topic_match else 'Indian Law'
+
+    cards = [
+        {
+            "q": f"Mock question {i} on {topic}?",
+            "a": f"Mock answer {i} for {topic}. Refer to the relevant section and leading case law."
+        }
+        for i in range(1, count + 1)
+    ]
+    return json.dumps(cards, ensure_ascii=False)
+
+
+class MockLLMServer:
+    """Threaded mock server speaking OpenAI-compatible and Ollama chat protocols"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: int = 1, fixtures: Optional[List[str]] = None,
+                 upstream: Optional[str] = None, record_file: Optional[str] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Base response delay in seconds
+            jitter: Extra uniform random delay in seconds
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            retry_after: Retry-After header value sent with 429 responses
+            fixtures: Recorded responses served round-robin instead of canned cards
+            upstream: Real OpenAI-compatible base URL to proxy to (record mode)
+            record_file: JSON-lines file that proxied responses are appended to
+            seed: Random seed for reproducible error injection
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.fixtures = fixtures or []
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.record_file = record_file
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._fixture_pos = 0
+        self._thread = None
+        self.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0}
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Root URL of the server (use as Ollama base_url)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_url(self) -> str:
+        """OpenAI-compatible base URL (use as groq/openrouter/openai base_url)"""
+        return f"{self.url}/v1"
+
+    def start(self) -> 'MockLLMServer':
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _roll(self) -> Optional[int]:
+        """Decide whether this request gets an injected failure status"""
+        with self._lock:
+            self.stats['requests'] += 1
+            r = self._random.random()
+            if r < self.rate_limit_rate:
+                self.stats['rate_limited'] += 1
+                return 429
+            if r < self.rate_limit_rate + self.error_rate:
+                self.stats['errors'] += 1
+                return 500
+            self.stats['ok'] += 1
+            return None
+
+    def _delay(self) -> float:
+        with self._lock:
+            return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _next_fixture(self) -> str:
+        with self._lock:
+            content = self.fixtures[self._fixture_pos % len(self.fixtures)]
+            self._fixture_pos += 1
+            return content
+
+    def _proxy(self, body: Dict, headers: Dict) -> str:
+        """Forward to the real provider and record its answer"""
+        request = urllib.request.Request(
+            f"{self.upstream}/chat/completions",
+            data=json.dumps(body).encode('utf-8'),
+            headers={
+                'Content-Type': 'application/json',
+                'Authorization': headers.get('Authorization', '')
+            }
+        )
+        with urllib.request.urlopen(request, timeout=120) as response:
+            content = json.loads(response.read())['choices'][0]['message']['content']
+
+        if self.record_file:
+            with self._lock, open(self.record_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'content': content}, ensure_ascii=False) + '\n')
+        return content
+
+    def generate(self, body: Dict, headers: Dict) -> str:
+        """Produce the assistant message content for a chat request"""
+        if self.upstream:
+            return self._proxy(body, headers)
+        if self.fixtures:
+            return self._next_fixture()
+
+        prompt = ''
+        for message in body.get('messages', []):
+            if message.get('role') == 'user':
+                prompt = message.get('content', '')
+        return canned_flashcards(prompt)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Pooled (keep-alive) clients would otherwise stall on Nagle + delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict, extra_headers: Dict = None):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (extra_headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path in ('/', '/health'):
+                    self._send_json(200, {'status': 'ok', 'stats': server.stats})
+                elif self.path == '/api/tags':
+                    self._send_json(200, {'models': [{'name': 'mock'}]})
+                elif self.path.endswith('/models'):
+                    self._send_json(200, {'object': 'list', 'data': [{'id': 'mock', 'object': 'model'}]})
+                else:
+                    self._send_json(404, {'error': {'message': 'Not found'}})
+
+            def do_POST(self):
+                is_openai = self.path in CHAT_COMPLETION_PATHS
+                is_ollama = self.path == OLLAMA_CHAT_PATH
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length) if length else b''
+
+                if not (is_openai or is_ollama):
+                    self._send_json(404, {'error': {'message': f'Unknown endpoint: {self.path}'}})
+                    return
+
+                try:
+                    body = json.loads(raw or b'{}')
+                except ValueError:
+                    self._send_json(400, {'error': {'message': 'Invalid JSON body'}})
+                    return
+
+                time.sleep(server._delay())
+
+                status = server._roll()
+                if status == 429:
+                    self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit'}},
+                                    {'Retry-After': str(server.retry_after)})
+                    return
+                if status == 500:
+                    self._send_json(500, {'error': {'message': 'Injected server error'}})
+                    return
+
+                try:
+                    content = server.generate(body, dict(self.headers))
+                except Exception as e:
+                    self._send_json(502, {'error': {'message': f'Upstream error: {e}'}})
+                    return
+
+                prompt_tokens = len(raw) // 4
+                completion_tokens = len(content) // 4
+                model = body.get('model', 'mock')
+
+                if is_ollama:
+                    self._send_json(200, {
+                        'model': model,
+                        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                        'message': {'role': 'assistant', 'content': content},
+                        'done': True,
+                        'prompt_eval_count': prompt_tokens,
+                        'eval_count': completion_tokens
+                    })
+                else:
+                    self._send_json(200, {
+                        'id': f'chatcmpl-mock-{server.stats["requests"]}',
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': model,
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': content},
+                            'finish_reason': 'stop'
+                        }],
+                        'usage': {
+                            'prompt_tokens': prompt_tokens,
+                            'completion_tokens': completion_tokens,
+                            'total_tokens': prompt_tokens + completion_tokens
+                        }
+                    })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock LLM server for offline flashcard generation")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=0.0, help='Base delay per request (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random delay (seconds)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 responses')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Fraction of HTTP 429 responses')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds for 429s')
+    parser.add_argument('--fixtures', help='Recorded responses (.jsonl or .json) to replay')
+    parser.add_argument('--upstream', help='Proxy to this OpenAI-compatible base URL and record responses')
+    parser.add_argument('--record', help='JSON-lines file to append proxied responses to')
+    parser.add_argument('--seed', type=int, help='Random seed for failure injection')
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit,
+        retry_after=args.retry_after,
+        fixtures=load_fixtures(args.fixtures) if args.fixtures else None,
+        upstream=args.upstream,
+        record_file=args.record,
+        seed=args.seed
+    )
+
+    print("AIBE Mock LLM Server")
+    print("=" * 50)
+    print(f"   OpenAI-compatible: {server.openai_url}/chat/completions")
+    print(f"   Ollama:            {server.url}/api/chat")
+    if args.fixtures:
+        print(f"   Replaying {len(server.fixtures)} recorded responses")
+    if args.upstream:
+        print(f"   Proxying to {args.upstream}")
+    print("\nPress Ctrl+C to stop")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n✅ Stopped. Stats: {server.stats}")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+AIBE Profiling Hooks
+Wraps a workflow in cProfile plus a wall-clock stack sampler
+
+Outputs, for a prefix such as profiles/expand:
+    profiles/expand.pstats      - cProfile data (python -m pstats, snakeviz)
+    profiles/expand.collapsed   - collapsed stacks (flamegraph.pl, speedscope, inferno)
+
+and prints the hottest functions grouped by subsystem (network, HTML parsing,
+JSON, regex, file I/O, waiting, app code).
+
+The CLI scripts accept --profile or --profile=PREFIX:
+    python json_scraper_generator.py --profile
+    python flashcard_generator.py --profile=profiles/expand
+    python aibe_pyq_manager.py --profile
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from fnmatch import fnmatch
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Callable, Optional, Tuple
+
+
+APP_DIR = str(Path(__file__).resolve().parent)
+DEFAULT_INTERVAL = 0.005
+
+# Module or package names (dotted prefixes, fnmatch patterns allowed), matched
+# against the module a frame belongs to, or the C function a builtin frame names
+SUBSYSTEM_RULES = [
+    ('network', ('requests', 'urllib3', 'socket', '_socket', 'ssl', '_ssl', 'http.client',
+                 'selectors', 'urllib', 'certifi', 'charset_normalizer', 'idna')),
+    ('html', ('bs4', 'lxml', 'soupsieve', 'html.parser', '_markupbase')),
+    ('json', ('json', '_json')),
+    ('regex', ('re', 'sre_*', '_sre')),
+    ('file io', ('_io', 'io', 'codecs', 'pathlib', 'shutil', 'tempfile')),
+    ('waiting', ('time.sleep', 'threading', 'queue', '_queue', '_thread', 'select',
+                 'builtins.input', 'concurrent.futures')),
+]
+# The app's own modules are 'app' except these
+APP_SUBSYSTEMS = {'html_extract': 'html'}
+
+BUILTIN_NAME = re.compile(r"^<(?:built-in method |method '\w+' of '|built-in function )([\w.]+)")
+
+
+def pop_profile_flag(argv: List[str]) -> Optional[str]:
+    """
+    Remove --profile / --profile=PREFIX from argv (in place)
+
+    Returns the output prefix, or None when profiling was not requested.
+    """
+    for i, arg in enumerate(argv):
+        if arg == '--profile':
+            del argv[i]
+            script = Path(argv[0]).stem if argv else 'aibe'
+            return f"profiles/{script}_{time.strftime('%Y%m%d_%H%M%S')}"
+        if arg.startswith('--profile='):
+            del argv[i]
+            return arg.split('=', 1)[1]
+    return None
+
+
+@lru_cache(maxsize=4096)
+def module_parts(filename: str) -> Tuple[str, ...]:
+    """Dotted module path of a source file, as components ('.../json/decoder.py' -> ('json', 'decoder'))"""
+    path = os.path.abspath(filename)
+    roots = [os.path.abspath(p) for p in sys.path if p]
+    root = max((r for r in roots if path.startswith(r + os.sep)), key=len, default=os.path.dirname(path))
+    parts = Path(os.path.relpath(path, root)).with_suffix('').parts
+    return parts[:-1] if parts and parts[-1] == '__init__' else parts
+
+
+def _matches(parts, marker: str) -> bool:
+    names = marker.split('.')
+    return len(parts) >= len(names) and all(fnmatch(part, name) for part, name in zip(parts, names))
+
+
+def subsystem(filename: str, funcname: str = '') -> str:
+    """Classify a code location into a coarse subsystem"""
+    if filename == '~' or filename.startswith('<'):
+        match = BUILTIN_NAME.match(funcname)
+        if not match:
+            return 'builtin'
+        parts = tuple(match.group(1).split('.'))
+    elif os.path.abspath(filename).startswith(APP_DIR + os.sep):
+        return APP_SUBSYSTEMS.get(Path(filename).stem, 'app')
+    else:
+        parts = module_parts(filename)
+    for name, markers in SUBSYSTEM_RULES:
+        if any(_matches(parts, marker) for marker in markers):
+            return name
+    return 'builtin' if filename == '~' or filename.startswith('<') else 'other'
+
+
+class StackSampler:
+    """Samples every thread's Python stack at a fixed interval"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{Path(code.co_filename).stem}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(frames))] += 1
+                self.samples += 1
+
+    def write_collapsed(self, path: str):
+        """Write Brendan Gregg's collapsed-stack format"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def leaf_subsystems(self) -> Dict[str, int]:
+        """Wall-clock samples by the subsystem of the innermost frame"""
+        modules = {Path(m.__file__).stem: m.__file__ for m in list(sys.modules.values())
+                   if getattr(m, '__file__', None)}
+        totals = Counter()
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(';', 1)[-1]
+            module, funcname, _ = leaf.split(':', 2)
+            totals[subsystem(modules.get(module, module), funcname)] += count
+        return dict(totals)
+
+
+def summarize_stats(stats: 'pstats.Stats', top: int = 20) -> Tuple[List[Dict], Dict[str, float]]:
+    """Top functions by self time, and self time grouped by subsystem"""
+    rows = []
+    groups = defaultdict(float)
+    for (filename, lineno, funcname), (cc, nc, tt, ct, _) in stats.stats.items():
+        group = subsystem(filename, funcname)
+        groups[group] += tt
+        rows.append({
+            'function': f"{Path(filename).name}:{lineno}({funcname})" if filename != '~' else funcname,
+            'subsystem': group,
+            'calls': nc,
+            'self_s': tt,
+            'cumulative_s': ct
+        })
+    rows.sort(key=lambda r: r['self_s'], reverse=True)
+    return rows[:top], dict(groups)
+
+
+def print_report(top_rows: List[Dict], groups: Dict[str, float], wall_groups: Dict[str, int],
+                 elapsed: float):
+    """Print hot functions and per-subsystem breakdowns"""
+    print(f"\n{'='*90}")
+    print(f"🔥 PROFILE REPORT ({elapsed:.2f}s wall)")
+    print(f"{'='*90}")
+
+    total_cpu = sum(groups.values()) or 1.0
+    print("\nSelf time by subsystem (cProfile):")
+    for name, seconds in sorted(groups.items(), key=lambda x: x[1], reverse=True):
+        print(f"   {name:.<20} {seconds:>9.3f}s {seconds / total_cpu * 100:>6.1f}%")
+
+    total_samples = sum(wall_groups.values())
+    if total_samples:
+        print("\nWall-clock samples by subsystem (sampler):")
+        for name, count in sorted(wall_groups.items(), key=lambda x: x[1], reverse=True):
+            print(f"   {name:.<20} {count:>9} {count / total_samples * 100:>6.1f}%")
+
+    print("\nHottest functions (self time):")
+    print(f"   {'self s':>9} {'cum s':>9} {'calls':>9}  {'subsystem':<10} function")
+    for row in top_rows:
+        print(f"   {row['self_s']:>9.3f} {row['cumulative_s']:>9.3f} {row['calls']:>9}  "
+              f"{row['subsystem']:<10} {row['function']}")
+    print(f"{'='*90}")
+
+
+def profile_call(func: Callable, *args, output_prefix: str = 'profile',
+                 interval: float = DEFAULT_INTERVAL, top: int = 20, **kwargs):
+    """
+    Run func(*args, **kwargs) under cProfile and the stack sampler
+
+    Writes <prefix>.pstats and <prefix>.collapsed, prints the report,
+    and returns whatever func returned.
+    """
+    # Imported here so CLIs that merely accept --profile do not pay for them
+    import cProfile
+    import pstats
+    Path(output_prefix).parent.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval).start()
+    started = time.perf_counter()
+
+    profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - started
+
+        pstats_path = f"{output_prefix}.pstats"
+        collapsed_path = f"{output_prefix}.collapsed"
+        profiler.dump_stats(pstats_path)
+        sampler.write_collapsed(collapsed_path)
+
+        top_rows, groups = summarize_stats(pstats.Stats(profiler), top)
+        print_report(top_rows, groups, sampler.leaf_subsystems(), elapsed)
+        print(f"💾 Saved: {pstats_path}")
+        print(f"💾 Saved: {collapsed_path} ({sampler.samples} samples)")
+
+
+def maybe_profile(output_prefix: Optional[str], func: Callable, *args, **kwargs):
+    """Call func directly, or under profile_call when a prefix is given"""
+    if output_prefix:
+        return profile_call(func, *args, output_prefix=output_prefix, **kwargs)
+    return func(*args, **kwargs)
+
+
+if __name__ == "__main__":
+    import pstats
+    # Re-print the report for a saved profile: python profiling.py profiles/x.pstats
+    if len(sys.argv) < 2 or not os.path.exists(sys.argv[1]):
+        print("Usage: python profiling.py <file.pstats> [top]")
+        sys.exit(1)
+    rows, grouped = summarize_stats(pstats.Stats(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 20)
+    print_report(rows, grouped, {}, 0.0)
@@ -0,0 +1,403 @@
+"""
+AIBE Snapshot Store
+Versioned, content-addressed snapshots of the data files with chunk-level
+dedupe, so a backup costs only the chunks that changed since the last one
+
+Layout (default root .snapshots):
+    objects/ab/ab12...ef.gz    - chunks, gzip (zstd with zstandard installed)
+    snapshots/<id>.json        - {id, created_at, message, files: {path: {sha256, size, chunks}}}
+
+Files are cut into chunks at content-defined line boundaries, so appending
+cards to a pretty-printed deck or editing one question only stores the
+chunks around the edit. Identical files (the two copies of the
+previous-years collection, the bkup*/ decks) share every chunk.
+
+    python snapshot_store.py snapshot -m "before expansion run"
+    python snapshot_store.py snapshot bkup_l -m "import bkup_l"
+    python snapshot_store.py list
+    python snapshot_store.py diff <id> [<id>]      # second id defaults to the working tree
+    python snapshot_store.py show <id> data/contract_law.json
+    python snapshot_store.py restore <id> [paths] [--to DIR]
+    python snapshot_store.py stats
+"""
+
+import fnmatch
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+DEFAULT_PATTERNS = ('*.json', '*.html', 'data/*.json', 'mock_tests/*.json')
+LINE_MASK = 0x3F          # a line ends a chunk when crc32(line) & mask == 0 (~64 lines)
+MIN_CHUNK = 2 * 1024
+MAX_CHUNK = 64 * 1024
+
+
+def iter_chunks(data: bytes) -> Iterator[bytes]:
+    """
+    Content-defined chunks cut after lines whose crc32 hits LINE_MASK
+
+    Boundaries depend only on nearby content, so an insertion shifts at most
+    the chunks around it. Lines longer than MAX_CHUNK (minified JSON) are
+    split at fixed offsets.
+    """
+    start = position = 0
+    size = len(data)
+    while position < size:
+        end = data.find(b'\n', position)
+        end = size if end < 0 else end + 1
+        if end - start > MAX_CHUNK:
+            # One very long line: emit fixed-size pieces up to the next line start
+            while end - start > MAX_CHUNK:
+                yield data[start:start + MAX_CHUNK]
+                start += MAX_CHUNK
+        position = end
+        if end - start >= MIN_CHUNK and not zlib.crc32(data[max(start, end - 256):end]) & LINE_MASK:
+            yield data[start:end]
+            start = end
+    if start < size:
+        yield data[start:]
+
+
+class SnapshotStore:
+    """Chunk store plus snapshot manifests"""
+
+    def __init__(self, root: str = '.snapshots', codec: Optional[str] = None, level: int = 6):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.snapshots_dir = self.root / 'snapshots'
+        self.codec = codec or ('zstd' if HAS_ZSTD else 'gzip')
+        if self.codec == 'zstd' and not HAS_ZSTD:
+            raise ValueError("zstd codec requested but zstandard is not installed (pip install zstandard)")
+        self.level = level
+        self._chunk_cache: OrderedDict = OrderedDict()
+
+    # ========== CHUNKS ==========
+
+    def _object_path(self, sha: str, codec: Optional[str] = None) -> Path:
+        suffix = '.zst' if (codec or self.codec) == 'zstd' else '.gz'
+        return self.objects_dir / sha[:2] / f"{sha}{suffix}"
+
+    def _find_object(self, sha: str) -> Optional[Path]:
+        for codec in (self.codec, 'gzip' if self.codec == 'zstd' else 'zstd'):
+            path = self._object_path(sha, codec)
+            if path.exists():
+                return path
+        return None
+
+    def put_chunk(self, data: bytes) -> Tuple[str, int]:
+        """Store a chunk if new; returns (sha256, bytes written)"""
+        sha = hashlib.sha256(data).hexdigest()
+        if self._find_object(sha):
+            return sha, 0
+        path = self._object_path(sha)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.codec == 'zstd':
+            compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+        else:
+            compressed = gzip.compress(data, compresslevel=min(self.level, 9), mtime=0)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        return sha, len(compressed)
+
+    def get_chunk(self, sha: str) -> bytes:
+        cached = self._chunk_cache.get(sha)
+        if cached is not None:
+            self._chunk_cache.move_to_end(sha)
+            return cached
+        path = self._find_object(sha)
+        if path is None:
+            raise FileNotFoundError(f"Missing chunk {sha}")
+        raw = path.read_bytes()
+        if path.suffix == '.zst':
+            if not HAS_ZSTD:
+                raise ValueError("Chunk stored with zstd but zstandard is not installed")
+            data = zstandard.ZstdDecompressor().decompress(raw)
+        else:
+            data = gzip.decompress(raw)
+        self._chunk_cache[sha] = data
+        if len(self._chunk_cache) > 256:
+            self._chunk_cache.popitem(last=False)
+        return data
+
+    # ========== SNAPSHOTS ==========
+
+    def snapshot_ids(self) -> List[str]:
+        if not self.snapshots_dir.exists():
+            return []
+        return sorted(p.stem for p in self.snapshots_dir.glob('*.json'))
+
+    def resolve(self, ref: str) -> str:
+        """Full snapshot id from an id prefix, 'latest' or '~N' (N before latest)"""
+        ids = self.snapshot_ids()
+        if not ids:
+            raise FileNotFoundError("No snapshots yet")
+        if ref == 'latest':
+            return ids[-1]
+        if ref.startswith('~') and ref[1:].isdigit():
+            back = int(ref[1:])
+            if back >= len(ids):
+                raise FileNotFoundError(f"Only {len(ids)} snapshots")
+            return ids[-1 - back]
+        matches = [i for i in ids if i.startswith(ref)]
+        if len(matches) != 1:
+            raise FileNotFoundError(f"{'Ambiguous' if matches else 'Unknown'} snapshot: {ref}")
+        return matches[0]
+
+    def load(self, ref: str) -> Dict:
+        with open(self.snapshots_dir / f"{self.resolve(ref)}.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def snapshot(self, files: Iterable[str], message: str = '', base: str = '.') -> Dict:
+        """
+        Record files (paths relative to base) as a new snapshot
+
+        Files whose hash matches the latest snapshot reuse its chunk list
+        without re-chunking.
+        """
+        previous = self.load('latest')['files'] if self.snapshot_ids() else {}
+        entries, written, logical = {}, 0, 0
+        for name in files:
+            path = Path(base) / name
+            data = path.read_bytes()
+            sha = hashlib.sha256(data).hexdigest()
+            logical += len(data)
+            old = previous.get(name)
+            if old and old['sha256'] == sha:
+                entries[name] = old
+                continue
+            chunks = []
+            for chunk in iter_chunks(data):
+                chunk_sha, size = self.put_chunk(chunk)
+                chunks.append(chunk_sha)
+                written += size
+            entries[name] = {'sha256': sha, 'size': len(data), 'chunks': chunks}
+
+        created = datetime.now()
+        digest = hashlib.sha256(json.dumps(entries, sort_keys=True).encode('utf-8')).hexdigest()
+        manifest = {
+            'id': f"{created.strftime('%Y%m%d-%H%M%S-%f')}-{digest[:8]}",
+            'created_at': created.isoformat(timespec='seconds'),
+            'message': message,
+            'files': dict(sorted(entries.items())),
+            'logical_bytes': logical,
+            'stored_bytes': written,
+        }
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshots_dir / f"{manifest['id']}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, self.snapshots_dir / f"{manifest['id']}.json")
+        return manifest
+
+    def view(self, ref: str) -> 'SnapshotView':
+        return SnapshotView(self, self.load(ref))
+
+    # ========== MAINTENANCE ==========
+
+    def stats(self) -> Dict:
+        referenced = set()
+        logical = 0
+        for sid in self.snapshot_ids():
+            manifest = self.load(sid)
+            logical += sum(entry['size'] for entry in manifest['files'].values())
+            for entry in manifest['files'].values():
+                referenced.update(entry['chunks'])
+        objects = list(self.objects_dir.glob('*/*')) if self.objects_dir.exists() else []
+        return {
+            'snapshots': len(self.snapshot_ids()),
+            'logical_bytes': logical,
+            'stored_bytes': sum(p.stat().st_size for p in objects),
+            'chunks': len(objects),
+            'unreferenced': sum(1 for p in objects if p.name.split('.')[0] not in referenced),
+        }
+
+    def gc(self) -> int:
+        """Delete chunks no snapshot references; returns chunks removed"""
+        referenced = set()
+        for sid in self.snapshot_ids():
+            for entry in self.load(sid)['files'].values():
+                referenced.update(entry['chunks'])
+        removed = 0
+        for path in list(self.objects_dir.glob('*/*')) if self.objects_dir.exists() else []:
+            if path.name.split('.')[0] not in referenced:
+                path.unlink()
+                removed += 1
+        return removed
+
+
+class SnapshotView:
+    """Read-only point-in-time view; files are reassembled from chunks on demand"""
+
+    def __init__(self, store: SnapshotStore, manifest: Dict):
+        self.store = store
+        self.manifest = manifest
+        self.id = manifest['id']
+
+    def files(self, pattern: Optional[str] = None) -> List[str]:
+        names = list(self.manifest['files'])
+        return [n for n in names if fnmatch.fnmatch(n, pattern)] if pattern else names
+
+    def read_bytes(self, name: str) -> bytes:
+        entry = self.manifest['files'].get(name)
+        if entry is None:
+            raise FileNotFoundError(f"{name} not in snapshot {self.id}")
+        data = b''.join(self.store.get_chunk(sha) for sha in entry['chunks'])
+        if hashlib.sha256(data).hexdigest() != entry['sha256']:
+            raise ValueError(f"{name}: content does not match its recorded hash")
+        return data
+
+    def read_text(self, name: str) -> str:
+        return self.read_bytes(name).decode('utf-8')
+
+    def load_json(self, name: str):
+        return json.loads(self.read_bytes(name))
+
+    def restore(self, names: Optional[Iterable[str]] = None, target: str = '.') -> List[str]:
+        """Write files (default: all) under target atomically; returns paths written"""
+        written = []
+        for name in names or self.files():
+            path = Path(target) / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + '.restore.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(self.read_bytes(name))
+            os.replace(tmp_path, path)
+            written.append(str(path))
+        return written
+
+
+def collect_files(paths: Iterable[str], base: str = '.') -> List[str]:
+    """Relative posix paths: directories are walked for data files, globs expanded"""
+    base_path = Path(base)
+    found = []
+    for spec in paths:
+        target = base_path / spec
+        if target.is_dir():
+            for pattern in ('*.json', '*.html', '*.md', '*.txt', '*.py'):
+                found.extend(p for p in target.rglob(pattern) if '__pycache__' not in p.parts)
+        elif target.is_file():
+            found.append(target)
+        else:
+            found.extend(base_path.glob(spec))
+    return sorted({p.relative_to(base_path).as_posix() for p in found if p.is_file()})
+
+
+def diff_manifests(old: Dict[str, Dict], new: Dict[str, Dict]) -> Dict[str, List[str]]:
+    return {
+        'added': sorted(n for n in new if n not in old),
+        'removed': sorted(n for n in old if n not in new),
+        'modified': sorted(n for n in new if n in old and new[n]['sha256'] != old[n]['sha256']),
+    }
+
+
+def working_tree_files(names: Iterable[str], base: str = '.') -> Dict[str, Dict]:
+    """Manifest-style entries (sha256, size) for files on disk"""
+    entries = {}
+    for name in names:
+        path = Path(base) / name
+        if path.is_file():
+            data = path.read_bytes()
+            entries[name] = {'sha256': hashlib.sha256(data).hexdigest(), 'size': len(data)}
+    return entries
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="AIBE content-addressed data snapshots")
+    parser.add_argument('--store', default='.snapshots')
+    sub = parser.add_subparsers(dest='command', required=True)
+    snap = sub.add_parser('snapshot', help="Record data files (default: *.json, *.html, data/, mock_tests/)")
+    snap.add_argument('paths', nargs='*')
+    snap.add_argument('-m', '--message', default='')
+    sub.add_parser('list', help="List snapshots")
+    diff = sub.add_parser('diff', help="Compare two snapshots, or one with the working tree")
+    diff.add_argument('old')
+    diff.add_argument('new', nargs='?')
+    show = sub.add_parser('show', help="Print a file as it was in a snapshot")
+    show.add_argument('snapshot')
+    show.add_argument('path')
+    restore = sub.add_parser('restore', help="Write files from a snapshot")
+    restore.add_argument('snapshot')
+    restore.add_argument('paths', nargs='*')
+    restore.add_argument('--to', default='.', help="Target directory (default: in place)")
+    sub.add_parser('stats', help="Logical vs stored size")
+    sub.add_parser('gc', help="Delete chunks no snapshot references")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store)
+
+    if args.command == 'snapshot':
+        files = collect_files(args.paths or DEFAULT_PATTERNS)
+        manifest = store.snapshot(files, args.message)
+        print(f"📸 {manifest['id']}: {len(files)} files, {manifest['logical_bytes'] / 1024:.1f} KB "
+              f"-> {manifest['stored_bytes'] / 1024:.1f} KB new chunks")
+
+    elif args.command == 'list':
+        for sid in store.snapshot_ids():
+            manifest = store.load(sid)
+            print(f"   {sid}  {len(manifest['files']):>4} files  "
+                  f"+{manifest.get('stored_bytes', 0) / 1024:>7.1f} KB  {manifest.get('message', '')}")
+
+    elif args.command == 'diff':
+        old = store.load(args.old)
+        if args.new:
+            new = store.load(args.new)['files']
+            label = store.resolve(args.new)
+        else:
+            new = working_tree_files(old['files'])
+            label = 'working tree'
+        changes = diff_manifests(old['files'], new)
+        print(f"🔍 {old['id']} -> {label}")
+        view = SnapshotView(store, old)
+        for name in changes['modified']:
+            detail = f"{old['files'][name]['size']} -> {new[name]['size']} bytes"
+            if name.endswith('.json'):
+                from deck_sync import diff_cards
+                before = view.load_json(name)
+                after = (store.view(args.new).load_json(name) if args.new
+                         else json.loads(Path(name).read_bytes()))
+                if isinstance(before, dict) and isinstance(before.get('flashcards'), list):
+                    cards = diff_cards(name, before['flashcards'], after.get('flashcards', []))
+                    detail += f", cards +{len(cards['add'])} ~{len(cards['update'])} -{len(cards['remove'])}"
+            print(f"   M {name} ({detail})")
+        for name in changes['added']:
+            print(f"   A {name}")
+        for name in changes['removed']:
+            print(f"   D {name}")
+        if not any(changes.values()):
+            print("   No changes")
+
+    elif args.command == 'show':
+        sys.stdout.write(store.view(args.snapshot).read_text(args.path))
+
+    elif args.command == 'restore':
+        view = store.view(args.snapshot)
+        written = view.restore(args.paths or None, args.to)
+        print(f"✅ Restored {len(written)} files from {view.id} into {args.to}")
+
+    elif args.command == 'stats':
+        stats = store.stats()
+        ratio = stats['logical_bytes'] / stats['stored_bytes'] if stats['stored_bytes'] else 0
+        print(f"📊 {stats['snapshots']} snapshots, {stats['chunks']} chunks "
+              f"({stats['unreferenced']} unreferenced)")
+        print(f"   {stats['logical_bytes'] / 1024:.1f} KB of snapshotted files stored in "
+              f"{stats['stored_bytes'] / 1024:.1f} KB ({ratio:.1f}x)")
+
+    elif args.command == 'gc':
+        print(f"🗑️  Removed {store.gc()} unreferenced chunks")
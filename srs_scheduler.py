@@ -0,0 +1,309 @@
+"""
+AIBE Spaced Repetition Scheduler
+SM-2 scheduling on top of the topic decks' flashcards arrays, per user
+
+State per user lives in data/reviews/<user>.json as compact records
+
+    {card_id: [due, interval_days, ease, reps, lapses, last_review]}
+
+and every review is appended to data/reviews/<user>.log.jsonl as
+[timestamp, card_id, rating], so state can always be rebuilt by replaying
+the log (import merges logs from other devices this way).
+
+Card ids are "<deck file>:<hash of the question>", so they survive cards
+being appended or reordered. Due cards are kept in a heap: the next N due
+cards across every topic cost O(N log n), not a scan of all reviews.
+
+    scheduler = Scheduler('alice')
+    scheduler.load_decks('data')
+    for card_id in scheduler.next_due(20):
+        ...
+        scheduler.review(card_id, 'good')
+    scheduler.save()
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable, Tuple
+
+RATINGS = {'again': 1, 'hard': 2, 'good': 3, 'easy': 4}
+
+DAY = 86400
+RELEARN_DELAY = 600       # seconds before a lapsed card comes back
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+EASY_BONUS = 1.3
+HARD_FACTOR = 1.2
+
+
+def card_id(filename: str, card: Dict) -> str:
+    """Stable id: deck file plus a hash of the normalized question"""
+    question = ' '.join(card.get('q', '').lower().split())
+    return f"{filename}:{hashlib.sha1(question.encode('utf-8')).hexdigest()[:12]}"
+
+
+def schedule(record: Optional[List], rating: int, now: int) -> List:
+    """
+    Next SM-2 record after a review (record None for a new card)
+
+    rating: 1 again, 2 hard, 3 good, 4 easy
+    """
+    if rating not in (1, 2, 3, 4):
+        raise ValueError(f"Rating must be 1-4 (again/hard/good/easy), got {rating}")
+    _, interval, ease, reps, lapses, _ = record or (0, 0.0, DEFAULT_EASE, 0, 0, 0)
+
+    if rating == 1:
+        return [now + RELEARN_DELAY, 0.0, round(max(MIN_EASE, ease - 0.2), 2), 0, lapses + 1, now]
+
+    if reps == 0:
+        interval = 1.0
+    elif reps == 1:
+        interval = 6.0
+    else:
+        interval = interval * ease
+
+    if rating == 2:
+        ease = max(MIN_EASE, ease - 0.15)
+        interval = max(1.0, (interval / ease) * HARD_FACTOR if reps > 1 else interval)
+    elif rating == 4:
+        ease += 0.15
+        interval *= EASY_BONUS
+
+    interval = round(interval, 2)
+    return [now + int(interval * DAY), interval, round(ease, 2), reps + 1, lapses, now]
+
+
+class Scheduler:
+    """One user's review state, due heap and review log"""
+
+    def __init__(self, user: str, root: str = 'data/reviews'):
+        self.user = user
+        self.root = Path(root)
+        self.state_path = self.root / f"{user}.json"
+        self.log_path = self.root / f"{user}.log.jsonl"
+
+        self.records: Dict[str, List] = {}
+        self.cards: Dict[str, Dict] = {}          # card_id -> card (from loaded decks)
+        self.new_cards = deque()                  # deck order, never reviewed
+        self._heap: List[Tuple[int, str]] = []
+        self._pending_log: List[List] = []
+
+        if self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.records = json.load(f)['cards']
+        self._rebuild_heap()
+
+    # ========== DUE INDEX ==========
+
+    def _rebuild_heap(self):
+        self._heap = [(record[0], cid) for cid, record in self.records.items()]
+        heapq.heapify(self._heap)
+
+    def _push(self, cid: str):
+        heapq.heappush(self._heap, (self.records[cid][0], cid))
+        # Superseded entries are skipped lazily; compact once they dominate
+        if len(self._heap) > 2 * len(self.records) + 64:
+            self._rebuild_heap()
+
+    def _is_current(self, due: int, cid: str) -> bool:
+        record = self.records.get(cid)
+        return record is not None and record[0] == due
+
+    def next_due(self, n: int = 20, now: Optional[int] = None, topics: Optional[Iterable[str]] = None,
+                 new_limit: int = 0) -> List[str]:
+        """
+        Up to n card ids due by now, most overdue first, across all topics
+
+        topics: restrict to these deck files; new_limit: top up with that many
+        never-reviewed cards from loaded decks when fewer than n are due.
+        """
+        now = int(now if now is not None else time.time())
+        topics = set(topics) if topics else None
+        due, popped = [], []
+        while self._heap and len(due) < n and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_current(*entry):
+                continue
+            popped.append(entry)
+            if topics is None or entry[1].split(':', 1)[0] in topics:
+                due.append(entry[1])
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+
+        if new_limit and len(due) < n:
+            while self.new_cards and self.new_cards[0] in self.records:
+                self.new_cards.popleft()
+            for cid in self.new_cards:
+                if len(due) >= n or new_limit <= 0:
+                    break
+                if cid not in self.records and (topics is None or cid.split(':', 1)[0] in topics):
+                    due.append(cid)
+                    new_limit -= 1
+        return due
+
+    def due_count(self, now: Optional[int] = None) -> int:
+        now = int(now if now is not None else time.time())
+        return sum(1 for record in self.records.values() if record[0] <= now)
+
+    def forecast(self, days: int = 7, now: Optional[int] = None) -> List[int]:
+        """Cards falling due on each of the next days (day 0 includes overdue)"""
+        now = int(now if now is not None else time.time())
+        buckets = [0] * days
+        for record in self.records.values():
+            day = max(0, (record[0] - now) // DAY)
+            if day < days:
+                buckets[day] += 1
+        return buckets
+
+    # ========== DECKS ==========
+
+    def add_deck(self, filename: str, deck: Dict):
+        """Register a topic deck's cards (new ones are offered in deck order)"""
+        for card in deck.get('flashcards', []):
+            cid = card_id(filename, card)
+            if cid not in self.cards:
+                self.cards[cid] = card
+                if cid not in self.records:
+                    self.new_cards.append(cid)
+
+    def load_decks(self, data_dir: str = 'data'):
+        """Register every deck listed in topics_index.json"""
+        with open(Path(data_dir) / 'topics_index.json', 'r', encoding='utf-8') as f:
+            topics = json.load(f)['topics']
+        for topic in topics:
+            path = Path(data_dir) / topic['file']
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.add_deck(topic['file'], json.load(f))
+
+    # ========== REVIEWS ==========
+
+    def review(self, cid: str, rating, now: Optional[int] = None) -> List:
+        """Record a review (rating 1-4 or 'again'/'hard'/'good'/'easy'); returns the new record"""
+        rating = RATINGS.get(rating, rating) if isinstance(rating, str) else rating
+        now = int(now if now is not None else time.time())
+        self.records[cid] = schedule(self.records.get(cid), rating, now)
+        self._push(cid)
+        self._pending_log.append([now, cid, rating])
+        return self.records[cid]
+
+    def save(self):
+        """Write state atomically and append new log entries"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'user': self.user, 'cards': self.records}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.state_path)
+        if self._pending_log:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(entry, separators=(',', ':')) + '\n' for entry in self._pending_log)
+            self._pending_log = []
+
+    # ========== LOG IMPORT / EXPORT ==========
+
+    def read_log(self) -> List[List]:
+        entries = []
+        if self.log_path.exists():
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        return entries + self._pending_log
+
+    def export_log(self, path: str) -> int:
+        """Write this user's full review log as JSONL; returns the entry count"""
+        entries = self.read_log()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries)
+        return len(entries)
+
+    def import_log(self, path: str) -> int:
+        """
+        Merge a review log (JSONL of [timestamp, card_id, rating]) into this user
+
+        Entries already present are ignored; state is rebuilt by replaying the
+        merged log in time order. Returns the number of new entries.
+        """
+        existing = self.read_log()
+        seen = {(e[0], e[1]) for e in existing}
+        added = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if (entry[0], entry[1]) not in seen:
+                    seen.add((entry[0], entry[1]))
+                    added.append(entry)
+        if not added:
+            return 0
+
+        merged = sorted(existing + added, key=lambda e: (e[0], e[1]))
+        self.records = {}
+        for timestamp, cid, rating in merged:
+            self.records[cid] = schedule(self.records.get(cid), rating, timestamp)
+        self._rebuild_heap()
+        self.new_cards = deque(cid for cid in self.new_cards if cid not in self.records)
+
+        # The merged log replaces the local one
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.log_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(entry, separators=(',', ':')) + '\n' for entry in merged)
+        os.replace(tmp_path, self.log_path)
+        self._pending_log = []
+        self.save()
+        return len(added)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AIBE spaced repetition scheduler")
+    parser.add_argument('--user', default='default')
+    parser.add_argument('--data-dir', default='data')
+    sub = parser.add_subparsers(dest='command', required=True)
+    study = sub.add_parser('study', help="Review due cards interactively")
+    study.add_argument('-n', type=int, default=20)
+    study.add_argument('--new', type=int, default=10, help="New cards to introduce")
+    sub.add_parser('stats', help="Due counts and 7-day forecast")
+    sub.add_parser('export', help="Write the review log").add_argument('path')
+    sub.add_parser('import', help="Merge a review log").add_argument('path')
+    args = parser.parse_args()
+
+    scheduler = Scheduler(args.user, str(Path(args.data_dir) / 'reviews'))
+
+    if args.command == 'stats':
+        print(f"📊 {args.user}: {len(scheduler.records)} cards reviewed, {scheduler.due_count()} due now")
+        print(f"   Next 7 days: {scheduler.forecast(7)}")
+
+    elif args.command == 'export':
+        print(f"✅ Exported {scheduler.export_log(args.path)} reviews to {args.path}")
+
+    elif args.command == 'import':
+        print(f"✅ Imported {scheduler.import_log(args.path)} new reviews")
+
+    elif args.command == 'study':
+        scheduler.load_decks(args.data_dir)
+        queue = scheduler.next_due(args.n, new_limit=args.new)
+        if not queue:
+            print("✅ Nothing due!")
+        try:
+            for i, cid in enumerate(queue, 1):
+                card = scheduler.cards.get(cid)
+                if card is None:
+                    continue
+                print(f"\n[{i}/{len(queue)}] {cid.split(':', 1)[0]}")
+                input(f"Q. {card['q']}\n(press Enter to show answer)")
+                print(f"A. {card['a']}")
+                answer = ''
+                while answer not in ('1', '2', '3', '4'):
+                    answer = input("Rate: 1 again, 2 hard, 3 good, 4 easy: ").strip()
+                scheduler.review(cid, int(answer))
+        except (KeyboardInterrupt, EOFError):
+            print("\n⏸️  Stopped")
+        scheduler.save()
+        print(f"\n💾 Saved. {scheduler.due_count()} cards still due")